@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import ClassVar
 
@@ -9,12 +10,14 @@ class Settings:
     UPLOADS_DIR: ClassVar[Path] = BASE_DIR / "uploads"
     DATA_DIR: ClassVar[Path] = BASE_DIR / "backend" / "data"
     VIDEOS_STORAGE_DIR: ClassVar[Path] = DATA_DIR / "videos"
+    INDEX_DIR: ClassVar[Path] = DATA_DIR / "index"
     
     # Créer les répertoires au démarrage
     def __init__(self):
         self.UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
         self.DATA_DIR.mkdir(parents=True, exist_ok=True)
         self.VIDEOS_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+        self.INDEX_DIR.mkdir(parents=True, exist_ok=True)
         
         print(f"✅ Répertoires créés:")
         print(f"   UPLOADS_DIR: {self.UPLOADS_DIR}")
@@ -25,6 +28,86 @@ class Settings:
     API_PREFIX: ClassVar[str] = "/api"
     API_VERSION: ClassVar[str] = "v1"
     MAX_FILE_SIZE: ClassVar[int] = 500 * 1024 * 1024  # 500 MB
+    
+    # Rétention / garbage collection du stockage
+    STORAGE_QUOTA_BYTES: ClassVar[int] = int(float(os.getenv("STORAGE_QUOTA_GB", "50")) * 1024 ** 3)
+    GC_TEMP_MAX_AGE_SECONDS: ClassVar[int] = int(os.getenv("GC_TEMP_MAX_AGE_SECONDS", "3600"))
+    GC_EVICT_ORIGINALS: ClassVar[bool] = os.getenv("GC_EVICT_ORIGINALS", "false").lower() == "true"
+    # Job "processing" sans activité depuis ce délai : considéré comme planté, récupérable par la GC
+    GC_PROCESSING_MAX_AGE_SECONDS: ClassVar[int] = int(os.getenv("GC_PROCESSING_MAX_AGE_SECONDS", "21600"))
+    
+    # Échelle de rendus du downscale (hauteurs, ex. "240,360,720"), produits en un seul décodage
+    DOWNSCALE_RENDITIONS: ClassVar[list] = [
+        {"name": f"{h}p", "height": int(h), "crf": 23, "preset": "fast", "audio_bitrate": "128k"}
+        for h in os.getenv("DOWNSCALE_RENDITIONS", "240,360,720").split(",") if h.strip()
+    ]
+    
+    # Packaging HLS pendant l'encodage (lecture avant la fin du downscale)
+    HLS_ENABLED: ClassVar[bool] = os.getenv("HLS_ENABLED", "true").lower() == "true"
+    HLS_HEIGHT: ClassVar[int] = int(os.getenv("HLS_HEIGHT", "360"))
+    HLS_SEGMENT_SECONDS: ClassVar[int] = int(os.getenv("HLS_SEGMENT_SECONDS", "4"))
+    
+    # Downscale par morceaux en parallèle pour les vidéos longues
+    DOWNSCALE_PARALLEL_WORKERS: ClassVar[int] = int(os.getenv("DOWNSCALE_PARALLEL_WORKERS", str(os.cpu_count() or 1)))
+    DOWNSCALE_PARALLEL_MIN_SECONDS: ClassVar[int] = int(os.getenv("DOWNSCALE_PARALLEL_MIN_SECONDS", "300"))
+    DOWNSCALE_CHUNK_SECONDS: ClassVar[int] = int(os.getenv("DOWNSCALE_CHUNK_SECONDS", "30"))
+    # Délai du downscale : durée d'encodage estimée (durée x vitesse mesurée) x marge, au moins le minimum
+    DOWNSCALE_TIMEOUT_MIN_SECONDS: ClassVar[int] = int(os.getenv("DOWNSCALE_TIMEOUT_MIN_SECONDS", "900"))
+    DOWNSCALE_TIMEOUT_FACTOR: ClassVar[float] = float(os.getenv("DOWNSCALE_TIMEOUT_FACTOR", "4"))
+
+    # Profil d'encodage (throughput / balanced / archive) et facteur temps réel visé
+    DOWNSCALE_PROFILE: ClassVar[str] = os.getenv("DOWNSCALE_PROFILE", "balanced")
+    DOWNSCALE_TARGET_REALTIME: ClassVar[float] = float(os.getenv("DOWNSCALE_TARGET_REALTIME", "1.0"))
+    ENCODER_BENCHMARK_PATH: ClassVar[Path] = INDEX_DIR / "encoder_benchmark.json"
+
+    # Prétraitement fusionné : rendus + PCM 16 kHz + frames d'analyse en un seul décodage
+    PREPROCESS_FUSED: ClassVar[bool] = os.getenv("PREPROCESS_FUSED", "true").lower() == "true"
+    PREPROCESS_FRAME_FPS: ClassVar[float] = float(os.getenv("PREPROCESS_FRAME_FPS", "1.0"))
+    PREPROCESS_FRAME_WIDTH: ClassVar[int] = int(os.getenv("PREPROCESS_FRAME_WIDTH", "640"))
+    PREPROCESS_MAX_FRAMES: ClassVar[int] = int(os.getenv("PREPROCESS_MAX_FRAMES", "24"))
+
+    # Détection d'animaux : 0 = ~12 frames réparties ; > 0 = échantillonnage dense (frames / s),
+    # borné par ANIMAL_MAX_FRAMES quand les frames viennent du prétraitement fusionné
+    ANIMAL_SAMPLE_FPS: ClassVar[float] = float(os.getenv("ANIMAL_SAMPLE_FPS", "0"))
+    ANIMAL_MAX_FRAMES: ClassVar[int] = int(os.getenv("ANIMAL_MAX_FRAMES", "3600"))
+
+    # Proxy d'analyse (largeur réduite, GOP court, audio conservé) lu par langue / YOLO / sous-titres
+    ANALYSIS_PROXY_ENABLED: ClassVar[bool] = os.getenv("ANALYSIS_PROXY_ENABLED", "true").lower() == "true"
+    ANALYSIS_PROXY_WIDTH: ClassVar[int] = int(os.getenv("ANALYSIS_PROXY_WIDTH", "640"))
+    ANALYSIS_PROXY_GOP_SECONDS: ClassVar[float] = float(os.getenv("ANALYSIS_PROXY_GOP_SECONDS", "1.0"))
+
+    # Budget CPU partagé entre jobs simultanés (0 = détection cgroup / affinité)
+    CPU_BUDGET_CPUS: ClassVar[int] = int(os.getenv("CPU_BUDGET_CPUS", "0"))
+    CPU_BUDGET_RESERVE: ClassVar[int] = int(os.getenv("CPU_BUDGET_RESERVE", "0"))
+
+    # Identification de langue : K fenêtres riches en parole (VAD), arrêt dès que le vote est sûr
+    LANGUAGE_ID_WINDOWS: ClassVar[int] = int(os.getenv("LANGUAGE_ID_WINDOWS", "4"))
+    LANGUAGE_ID_WINDOW_SECONDS: ClassVar[float] = float(os.getenv("LANGUAGE_ID_WINDOW_SECONDS", "10"))
+    LANGUAGE_ID_MIN_WINDOWS: ClassVar[int] = int(os.getenv("LANGUAGE_ID_MIN_WINDOWS", "2"))
+    LANGUAGE_ID_CONFIDENCE: ClassVar[float] = float(os.getenv("LANGUAGE_ID_CONFIDENCE", "0.8"))
+    # Moteur d'identification : "whisper" (hors ligne, modèle partagé) ou "google" (réseau, fr/en)
+    LANGUAGE_ID_BACKEND: ClassVar[str] = os.getenv("LANGUAGE_ID_BACKEND", "whisper")
+    LANGUAGE_ID_MODEL: ClassVar[str] = os.getenv("LANGUAGE_ID_MODEL", "base")
+    LANGUAGE_ID_PRELOAD: ClassVar[bool] = os.getenv("LANGUAGE_ID_PRELOAD", "false").lower() == "true"
+
+    # Registre de modèles partagé : budget mémoire (LRU), appels simultanés par modèle,
+    # préchargement au démarrage du serveur (opt-in, ex. "faster_whisper:small:int8")
+    MODEL_MEMORY_BUDGET_MB: ClassVar[int] = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "4096"))
+    MODEL_NUM_WORKERS: ClassVar[int] = int(os.getenv("MODEL_NUM_WORKERS", "2"))
+    MODEL_WARMUP: ClassVar[list] = [s for s in os.getenv("MODEL_WARMUP", "").split(",") if s.strip()]
+
+    # Passage ASR unique (transcription + sous-titres) par morceaux en parallèle :
+    # moteur ("whisper" hors ligne, segments minutés, ou "google"), workers, chevauchement
+    TRANSCRIBE_BACKEND: ClassVar[str] = os.getenv("TRANSCRIBE_BACKEND", "whisper")
+    TRANSCRIBE_MODEL: ClassVar[str] = os.getenv("TRANSCRIBE_MODEL", "small")
+    TRANSCRIBE_WORKERS: ClassVar[int] = int(os.getenv("TRANSCRIBE_WORKERS", "4"))
+    TRANSCRIBE_OVERLAP_SECONDS: ClassVar[float] = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "1.5"))
+
+    # Porte "pas de parole" : sous ces seuils, langue, transcription et sous-titres Whisper sont sautés
+    SPEECH_GATE_ENABLED: ClassVar[bool] = os.getenv("SPEECH_GATE_ENABLED", "true").lower() == "true"
+    SPEECH_GATE_MIN_LOUDNESS_DB: ClassVar[float] = float(os.getenv("SPEECH_GATE_MIN_LOUDNESS_DB", "-55"))
+    SPEECH_GATE_MIN_SPEECH_RATIO: ClassVar[float] = float(os.getenv("SPEECH_GATE_MIN_SPEECH_RATIO", "0.05"))
+    SPEECH_GATE_MIN_SPEECH_SECONDS: ClassVar[float] = float(os.getenv("SPEECH_GATE_MIN_SPEECH_SECONDS", "2"))
 
 
 # Instance unique
@@ -1,11 +1,28 @@
-from fastapi import APIRouter
+import asyncio
+import json
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from backend.app.config import settings
 from backend.services.json_storage import JSONStorage
+from backend.services.storage_events import storage_events
+from backend.services.storage_gc import StorageGC
+from backend.services.cpu_budget import cpu_budget
+from backend.services.mp4_validator import mp4_validator
+from backend.services.model_registry import model_registry
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 # Initialiser le stockage
 storage = JSONStorage(str(settings.VIDEOS_STORAGE_DIR))
+storage_gc = StorageGC(
+    storage,
+    uploads_dir=str(settings.UPLOADS_DIR),
+    data_dir=str(settings.DATA_DIR),
+    quota_bytes=settings.STORAGE_QUOTA_BYTES,
+    temp_max_age=settings.GC_TEMP_MAX_AGE_SECONDS,
+    evict_originals=settings.GC_EVICT_ORIGINALS,
+    processing_max_age=settings.GC_PROCESSING_MAX_AGE_SECONDS
+)
 
 @router.get("/videos")
 async def get_dashboard_videos():
@@ -17,3 +34,81 @@ async def get_dashboard_videos():
 async def get_stats():
     """Statistiques du dashboard"""
     return storage.get_stats()
+
+@router.get("/gc")
+async def gc_report():
+    """Rapport dry-run : ce que la GC libérerait"""
+    # Parcours des répertoires dans un thread : la boucle reste libre (SSE, segments HLS)
+    return await asyncio.to_thread(storage_gc.run, True)
+
+@router.post("/gc")
+async def gc_run(dry_run: bool = False):
+    """Lance la GC (orphelins, temporaires, quota disque)"""
+    return await asyncio.to_thread(storage_gc.run, dry_run)
+
+@router.get("/cpu")
+async def cpu_budget_metrics():
+    """Budget CPU : capacité détectée, jobs actifs et threads attribués par étape"""
+    return cpu_budget.snapshot()
+
+@router.get("/models")
+async def model_registry_metrics():
+    """Modèles chargés : mémoire, temps de chargement, hits / misses et évictions"""
+    return model_registry.stats()
+
+@router.get("/mp4")
+async def mp4_report():
+    """Disposition des MP4 produits (fast-start, fragmenté, moov en fin)"""
+    return await asyncio.to_thread(mp4_validator.scan)
+
+@router.post("/mp4/remux")
+async def mp4_remux():
+    """Remuxe en arrière-plan (sans réencodage) les MP4 dont le moov est en fin de fichier"""
+    started = await asyncio.to_thread(mp4_validator.start, True)
+    return {"started": started, "running": mp4_validator.running}
+
+# Commentaire SSE périodique pour garder la connexion ouverte derrière les proxies
+KEEPALIVE_SECONDS = 30
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def dashboard_event_generator(request: Request):
+    """
+    Envoie un instantané initial puis uniquement les changements.
+    Le générateur reste bloqué sur la file tant que rien ne change.
+    """
+    queue = storage_events.subscribe()
+    try:
+        yield format_sse("snapshot", {
+            "videos": storage.get_all_videos(),
+            "stats": storage.get_stats()
+        })
+        
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            
+            if event.get("type") == "resync":
+                yield format_sse("snapshot", {
+                    "videos": storage.get_all_videos(),
+                    "stats": storage.get_stats()
+                })
+            else:
+                yield format_sse("video", event)
+    finally:
+        storage_events.unsubscribe(queue)
+
+@router.get("/events")
+async def dashboard_events(request: Request):
+    """Flux SSE des changements de vidéos et des deltas de statistiques"""
+    return StreamingResponse(
+        dashboard_event_generator(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,23 +1,41 @@
 import asyncio
 import json
+import re
+import socket
+import time
 import uuid
 from pathlib import Path
 from datetime import datetime
-from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.responses import FileResponse
 
 from backend.app.config import settings
 from backend.utils.progress import ProgressManager
-from backend.utils.file_utils import get_upload_path, get_work_dir, clean_filename, file_exists
+from backend.utils.file_utils import get_upload_path, get_work_dir, get_hls_dir, clean_filename, file_exists
 from backend.services.json_storage import JSONStorage
+from backend.services.transcript_index import TranscriptIndex
+from backend.services.storage_gc import StorageGC
 from backend.services.video_processor import VideoProcessor
 #from backend.services.yolo11_detector import YOLO11Detector
+from backend.services.animal.animal_classes import ANIMAL_IDS
 from backend.services.animal.yolo11_detector import YOLO11Detector
-from backend.services.subtitles.subtitles import generate_subtitles
+from backend.services.animal.detection_timeline import DetectionTimeline
+from backend.services.subtitles.subtitles import VTTStream, write_srt, write_vtt
 #from backend.services.speech_recognition_detector import SpeechRecognitionDetector
 #from backend.services.downscale import DownscaleProcessor
 from backend.services.downscales.downscale import DownscaleProcessor
+from backend.services.downscales.encoder_profiles import EncoderProfiles
+from backend.services.downscales.preprocess import FusedPreprocessor
+from backend.services.artifacts import ArtifactRegistry
+from backend.services.cpu_budget import cpu_budget
+from backend.services.mp4_validator import mp4_validator
 from backend.services.language.speech_recognition_detector import SpeechRecognitionDetector
+from backend.services.language.speech_gate import SpeechGate
+from backend.services.language.whisper_language_id import WhisperLanguageID
+from backend.services.model_registry import model_registry
+from backend.utils.audio import PCMSource
+from backend.utils.media_probe import probe_media
 
 router = APIRouter(prefix="/video", tags=["Video"])
 
@@ -27,12 +45,53 @@ print(f"   DATA_DIR: {settings.DATA_DIR}")
 
 # Initialiser le stockage JSON
 storage = JSONStorage(str(settings.VIDEOS_STORAGE_DIR))
+transcript_index = TranscriptIndex(str(settings.INDEX_DIR / "transcripts.db"))
+storage_gc = StorageGC(
+    storage,
+    uploads_dir=str(settings.UPLOADS_DIR),
+    data_dir=str(settings.DATA_DIR),
+    quota_bytes=settings.STORAGE_QUOTA_BYTES,
+    temp_max_age=settings.GC_TEMP_MAX_AGE_SECONDS,
+    evict_originals=settings.GC_EVICT_ORIGINALS,
+    processing_max_age=settings.GC_PROCESSING_MAX_AGE_SECONDS
+)
 
 # Initialiser les services
 processor = VideoProcessor(temp_dir=str(settings.DATA_DIR / "temp"))
 downscale = DownscaleProcessor(temp_dir=str(settings.DATA_DIR / "temp"))
+encoder_profiles = EncoderProfiles(settings.ENCODER_BENCHMARK_PATH)
+# Mode dense (ANIMAL_SAMPLE_FPS) : les frames du prétraitement suivent la cadence de détection
+preprocessor = FusedPreprocessor(
+    downscale,
+    frame_fps=settings.ANIMAL_SAMPLE_FPS or settings.PREPROCESS_FRAME_FPS,
+    frame_width=settings.PREPROCESS_FRAME_WIDTH,
+    max_frames=settings.ANIMAL_MAX_FRAMES if settings.ANIMAL_SAMPLE_FPS else settings.PREPROCESS_MAX_FRAMES
+)
 yolo_detector = YOLO11Detector()
 
+
+@router.on_event("startup")
+async def warmup_models():
+    """
+    Préchargement des modèles au démarrage du serveur (pas à l'import du module),
+    sur demande : MODEL_WARMUP et LANGUAGE_ID_PRELOAD
+    """
+    warmup = list(settings.MODEL_WARMUP)
+    if settings.LANGUAGE_ID_BACKEND == "whisper" and settings.LANGUAGE_ID_PRELOAD:
+        family, size, _, compute_type = WhisperLanguageID.model_spec()
+        warmup.append(f"{family}:{size}:{compute_type}")
+    model_registry.warmup(warmup)
+
+
+@router.on_event("startup")
+async def rebuild_transcript_index():
+    """
+    Reconstruit l'index plein texte depuis les metadata.json au démarrage
+    quand il est vide ou construit par une version antérieure du schéma
+    """
+    if transcript_index.needs_rebuild():
+        await asyncio.to_thread(transcript_index.rebuild_from_metadata, str(settings.DATA_DIR))
+
 # ============================================
 # 1️⃣ UPLOAD ENDPOINT
 # ============================================
@@ -113,6 +172,8 @@ async def process_video(websocket: WebSocket, file_id: str):
     video_path = get_upload_path(file_id)
     work_dir = get_work_dir(file_id)
     
+    # Job compté dans le budget CPU : les threads de chaque étape en dépendent
+    cpu_budget.acquire(file_id)
     try:
         if not file_exists(video_path):
             await progress.send("error", 0, f"Fichier introuvable")
@@ -132,19 +193,183 @@ async def process_video(websocket: WebSocket, file_id: str):
         await asyncio.sleep(0.5)
         
         # ÉTAPE 3: DOWNSCALE (OPTIONNEL - si ça marche)
-        await progress.send("downscale", 25, "Réduction résolution (640x360)...")
+        rendition_names = ", ".join(r["name"] for r in settings.DOWNSCALE_RENDITIONS)
+        await progress.send("downscale", 25, f"Réduction résolution ({rendition_names})...")
         print("📉 ÉTAPE 3: DOWNSCALE")
         
-        downscaled_path = str(work_dir / f"downscaled_{file_id}")
+        hls = None
+        if settings.HLS_ENABLED:
+            hls_dir = get_hls_dir(file_id)
+            hls = {
+                "rendition": {"name": f"{settings.HLS_HEIGHT}p", "height": settings.HLS_HEIGHT},
+                "playlist": str(hls_dir / "index.m3u8"),
+                "segment_pattern": str(hls_dir / "seg_%05d.ts"),
+                "segment_seconds": settings.HLS_SEGMENT_SECONDS
+            }
+            # Publier la playlist tout de suite : elle grandit pendant l'encodage
+            storage.update_video(file_id=file_id, hls={"playlist": hls["playlist"], "status": "encoding"})
+        
         #downscale_success = processor.pod_downscale(str(video_path), downscaled_path)
-        downscale_success = downscale.pod_downscale(str(video_path), downscaled_path)
+        probe = probe_media(str(video_path))
+        
+        # Réglages libx264 du profil, d'après le benchmark de la machine
+        encoder = encoder_profiles.select(
+            settings.DOWNSCALE_PROFILE,
+            probe,
+            height=max(r["height"] for r in settings.DOWNSCALE_RENDITIONS),
+            target_realtime=settings.DOWNSCALE_TARGET_REALTIME
+        )
+        print(f"   🎛️  Profil {encoder['profile']}: preset={encoder['preset']} crf={encoder['crf']} ({encoder['source']})")
+        # Passthrough : ne réencoder que ce que la source ne satisfait pas déjà
+        planned = downscale.plan_renditions(probe, encoder_profiles.apply(settings.DOWNSCALE_RENDITIONS, encoder))
+        to_produce = [r for r in planned if r["mode"] != "skip"]
+        for r in planned:
+            print(f"   • {r['name']}: {r['mode']} ({r['reason']})")
+        
+        # Proxy d'analyse produit dans le même décodage que les rendus
+        proxy = None
+        if settings.ANALYSIS_PROXY_ENABLED:
+            proxy = downscale.plan_analysis_proxy(
+                probe,
+                width=settings.ANALYSIS_PROXY_WIDTH,
+                gop_seconds=settings.ANALYSIS_PROXY_GOP_SECONDS
+            )
+            if proxy:
+                to_produce.append(proxy)
+                print(f"   • proxy: {proxy['reason']}")
+        
+        workers = cpu_budget.workers_for(settings.DOWNSCALE_PARALLEL_WORKERS)
+        parallel = (
+            workers > 1
+            and any(r["mode"] != "copy" for r in to_produce)
+            and probe is not None
+            and probe["duration"] >= settings.DOWNSCALE_PARALLEL_MIN_SECONDS
+        )
+        
+        # Threads x264 par sortie : la part du job répartie sur les workers et les encodages
+        # (le HLS partage l'encodage du rendu de même hauteur, sinon il a sa propre branche)
+        hls_branch = hls and not downscale.hls_shared_rendition(to_produce, hls)
+        encoded_outputs = sum(1 for r in to_produce if r["mode"] != "copy") + (1 if hls_branch else 0)
+        ffmpeg_threads = cpu_budget.threads_for(
+            "ffmpeg", file_id, workers=(workers if parallel else 1) * max(1, encoded_outputs)
+        )
+        for r in to_produce + ([hls["rendition"]] if hls else []):
+            r["threads"] = min(r.get("threads") or ffmpeg_threads, ffmpeg_threads)
+        
+        # Délai à l'échelle de la vidéo : durée probée x vitesse d'encodage mesurée
+        timeout = downscale.estimate_timeout(
+            probe,
+            to_produce + ([hls["rendition"]] if hls_branch else []),
+            minimum=settings.DOWNSCALE_TIMEOUT_MIN_SECONDS,
+            factor=settings.DOWNSCALE_TIMEOUT_FACTOR
+        )
+        print(f"   ⏳ Délai downscale: {timeout}s")
+        
+        # Dans un thread : la boucle reste libre pour servir les segments HLS
+        downscale_started = time.perf_counter()
+        downscale_progress = progress.stage_reporter("downscale", 25, 38, f"Réduction résolution ({rendition_names})")
+        if parallel:
+            renditions = await asyncio.to_thread(
+                downscale.pod_downscale_ladder_parallel,
+                str(video_path),
+                str(work_dir),
+                file_id,
+                to_produce,
+                workers=workers,
+                chunk_seconds=settings.DOWNSCALE_CHUNK_SECONDS,
+                timeout=timeout,
+                hls=hls,
+                probe=probe,
+                on_progress=downscale_progress,
+                threads=ffmpeg_threads
+            )
+            if settings.PREPROCESS_FUSED and probe:
+                # PCM + frames d'analyse : un seul décodage supplémentaire pour les deux
+                await asyncio.to_thread(preprocessor.run, str(video_path), str(work_dir), file_id, [], probe,
+                                        timeout=timeout)
+        elif settings.PREPROCESS_FUSED and probe:
+            # Rendus, HLS, PCM 16 kHz et frames d'analyse dans le même graphe FFmpeg
+            fused = await asyncio.to_thread(
+                preprocessor.run,
+                str(video_path),
+                str(work_dir),
+                file_id,
+                to_produce,
+                probe,
+                hls=hls,
+                on_progress=downscale_progress,
+                timeout=timeout
+            )
+            renditions = fused["renditions"]
+        else:
+            renditions = await asyncio.to_thread(
+                downscale.pod_downscale_ladder,
+                str(video_path),
+                str(work_dir),
+                file_id,
+                to_produce,
+                timeout=timeout,
+                hls=hls,
+                probe=probe,
+                on_progress=downscale_progress
+            )
+        downscale_elapsed = time.perf_counter() - downscale_started
+        proxy_rendition = renditions.pop("proxy", None)
+        
+        # Les rendus plus grands que la source pointent vers le fichier déjà produit
+        for r in planned:
+            if r["mode"] == "skip" and r["alias_of"] in renditions:
+                renditions[r["name"]] = dict(renditions[r["alias_of"]], mode="skip", alias_of=r["alias_of"])
+        
+        metrics = dict((storage.get_video(file_id) or {}).get("metrics") or {})
+        metrics["downscale"] = {
+            "mode": "parallel" if parallel else ("fused" if settings.PREPROCESS_FUSED and probe else "ladder"),
+            "elapsed_seconds": round(downscale_elapsed, 2),
+            "timeout_seconds": timeout,
+            "decisions": [
+                {"name": r["name"], "mode": r["mode"], "reason": r["reason"]} for r in planned
+            ],
+            "estimated_saved_seconds": downscale.estimate_saved_seconds(probe, planned),
+            "profile": encoder,
+            "analysis_proxy": "proxy" if proxy_rendition else ("failed" if proxy else "source"),
+            # Vitesse d'encodage mesurée par ffmpeg, par nœud : repérer les machines lentes
+            "encode": {
+                "node": socket.gethostname(),
+                "speed": downscale_progress.stats.get("speed"),
+                "fps": downscale_progress.stats.get("fps"),
+                "elapsed_seconds": downscale_progress.stats.get("elapsed")
+            }
+        }
+        storage.update_video(file_id=file_id, metrics=metrics)
+        
+        if hls:
+            # Une playlist "event" existe dès le premier segment : seule ENDLIST atteste
+            # un encodage allé au bout (pas de flux tronqué par un timeout ou un crash)
+            hls_ready = downscale.hls_complete(hls["playlist"])
+            storage.update_video(
+                file_id=file_id,
+                hls={"playlist": hls["playlist"], "status": "complete" if hls_ready else "failed"}
+            )
+        
+        artifacts = ArtifactRegistry(str(work_dir))
         
-        if downscale_success:
+        if renditions:
+            # Enregistrer tous les rendus produits sur la vidéo
+            storage.update_video(file_id=file_id, renditions=renditions)
+            for name, rendition in renditions.items():
+                artifacts.register(f"rendition:{name}", rendition["path"], "video", height=rendition["height"])
+            downscaled_path = next(iter(renditions.values()))["path"]
             print("✅ Downscale réussi")
         else:
             print("⚠️  Downscale échoué, utilisation du fichier original")
             downscaled_path = str(video_path)
         
+        # Les étapes d'analyse lisent le proxy (ou la source si elle est déjà petite)
+        if proxy_rendition:
+            artifacts.register("analysis_proxy", proxy_rendition["path"], "video", height=proxy_rendition["height"])
+        analysis_path = artifacts.path("analysis_proxy") if proxy_rendition else str(video_path)
+        print(f"🔎 Analyse sur: {analysis_path}")
+        
         print()
         await asyncio.sleep(1)
         
@@ -152,10 +377,54 @@ async def process_video(websocket: WebSocket, file_id: str):
         await progress.send("language", 40, "Détection de langue et transcription...")
         print("🎤 ÉTAPE 4: DÉTECTION LANGUE + TRANSCRIPTION")
         
-        lang_code, lang_name, transcription = SpeechRecognitionDetector.detect_and_transcribe(
-            str(video_path),
-            str(work_dir)
-        )
+        # Porte "pas de parole" : une passe d'analyse audio avant d'engager la reconnaissance
+        audio_pcm = artifacts.path("audio_pcm")
+        audio_source = audio_pcm if audio_pcm and Path(audio_pcm).exists() else analysis_path
+        speech_gate = {"speech": True, "reason": "disabled"}
+        if settings.SPEECH_GATE_ENABLED:
+            gate = SpeechGate(
+                min_loudness_db=settings.SPEECH_GATE_MIN_LOUDNESS_DB,
+                min_speech_ratio=settings.SPEECH_GATE_MIN_SPEECH_RATIO,
+                min_speech_seconds=settings.SPEECH_GATE_MIN_SPEECH_SECONDS
+            )
+            speech_gate = await asyncio.to_thread(gate.analyze, PCMSource(audio_source))
+            print(f"🔇 Porte parole: {speech_gate['reason']} "
+                  f"(parole {speech_gate.get('speech_ratio', 0):.0%}, {speech_gate.get('loudness_db', '-')} dBFS, "
+                  f"{speech_gate['elapsed_seconds']}s)")
+        
+        subtitle_path = str(work_dir / f"{file_id}.vtt")
+        live_vtt = None
+        if speech_gate["speech"]:
+            # Sous-titres en direct : VTT qui grandit (déjà servi par /subtitles) + cues sur la WebSocket
+            live_vtt = VTTStream(subtitle_path)
+            storage.update_video(file_id=file_id, subtitles_path=subtitle_path)
+            send_cue = progress.cue_reporter()
+            
+            def on_segment(segment):
+                live_vtt.append(segment)
+                send_cue(segment)
+            
+            # Un seul passage ASR : transcription, langue et segments minutés des sous-titres
+            # (dans un thread : la boucle reste libre pour envoyer les cues)
+            asr = await asyncio.to_thread(
+                SpeechRecognitionDetector.detect_and_transcribe,
+                analysis_path,
+                audio_path=audio_pcm,
+                on_segment=on_segment
+            )
+            if live_vtt.count:
+                print(f"📡 {live_vtt.count} cues diffusés (premier après {live_vtt.first_cue_at}s)\n")
+        else:
+            # Rien à transcrire : langue, transcription et sous-titres sautés
+            asr = SpeechRecognitionDetector.result(SpeechRecognitionDetector.NO_SPEECH_CODE, "Aucune parole détectée")
+            print(f"⏩ Aucune parole : détection de langue et transcription sautées\n")
+        lang_code, lang_name, transcription = asr["language"], asr["language_name"], asr["text"]
+        
+        if asr["segments"]:
+            segments_path = work_dir / "asr_segments.json"
+            segments_path.write_text(json.dumps(asr["segments"], ensure_ascii=False), encoding="utf-8")
+            artifacts.register("asr_segments", str(segments_path), "segments",
+                               count=len(asr["segments"]), language=lang_code)
         
         await asyncio.sleep(1)
         
@@ -163,7 +432,16 @@ async def process_video(websocket: WebSocket, file_id: str):
         await progress.send("animals", 55, "Détection d'animaux (YOLO11)...")
         print("🦁 ÉTAPE 5: DÉTECTION ANIMAUX (YOLO11)")
         
-        animals = yolo_detector.detect_animals(str(video_path), num_samples=12)
+        torch_threads = cpu_budget.apply_torch(file_id)
+        opencv_threads = cpu_budget.apply_opencv(file_id)
+        animals = yolo_detector.detect_animals(
+            analysis_path,
+            num_samples=12,
+            sample_fps=settings.ANIMAL_SAMPLE_FPS or None,
+            timeline_path=str(work_dir / "detections.npz"),
+            frames=artifacts.iter_frames() if artifacts.get("frames") else None,
+            duration=probe["duration"] if probe else None
+        )
         animals_str = ", ".join(animals)
         print(f"✅ Animaux détectés: {animals_str}\n")
         
@@ -173,15 +451,16 @@ async def process_video(websocket: WebSocket, file_id: str):
         await progress.send("subtitles", 75, "Génération des sous-titres VTT...")
         print("📝 ÉTAPE 6: GÉNÉRATION SOUS-TITRES VTT")
         
-        subtitle_path = str(work_dir / f"{file_id}.vtt")
-
-        # genérer les sous-titres
-        generate_subtitles(str(video_path), subtitle_path, model_size="small")
-        
-        
-        # Créer le fichier VTT avec la transcription
-        create_vtt_file(transcription, subtitle_path, lang_name)
-        print(f"✅ Fichier VTT créé\n")
+        if asr["segments"]:
+            # Cues minutés issus des segments de l'étape ASR : pas de seconde transcription ;
+            # le VTT diffusé en direct est remplacé d'un bloc par sa version finale (langue)
+            write_vtt(asr["segments"], subtitle_path, lang_code)
+            write_srt(asr["segments"], str(work_dir / f"{file_id}.srt"))
+            print(f"✅ Sous-titres VTT / SRT: {len(asr['segments'])} cues\n")
+        else:
+            # Pas de segments (aucune parole, langue inconnue) : VTT avec le message seul
+            create_vtt_file(transcription, subtitle_path, lang_name)
+            print(f"✅ Fichier VTT créé\n")
         
         await asyncio.sleep(1)
         
@@ -194,12 +473,37 @@ async def process_video(websocket: WebSocket, file_id: str):
         await progress.send("complete", 100, "✅ Traitement terminé!")
         print("🏁 ÉTAPE 8: COMPLÉTÉ\n")
         
+        # Décisions du budget CPU et de la porte parole pour ce job
+        metrics = dict((storage.get_video(file_id) or {}).get("metrics") or {})
+        metrics["cpu_budget"] = {
+            "cpus": cpu_budget.cpus,
+            "source": cpu_budget.source,
+            "ffmpeg_workers": workers if parallel else 1,
+            "ffmpeg_threads": ffmpeg_threads,
+            "torch_threads": torch_threads,
+            "opencv_threads": opencv_threads,
+            # Threads par worker du modèle de transcription tel qu'il tourne (fixés à son chargement)
+            "whisper_threads": model_registry.threads_of("faster_whisper", settings.TRANSCRIBE_MODEL,
+                                                         compute_type="int8"),
+            "whisper_workers": model_registry.num_workers
+        }
+        metrics["speech_gate"] = speech_gate
+        metrics["asr"] = {
+            "backend": settings.TRANSCRIBE_BACKEND if speech_gate["speech"] else None,
+            "language_probability": asr["language_probability"],
+            "segments": len(asr["segments"]),
+            "first_cue_seconds": live_vtt.first_cue_at if live_vtt else None
+        }
+        storage.update_video(file_id=file_id, metrics=metrics)
+        
         # Sauvegarder en JSON
         storage.update_video(
             file_id=file_id,
             status="completed",
             language=lang_name,
             animals=animals_str,
+            animal_ids=sorted(ANIMAL_IDS[a] for a in animals if a in ANIMAL_IDS),
+            language_code=lang_code,
             subtitles_path=subtitle_path,
             completed_at=datetime.utcnow().isoformat()
         )
@@ -219,6 +523,9 @@ async def process_video(websocket: WebSocket, file_id: str):
         with open(metadata_file, "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
         
+        # Indexer la transcription pour la recherche plein texte
+        transcript_index.index_video(file_id, transcription, lang_code, subtitle_path)
+        
         print(f"{'='*70}")
         print(f"✅ TRAITEMENT COMPLÉTÉ: {file_id}")
         print(f"   📝 Langue: {lang_name}")
@@ -237,6 +544,8 @@ async def process_video(websocket: WebSocket, file_id: str):
             await progress.send("error", 0, f"Erreur: {str(e)}")
         except:
             pass
+    finally:
+        cpu_budget.release(file_id)
 
 
 # ============================================
@@ -300,14 +609,87 @@ async def get_status(file_id: str):
     return {"file_id": file_id, "status": "not_found"}
 
 
+# ============================================
+# 🔎 SEARCH ENDPOINT
+# ============================================
+@router.get("/search")
+async def search_transcripts(q: str, limit: int = 20):
+    """Recherche plein texte dans les transcriptions"""
+    return transcript_index.search(q, limit=min(max(limit, 1), 100))
+
+
 # ============================================
 # 4️⃣ LIST VIDEOS ENDPOINT
 # ============================================
+def parse_animal_filter(animals: Optional[List[str]]) -> List[int]:
+    """Accepte des ids de classe COCO ou des noms ("23" ou "girafe")"""
+    ids = []
+    for animal in animals or []:
+        if animal.isdigit():
+            ids.append(int(animal))
+        elif animal in ANIMAL_IDS:
+            ids.append(ANIMAL_IDS[animal])
+        else:
+            raise HTTPException(status_code=400, detail=f"Animal inconnu: {animal}")
+    return ids
+
+
 @router.get("/videos")
-async def list_videos():
-    """Liste toutes les vidéos"""
-    videos = storage.get_all_videos()
-    return videos
+async def list_videos(
+    animal: Optional[List[str]] = Query(None),
+    language: Optional[List[str]] = Query(None)
+):
+    """Liste les vidéos filtrées si demandé : un des animaux ET une des langues"""
+    if not animal and not language:
+        return storage.get_all_videos()
+    return storage.query_videos(parse_animal_filter(animal), language)
+
+
+@router.get("/facets")
+async def get_facets(
+    animal: Optional[List[str]] = Query(None),
+    language: Optional[List[str]] = Query(None)
+):
+    """Comptes par animal et par langue pour la sélection courante"""
+    counts = storage.facet_counts(parse_animal_filter(animal), language)
+    return {
+        "animal": [
+            {"id": int(class_id), "name": YOLO11Detector.ANIMAL_CLASSES.get(int(class_id), class_id), "count": n}
+            for class_id, n in counts.get("animal", {}).items()
+        ],
+        "language": [
+            {"code": code, "name": SpeechRecognitionDetector.LANGUAGE_MAP.get(code, code), "count": n}
+            for code, n in counts.get("language", {}).items()
+        ]
+    }
+
+
+# ============================================
+# 🦁 DETECTIONS TIMELINE ENDPOINT
+# ============================================
+@router.get("/detections/{file_id}")
+async def get_detections(
+    file_id: str,
+    start: float = 0.0,
+    end: Optional[float] = None,
+    animal: Optional[List[str]] = Query(None),
+    min_confidence: float = 0.0,
+    limit: int = 1000
+):
+    """Détections (animal, instant, boîte, confiance) dans une fenêtre temporelle"""
+    timeline = DetectionTimeline.load(str(get_work_dir(file_id) / "detections.npz"))
+    if timeline is None:
+        return {"success": False, "error": "Timeline non trouvée"}
+    
+    window = timeline.window(start, end, parse_animal_filter(animal), min_confidence)
+    return {
+        "success": True,
+        "file_id": file_id,
+        "duration": timeline.duration,
+        "total": len(window),
+        "summary": window.summary(YOLO11Detector.ANIMAL_CLASSES),
+        "detections": window.to_records(YOLO11Detector.ANIMAL_CLASSES, limit=limit)
+    }
 
 
 # ============================================
@@ -337,13 +719,33 @@ async def get_subtitles(file_id: str):
 # 6️⃣ DOWNSCALED VIDEO ENDPOINT
 # ============================================
 @router.get("/downscaled/{file_id}")
-async def get_downscaled_video(file_id: str):
-    """Retourne la vidéo downscalée"""
+async def get_downscaled_video(file_id: str, rendition: Optional[str] = None):
+    """Retourne la vidéo downscalée (rendu demandé, sinon le plus léger)"""
     try:
+        video = storage.get_video(file_id) or {}
+        renditions = video.get("renditions") or {}
+        
+        if rendition and rendition not in renditions:
+            return {"success": False, "error": f"Rendu non disponible: {rendition}"}
+        
+        if renditions:
+            name = rendition or min(renditions, key=lambda r: renditions[r]["height"])
+            rendition_path = Path(renditions[name]["path"])
+            if rendition_path.exists():
+                # Fichier antérieur au fast-start : remux en arrière-plan pour les prochaines lectures
+                mp4_validator.ensure(str(rendition_path))
+                return FileResponse(
+                    path=rendition_path,
+                    media_type="video/mp4",
+                    filename=rendition_path.name
+                )
+        
+        # Ancien format : un seul fichier downscalé
         work_dir = get_work_dir(file_id)
         downscaled_path = work_dir / f"downscaled_{file_id}"
         
         if downscaled_path.exists():
+            mp4_validator.ensure(str(downscaled_path))
             return FileResponse(
                 path=downscaled_path,
                 media_type="video/mp4",
@@ -366,6 +768,47 @@ async def get_downscaled_video(file_id: str):
         return {"success": False, "error": str(e)}
 
 
+# ============================================
+# 📺 HLS STREAMING ENDPOINTS
+# ============================================
+HLS_SEGMENT_RE = re.compile(r'^[\w-]+\.(ts|m4s)$')
+HLS_SEGMENT_TYPES = {".ts": "video/mp2t", ".m4s": "video/iso.segment"}
+
+@router.get("/hls/{file_id}/index.m3u8")
+async def get_hls_playlist(file_id: str):
+    """Playlist HLS, disponible dès le premier segment encodé"""
+    playlist = get_hls_dir(file_id, create=False) / "index.m3u8"
+    if not playlist.exists():
+        raise HTTPException(status_code=404, detail="Playlist non disponible")
+    
+    return FileResponse(
+        path=playlist,
+        media_type="application/vnd.apple.mpegurl",
+        # La playlist change pendant l'encodage
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/hls/{file_id}/{segment}")
+async def get_hls_segment(file_id: str, segment: str):
+    """Segment HLS (immuable une fois écrit)"""
+    if not HLS_SEGMENT_RE.match(segment):
+        raise HTTPException(status_code=400, detail="Segment invalide")
+    
+    hls_dir = get_hls_dir(file_id, create=False).resolve()
+    segment_path = (hls_dir / segment).resolve()
+    if segment_path.parent != hls_dir:
+        raise HTTPException(status_code=400, detail="Segment invalide")
+    if not segment_path.is_file():
+        raise HTTPException(status_code=404, detail="Segment non disponible")
+    
+    return FileResponse(
+        path=segment_path,
+        media_type=HLS_SEGMENT_TYPES[segment_path.suffix],
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
 # ============================================
 # 7️⃣ DELETE VIDEO ENDPOINT
 # ============================================
@@ -384,11 +827,14 @@ async def delete_video(file_id: str):
                 Path(video.get('file_path')).unlink()
             if video.get('subtitles_path') and Path(video.get('subtitles_path')).exists():
                 Path(video.get('subtitles_path')).unlink()
+            # Répertoire de travail : downscale, metadata, temporaires
+            await asyncio.to_thread(storage_gc.purge_video, file_id)
         except Exception as e:
             print(f"⚠️  Erreur suppression fichiers: {e}")
         
-        # Supprimer de l'index JSON
+        # Supprimer de l'index JSON et de l'index plein texte
         success = storage.delete_video(file_id)
+        transcript_index.remove_video(file_id)
         
         if success:
             return {"success": True, "message": f"Vidéo {file_id} supprimée"}
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional
+
+# Classes COCO (ids du modèle YOLO) des animaux détectés
+ANIMAL_CLASSES = {
+    14: "oiseau",
+    15: "chat",
+    16: "chien",
+    17: "cheval",
+    18: "mouton",
+    19: "vache",
+    20: "éléphant",
+    21: "ours",
+    22: "zèbre",
+    23: "girafe",
+}
+
+# Nom d'animal (FR) → id de classe COCO, pour les facettes normalisées
+ANIMAL_IDS = {name: class_id for class_id, name in ANIMAL_CLASSES.items()}
+
+
+# Table décalée d'un cran utilisée avant animal_ids : les noms des anciens enregistrements
+# viennent d'elle ("chat" = classe 14, en réalité un oiseau ; 24 = sac à dos, pas un animal)
+LEGACY_ANIMAL_CLASSES = {
+    14: "chat",
+    15: "chien",
+    16: "cheval",
+    17: "mouton",
+    18: "vache",
+    19: "éléphant",
+    20: "ours",
+    21: "zèbre",
+    22: "girafe",
+    23: "oiseau",
+    24: "papillon",
+}
+
+LEGACY_ANIMAL_IDS = {name: class_id for class_id, name in LEGACY_ANIMAL_CLASSES.items()}
+
+
+def animal_ids_from_names(animals: Optional[str]) -> List[int]:
+    """
+    Ids COCO d'un ancien champ "animals" ("chat, chien"), relus avec la table décalée
+    qui a produit ces noms ; noms inconnus et classes non animales ignorés
+    """
+    names = [name.strip() for name in (animals or "").split(",")]
+    ids = {LEGACY_ANIMAL_IDS[name] for name in names if name in LEGACY_ANIMAL_IDS}
+    return sorted(class_id for class_id in ids if class_id in ANIMAL_CLASSES)
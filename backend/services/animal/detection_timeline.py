@@ -0,0 +1,133 @@
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class DetectionTimeline:
+    """
+    Timeline colonnaire des détections d'une vidéo, triée par timestamp.
+
+    Colonnes (une ligne par détection) :
+      timestamps  float32  secondes depuis le début
+      class_ids   uint8    classe COCO
+      confidences float16  score [0, 1]
+      boxes       float16  (N, 4) xyxy normalisés [0, 1]
+
+    ~15 octets par détection : une heure échantillonnée à 2 fps
+    avec plusieurs animaux par frame reste sous le mégaoctet.
+    """
+
+    def __init__(self, timestamps=None, class_ids=None, confidences=None, boxes=None,
+                 duration: float = 0.0, sampled_frames: int = 0):
+        self.timestamps = np.asarray(timestamps if timestamps is not None else [], dtype=np.float32)
+        self.class_ids = np.asarray(class_ids if class_ids is not None else [], dtype=np.uint8)
+        self.confidences = np.asarray(confidences if confidences is not None else [], dtype=np.float16)
+        self.boxes = np.asarray(boxes if boxes is not None else np.empty((0, 4)), dtype=np.float16).reshape(-1, 4)
+        self.duration = float(duration)
+        self.sampled_frames = int(sampled_frames)
+
+        order = np.argsort(self.timestamps, kind="stable")
+        if len(order) and np.any(order != np.arange(len(order))):
+            self.timestamps = self.timestamps[order]
+            self.class_ids = self.class_ids[order]
+            self.confidences = self.confidences[order]
+            self.boxes = self.boxes[order]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict], duration: float = 0.0, sampled_frames: int = 0):
+        """Assemble les détections accumulées frame par frame"""
+        if not chunks:
+            return cls(duration=duration, sampled_frames=sampled_frames)
+        return cls(
+            timestamps=np.concatenate([c["timestamps"] for c in chunks]),
+            class_ids=np.concatenate([c["class_ids"] for c in chunks]),
+            confidences=np.concatenate([c["confidences"] for c in chunks]),
+            boxes=np.concatenate([c["boxes"] for c in chunks]),
+            duration=duration,
+            sampled_frames=sampled_frames
+        )
+
+    def save(self, path: str) -> str:
+        """Persiste la timeline en .npz compressé"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                timestamps=self.timestamps,
+                class_ids=self.class_ids,
+                confidences=self.confidences,
+                boxes=self.boxes,
+                meta=np.array([self.duration, self.sampled_frames], dtype=np.float64)
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DetectionTimeline"]:
+        if not Path(path).exists():
+            return None
+        with np.load(path) as data:
+            meta = data["meta"]
+            return cls(
+                timestamps=data["timestamps"],
+                class_ids=data["class_ids"],
+                confidences=data["confidences"],
+                boxes=data["boxes"],
+                duration=meta[0],
+                sampled_frames=int(meta[1])
+            )
+
+    def window(self, start: float = 0.0, end: Optional[float] = None,
+               class_ids: Optional[List[int]] = None, min_confidence: float = 0.0) -> "DetectionTimeline":
+        """Détections dans [start, end) : recherche dichotomique sur les timestamps triés"""
+        lo = int(np.searchsorted(self.timestamps, start, side="left"))
+        hi = len(self.timestamps) if end is None else int(np.searchsorted(self.timestamps, end, side="left"))
+        sl = slice(lo, hi)
+
+        mask = np.ones(hi - lo, dtype=bool)
+        if class_ids:
+            mask &= np.isin(self.class_ids[sl], np.asarray(class_ids, dtype=np.uint8))
+        if min_confidence > 0:
+            mask &= self.confidences[sl] >= min_confidence
+
+        return DetectionTimeline(
+            timestamps=self.timestamps[sl][mask],
+            class_ids=self.class_ids[sl][mask],
+            confidences=self.confidences[sl][mask],
+            boxes=self.boxes[sl][mask],
+            duration=self.duration,
+            sampled_frames=self.sampled_frames
+        )
+
+    def summary(self, class_names: Dict[int, str] = None) -> List[Dict]:
+        """Par classe : nombre de détections, première/dernière apparition, confiance max"""
+        result = []
+        for class_id in np.unique(self.class_ids):
+            mask = self.class_ids == class_id
+            ts = self.timestamps[mask]
+            result.append({
+                "class_id": int(class_id),
+                "name": (class_names or {}).get(int(class_id), str(int(class_id))),
+                "count": int(mask.sum()),
+                "first_seen": round(float(ts[0]), 3),
+                "last_seen": round(float(ts[-1]), 3),
+                "max_confidence": round(float(self.confidences[mask].max()), 3)
+            })
+        return result
+
+    def to_records(self, class_names: Dict[int, str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Lignes sérialisables JSON (pour l'API)"""
+        n = len(self) if limit is None else min(limit, len(self))
+        names = class_names or {}
+        return [
+            {
+                "t": round(float(self.timestamps[i]), 3),
+                "class_id": int(self.class_ids[i]),
+                "name": names.get(int(self.class_ids[i]), str(int(self.class_ids[i]))),
+                "confidence": round(float(self.confidences[i]), 3),
+                "box": [round(float(v), 4) for v in self.boxes[i]]
+            }
+            for i in range(n)
+        ]
@@ -3,23 +3,14 @@ import numpy as np
 from pathlib import Path
 from ultralytics import YOLO
 
+from backend.services.animal.animal_classes import ANIMAL_CLASSES
+from backend.services.animal.detection_timeline import DetectionTimeline
+
 class YOLO11Detector:
     """Détecteur d'animaux avec YOLO11"""
     
     # Classes COCO pour les animaux
-    ANIMAL_CLASSES = {
-        14: "chat",
-        15: "chien",
-        16: "cheval",
-        17: "mouton",
-        18: "vache",
-        19: "éléphant",
-        20: "ours",
-        21: "zèbre",
-        22: "girafe",
-        23: "oiseau",
-        24: "papillon",
-    }
+    ANIMAL_CLASSES = ANIMAL_CLASSES
     
     def __init__(self):
         self.model = None
@@ -55,39 +46,87 @@ class YOLO11Detector:
             print(f"❌ Erreur extraction frame: {e}")
             return None
     
-    def detect_animals(self, video_path: str, num_samples: int = 15):
-        """Détecte les animaux dans une vidéo avec YOLO11"""
+    def sample_frames(self, video_path: str, num_samples: int = 15, sample_fps: float = None):
+        """
+        Génère (frame_num, timestamp, frame) pour les frames échantillonnées.
+        - num_samples : frames réparties uniformément (seek)
+        - sample_fps : échantillonnage dense en lecture séquentielle (grab sans décodage complet)
+        """
+        cap = cv2.VideoCapture(video_path)
+        try:
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+
+            if total_frames == 0:
+                return
+
+            if sample_fps:
+                step = max(1, int(round(fps / sample_fps)))
+                frame_num = 0
+                while cap.grab():
+                    if frame_num % step == 0:
+                        ret, frame = cap.retrieve()
+                        if ret:
+                            yield frame_num, frame_num / fps, frame
+                    frame_num += 1
+            else:
+                for frame_num in np.linspace(0, total_frames - 1, num_samples, dtype=int):
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_num))
+                    ret, frame = cap.read()
+                    yield int(frame_num), frame_num / fps, frame if ret else None
+        finally:
+            cap.release()
+    
+    def detect_animals(self, video_path: str, num_samples: int = 15, sample_fps: float = None,
+                       timeline_path: str = None, frames=None, duration: float = None):
+        """
+        Détecte les animaux dans une vidéo avec YOLO11.
+        Si timeline_path est donné, la timeline complète (quand, où, confiance)
+        est enregistrée en .npz (voir DetectionTimeline).
+        frames : (index, timestamp, frame) déjà décodés par le prétraitement
+                 (ArtifactRegistry.iter_frames) ; la vidéo n'est alors pas relue.
+        """
         
         if not self.available:
             print("⚠️  YOLO11 non disponible")
             return ["animal non identifié"]
         
         animals_set = set()
+        chunks = []
+        sampled = 0
         
         try:
             print(f"\n🎥 Détection animaux YOLO11: {video_path}")
             
-            cap = cv2.VideoCapture(video_path)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            cap.release()
-            
-            if total_frames == 0:
-                print("❌ Vidéo corrompue ou invalide")
-                return ["animal non identifié"]
-            
-            print(f"   Total frames: {total_frames}")
+            if frames is not None:
+                # Durée fournie par l'appelant (probe) : les frames seules ne la donnent pas
+                duration = duration or 0.0
+                print(f"   Frames du prétraitement (pas de redécodage)\n")
+            else:
+                cap = cv2.VideoCapture(video_path)
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+                cap.release()
+                
+                if total_frames == 0:
+                    print("❌ Vidéo corrompue ou invalide")
+                    return ["animal non identifié"]
+                
+                duration = total_frames / fps
+                print(f"   Total frames: {total_frames}")
+                if sample_fps:
+                    print(f"   Échantillonnage: {sample_fps} fps\n")
+                else:
+                    print(f"   Analyse de {num_samples} frames...\n")
+                frames = self.sample_frames(video_path, num_samples, sample_fps)
             
-            # Échantillonner les frames
-            frame_indices = np.linspace(0, total_frames - 1, num_samples, dtype=int)
-            print(f"   Analyse de {len(frame_indices)} frames...\n")
+            animal_ids = np.array(sorted(self.ANIMAL_CLASSES), dtype=np.int64)
             
-            for idx, frame_num in enumerate(frame_indices):
-                print(f"   Frame {idx + 1}/{num_samples} (frame #{frame_num}):")
-                
-                frame = self.extract_frame(video_path, int(frame_num))
+            for frame_num, timestamp, frame in frames:
+                sampled += 1
                 
                 if frame is None:
-                    print(f"   ⚠️  Impossible de lire la frame\n")
+                    print(f"   ⚠️  Impossible de lire la frame #{frame_num}\n")
                     continue
                 
                 # Redimensionner pour vitesse
@@ -103,42 +142,40 @@ class YOLO11Detector:
                     results = self.model(frame, conf=0.45, verbose=False)
                     
                     detections = results[0].boxes
+                    if len(detections) == 0:
+                        continue
+                    
+                    # Colonnes vectorisées, sans boucle Python par boîte
+                    cls = detections.cls.cpu().numpy().astype(np.int64)
+                    conf = detections.conf.cpu().numpy()
+                    boxes = detections.xyxyn.cpu().numpy()
                     
-                    if len(detections) > 0:
-                        print(f"   ✅ {len(detections)} objet(s) détecté(s):")
-                        
-                        for i, box in enumerate(detections):
-                            cls_id = int(box.cls[0].item())
-                            conf = box.conf[0].item()
-                            
-                            # Classes COCO: 14-24 sont les animaux
-                            if 14 <= cls_id <= 24:
-                                # Noms des animaux
-                                animal_names = {
-                                    14: "chat",
-                                    15: "chien",
-                                    16: "cheval",
-                                    17: "mouton",
-                                    18: "vache",
-                                    19: "éléphant",
-                                    20: "ours",
-                                    21: "zèbre",
-                                    22: "girafe",
-                                    23: "oiseau",
-                                    24: "papillon",
-                                }
-                                
-                                animal = animal_names.get(cls_id, "animal")
-                                animals_set.add(animal)
-                                print(f"      → {animal}: {conf:.0%}")
-                    else:
-                        print(f"   ℹ️  Aucun animal détecté dans cette frame")
+                    # Classes COCO: 14-23 sont les animaux
+                    mask = np.isin(cls, animal_ids)
+                    if not mask.any():
+                        continue
                     
-                    print()
+                    chunks.append({
+                        "timestamps": np.full(int(mask.sum()), timestamp, dtype=np.float32),
+                        "class_ids": cls[mask],
+                        "confidences": conf[mask],
+                        "boxes": boxes[mask]
+                    })
+                    
+                    for cls_id, score in zip(cls[mask], conf[mask]):
+                        animal = self.ANIMAL_CLASSES.get(int(cls_id), "animal")
+                        if animal not in animals_set:
+                            print(f"      → {animal}: {score:.0%} à {timestamp:.1f}s")
+                        animals_set.add(animal)
                     
                 except Exception as e:
                     print(f"   ⚠️  Erreur détection: {e}\n")
             
+            if timeline_path:
+                timeline = DetectionTimeline.from_chunks(chunks, duration=duration, sampled_frames=sampled)
+                timeline.save(timeline_path)
+                print(f"💾 Timeline: {len(timeline)} détection(s) → {timeline_path}")
+            
             animals_list = sorted(list(animals_set))
             
             if not animals_list:
@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class ArtifactRegistry:
+    """
+    Registre des artefacts produits pour une vidéo (rendus, PCM, frames...),
+    persisté dans work_dir/artifacts.json.
+    Les étapes d'analyse y cherchent leurs entrées au lieu de redécoder la source.
+    """
+
+    FILENAME = "artifacts.json"
+
+    def __init__(self, work_dir: str):
+        self.work_dir = Path(work_dir)
+        self.path = self.work_dir / self.FILENAME
+        self._lock = threading.Lock()
+        self._artifacts = self._load()
+
+    def _load(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Registre d'artefacts illisible: {e}")
+            return {}
+
+    def _save(self):
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._artifacts, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def register(self, name: str, path: str, kind: str, **meta) -> Dict:
+        """Enregistre (ou remplace) un artefact"""
+        entry = {"path": str(path), "kind": kind, **meta}
+        with self._lock:
+            self._artifacts[name] = entry
+            self._save()
+        return entry
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Artefact encore présent sur disque, sinon None"""
+        entry = self._artifacts.get(name)
+        if entry and Path(entry["path"]).exists():
+            return entry
+        return None
+
+    def path(self, name: str) -> Optional[str]:
+        entry = self.get(name)
+        return entry["path"] if entry else None
+
+    def all(self) -> Dict:
+        return {name: entry for name, entry in self._artifacts.items() if Path(entry["path"]).exists()}
+
+    def load_frames(self, name: str = "frames") -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(frames (N, H, W, 3) BGR en memmap, timestamps (N,)) d'un artefact de frames"""
+        entry = self.get(name)
+        if not entry:
+            return None
+        frames = np.load(entry["path"], mmap_mode="r")[:entry["count"]]
+        timestamps = np.arange(entry["count"], dtype=np.float32) / entry["fps"]
+        return frames, timestamps
+
+    def iter_frames(self, name: str = "frames") -> Iterator[Tuple[int, float, np.ndarray]]:
+        """Même forme que YOLO11Detector.sample_frames : (index, timestamp, frame)"""
+        loaded = self.load_frames(name)
+        if loaded is None:
+            return
+        frames, timestamps = loaded
+        for i in range(len(frames)):
+            yield i, float(timestamps[i]), np.asarray(frames[i])
@@ -0,0 +1,151 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from backend.app.config import settings
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        return Path(path).read_text().strip()
+    except OSError:
+        return None
+
+
+def detect_cpu_limit() -> Tuple[int, str]:
+    """
+    Nombre de CPU réellement utilisables et sa source :
+    quota cgroup v2 (cpu.max) ou v1 (cfs_quota_us), affinité, sinon os.cpu_count().
+    Dans un pod limité à 8 cœurs sur un nœud de 64, os.cpu_count() renvoie 64.
+    """
+    candidates = []
+
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            candidates.append((max(1, math.ceil(int(quota) / int(period))), "cgroup_v2"))
+    else:
+        quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if quota and period and int(quota) > 0:
+            candidates.append((max(1, math.ceil(int(quota) / int(period))), "cgroup_v1"))
+
+    if hasattr(os, "sched_getaffinity"):
+        candidates.append((len(os.sched_getaffinity(0)), "affinity"))
+
+    candidates.append((os.cpu_count() or 1, "cpu_count"))
+    return min(candidates, key=lambda c: c[0])
+
+
+class CPUBudget:
+    """
+    Budget CPU partagé entre les traitements simultanés d'un même process.
+    Chaque job actif reçoit cpus / jobs actifs threads ; chaque étape
+    (ffmpeg, torch, whisper, opencv) demande sa part au moment où elle démarre.
+    Les décisions récentes sont conservées pour les métriques.
+    """
+
+    def __init__(self, cpus: int = None, reserve: int = 0):
+        detected, source = detect_cpu_limit()
+        self.cpus = cpus or detected
+        self.source = "config" if cpus else source
+        # Cœurs laissés à la boucle asyncio / l'API
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._decisions = deque(maxlen=200)
+        print(f"✅ CPUBudget: {self.cpus} CPU ({self.source}), réserve {self.reserve}")
+
+    @property
+    def active_jobs(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def acquire(self, job_id: str):
+        with self._lock:
+            self._jobs[job_id] = time.time()
+
+    def release(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    @contextmanager
+    def job(self, job_id: str):
+        """Compte le job comme actif pendant le bloc"""
+        self.acquire(job_id)
+        try:
+            yield self
+        finally:
+            self.release(job_id)
+
+    def share(self) -> int:
+        """Threads disponibles pour un job, au vu des jobs actifs"""
+        usable = max(1, self.cpus - self.reserve)
+        return max(1, usable // max(1, self.active_jobs))
+
+    def threads_for(self, stage: str, job_id: str = None, workers: int = 1) -> int:
+        """
+        Threads par worker pour une étape.
+        workers : processus lancés en parallèle par l'étape (downscale par morceaux)
+        """
+        share = self.share()
+        threads = max(1, share // max(1, workers))
+        with self._lock:
+            self._decisions.append({
+                "at": time.time(),
+                "job_id": job_id,
+                "stage": stage,
+                "active_jobs": len(self._jobs),
+                "share": share,
+                "workers": workers,
+                "threads": threads
+            })
+        return threads
+
+    def workers_for(self, requested: int) -> int:
+        """Nombre de processus parallèles compatible avec la part du job"""
+        return max(1, min(requested, self.share()))
+
+    def apply_torch(self, job_id: str = None) -> int:
+        """torch.set_num_threads (global au process) selon la part courante"""
+        threads = self.threads_for("torch", job_id)
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except Exception as e:
+            print(f"⚠️  torch.set_num_threads: {e}")
+        return threads
+
+    def apply_opencv(self, job_id: str = None) -> int:
+        threads = self.threads_for("opencv", job_id)
+        try:
+            import cv2
+            cv2.setNumThreads(threads)
+        except Exception as e:
+            print(f"⚠️  cv2.setNumThreads: {e}")
+        return threads
+
+    def snapshot(self) -> Dict:
+        """Métriques : capacité, jobs actifs, part courante et dernières décisions"""
+        with self._lock:
+            jobs = dict(self._jobs)
+            decisions = list(self._decisions)[-50:]
+        return {
+            "cpus": self.cpus,
+            "source": self.source,
+            "reserve": self.reserve,
+            "active_jobs": len(jobs),
+            "jobs": sorted(jobs),
+            "share": self.share(),
+            "decisions": decisions
+        }
+
+
+# Instance unique (partagée par les routers du process)
+cpu_budget = CPUBudget(cpus=settings.CPU_BUDGET_CPUS or None, reserve=settings.CPU_BUDGET_RESERVE)
@@ -0,0 +1,203 @@
+"""
+
+services/downscales/benchmark.py
+
+Benchmark des réglages libx264 sur la machine courante :
+débit (fps, facteur temps réel), taille / débit binaire et qualité (PSNR, SSIM)
+pour chaque combinaison preset x CRF x threads.
+
+Usage :
+    python -m backend.services.downscales.benchmark
+    python -m backend.services.downscales.benchmark --clip uploads/sample.mp4 --height 360
+
+Les résultats sont écrits dans INDEX_DIR/encoder_benchmark.json et lus par
+EncoderProfiles pour choisir les réglages au moment du traitement.
+
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import socket
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.utils.ffmpeg_runner import run_ffmpeg
+from backend.utils.media_probe import probe_media
+
+
+DEFAULT_PRESETS = ["ultrafast", "veryfast", "fast", "medium", "slow"]
+DEFAULT_CRFS = [20, 23, 26, 28]
+
+# Clips synthétiques : mire (facile à compresser) et fractale (beaucoup de détails)
+SYNTHETIC_SOURCES = {
+    "testsrc2": "testsrc2=size=1920x1080:rate=30",
+    "mandelbrot": "mandelbrot=size=1920x1080:rate=30",
+}
+
+
+def make_synthetic_clip(name: str, source: str, seconds: float, work_dir: Path) -> Optional[str]:
+    """Génère un clip source quasi sans perte (référence de qualité)"""
+    path = work_dir / f"synthetic_{name}.mp4"
+    cmd = [
+        'ffmpeg', '-y', '-f', 'lavfi', '-i', source, '-t', str(seconds),
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-qp', '0', '-pix_fmt', 'yuv420p',
+        str(path)
+    ]
+    result = run_ffmpeg(cmd, timeout=600)
+    if result["returncode"] != 0:
+        print(f"❌ Clip synthétique {name}: {result['stderr'][-300:]}")
+        return None
+    return str(path)
+
+
+def measure_quality(encoded: str, reference: str, width: int, height: int) -> Dict:
+    """PSNR / SSIM de l'encodé contre la source ramenée à la même résolution"""
+    graph = (
+        f"[1:v]scale={width}:{height}:flags=bicubic,split[r1][r2];"
+        f"[0:v]split[d1][d2];"
+        f"[d1][r1]ssim;[d2][r2]psnr"
+    )
+    cmd = ['ffmpeg', '-i', encoded, '-i', reference, '-lavfi', graph, '-f', 'null', '-']
+    result = run_ffmpeg(cmd, timeout=600)
+
+    ssim = re.search(r"SSIM .*All:([0-9.]+)", result["stderr"])
+    psnr = re.search(r"PSNR .*average:([0-9.]+|inf)", result["stderr"])
+    return {
+        "ssim": round(float(ssim.group(1)), 5) if ssim else None,
+        "psnr": round(float(psnr.group(1)), 3) if psnr else None
+    }
+
+
+def benchmark_clip(clip_name: str, clip_path: str, height: int, presets: List[str],
+                   crfs: List[int], threads_list: List[int], work_dir: Path) -> List[Dict]:
+    """Encode le clip pour chaque combinaison et mesure débit, taille et qualité"""
+    probe = probe_media(clip_path)
+    if not probe or not probe.get("video"):
+        print(f"❌ Clip illisible: {clip_path}")
+        return []
+
+    source = probe["video"]
+    duration = probe["duration"]
+    results = []
+
+    for preset, crf, threads in itertools.product(presets, crfs, threads_list):
+        output = work_dir / f"{clip_name}_{preset}_{crf}_{threads}.mp4"
+        cmd = [
+            'ffmpeg', '-y', '-i', clip_path,
+            '-vf', f"scale=-2:'min({height},ih)'",
+            '-c:v', 'libx264', '-preset', preset, '-crf', str(crf),
+            '-threads', str(threads), '-an',
+            str(output)
+        ]
+        encode = run_ffmpeg(cmd, duration=duration, timeout=1800)
+        if encode["returncode"] != 0 or not output.exists():
+            print(f"   ❌ {preset} crf={crf} threads={threads}: {encode['stderr'][-200:]}")
+            continue
+
+        out_probe = probe_media(str(output)) or {}
+        out_video = out_probe.get("video") or {}
+        size = output.stat().st_size
+        quality = measure_quality(str(output), clip_path, out_video.get("width"), out_video.get("height"))
+
+        row = {
+            "clip": clip_name,
+            "duration": round(duration, 3),
+            "source_width": source["width"],
+            "source_height": source["height"],
+            "source_fps": round(source["fps"], 3),
+            "width": out_video.get("width"),
+            "height": out_video.get("height"),
+            "preset": preset,
+            "crf": crf,
+            "threads": threads,
+            "elapsed": encode["elapsed"],
+            "speed": encode["speed"],
+            "fps": encode["fps"],
+            "size": size,
+            "bitrate": int(size * 8 / duration) if duration else None,
+            **quality
+        }
+        results.append(row)
+        print(f"   {preset:>9} crf={crf:<2} threads={threads:<2} "
+              f"{row['fps'] or 0:7.1f} fps {row['speed'] or 0:6.2f}x "
+              f"{size / 1024 / 1024:7.2f} MB  SSIM={row['ssim']}  PSNR={row['psnr']}")
+        output.unlink(missing_ok=True)
+
+    return results
+
+
+def run_benchmark(clips: List[str], output_path: str, height: int = 360, seconds: float = 10,
+                  presets: List[str] = None, crfs: List[int] = None,
+                  threads_list: List[int] = None, synthetic: bool = True) -> Dict:
+    """Lance le benchmark complet et écrit le rapport JSON"""
+    presets = presets or DEFAULT_PRESETS
+    crfs = crfs or DEFAULT_CRFS
+    cpu_count = os.cpu_count() or 1
+    threads_list = threads_list or sorted({1, max(1, cpu_count // 2), cpu_count})
+
+    work_dir = Path(tempfile.mkdtemp(prefix="encoder_benchmark_"))
+    results = []
+    try:
+        sources = []
+        if synthetic:
+            for name, source in SYNTHETIC_SOURCES.items():
+                path = make_synthetic_clip(name, source, seconds, work_dir)
+                if path:
+                    sources.append((name, path))
+        sources += [(Path(c).stem, c) for c in clips]
+
+        for name, path in sources:
+            print(f"\n📊 BENCHMARK {name} → {height}p")
+            results += benchmark_clip(name, path, height, presets, crfs, threads_list, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "host": socket.gethostname(),
+        "cpu_count": cpu_count,
+        "results": results
+    }
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(f"{output_path}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, output_path)
+    print(f"\n✅ {len(results)} mesures écrites dans {output_path}")
+    return report
+
+
+def main():
+    from backend.app.config import settings
+
+    parser = argparse.ArgumentParser(description="Benchmark des réglages libx264")
+    parser.add_argument("--clip", action="append", default=[], help="clip échantillon (répétable)")
+    parser.add_argument("--height", type=int, default=settings.HLS_HEIGHT)
+    parser.add_argument("--seconds", type=float, default=10, help="durée des clips synthétiques")
+    parser.add_argument("--presets", default=",".join(DEFAULT_PRESETS))
+    parser.add_argument("--crfs", default=",".join(str(c) for c in DEFAULT_CRFS))
+    parser.add_argument("--threads", default="", help="ex. 1,4,8 (défaut : 1, nproc/2, nproc)")
+    parser.add_argument("--no-synthetic", action="store_true")
+    parser.add_argument("--output", default=str(settings.ENCODER_BENCHMARK_PATH))
+    args = parser.parse_args()
+
+    run_benchmark(
+        clips=args.clip,
+        output_path=args.output,
+        height=args.height,
+        seconds=args.seconds,
+        presets=[p for p in args.presets.split(",") if p],
+        crfs=[int(c) for c in args.crfs.split(",") if c],
+        threads_list=[int(t) for t in args.threads.split(",") if t] or None,
+        synthetic=not args.no_synthetic
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -23,14 +23,34 @@ from pathlib import Path
 
 import subprocess
 import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from backend.utils.audio import SAMPLE_RATE, load_pcm
+from backend.utils.ffmpeg_runner import run_ffmpeg
+from backend.utils.mp4_layout import movflags_args
+from backend.utils.media_probe import probe_media, probe_keyframes, choose_split_points
+
 class DownscaleProcessor:
     """Traitement des vidéos"""
     
+    # Flux vidéo recopiables tels quels dans un MP4 lisible partout
+    COPYABLE_VIDEO_CODECS = {"h264"}
+    COPYABLE_PIX_FMTS = {"yuv420p", "yuvj420p"}
+    COPYABLE_AUDIO_CODECS = {"aac"}
+    
+    # Coût d'encodage estimé : secondes par (seconde de média x mégapixel),
+    # affiné par moyenne glissante après chaque transcodage réel
+    DEFAULT_ENCODE_SECONDS_PER_MPX = 0.2
+    AUDIO_ENCODE_SECONDS_PER_SECOND = 0.005
+    
     def __init__(self, temp_dir: str = None):
         self.temp_dir = Path(temp_dir) if temp_dir else Path("data/temp")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.encode_seconds_per_mpx = self.DEFAULT_ENCODE_SECONDS_PER_MPX
         print(f"✅ VideoProcessor initialized: {self.temp_dir}")
     
     def pod_downscale(self, input_video: str, output_video: str, width: int = 240, height: int = 160) -> bool:
@@ -98,42 +118,624 @@ class DownscaleProcessor:
             traceback.print_exc()
             return False
     
-    def extract_audio(self, video_path: str) -> str:
-        """Extrait l'audio d'une vidéo"""
+    def plan_renditions(self, probe: dict, renditions: list) -> list:
+        """
+        Choisit par rendu le traitement minimal d'après le probe :
+        - copy       : la source tient déjà dans le rendu (codec, résolution) → remux seul
+        - audio_copy : vidéo réencodée, audio AAC recopié
+        - transcode  : réencodage complet
+        - skip       : rendu plus grand que la source, alias d'un rendu déjà produit
+        """
+        if not probe or not probe.get("video") or not probe["video"].get("height"):
+            return [dict(r, mode="transcode", reason="probe indisponible") for r in renditions]
+        
+        video = probe["video"]
+        audio = probe.get("audio")
+        source_height = video["height"]
+        video_copyable = (
+            video.get("codec") in self.COPYABLE_VIDEO_CODECS
+            and video.get("pix_fmt") in self.COPYABLE_PIX_FMTS
+        )
+        audio_copyable = audio is None or audio.get("codec") in self.COPYABLE_AUDIO_CODECS
+        
+        planned = []
+        alias = None
+        for rendition in sorted(renditions, key=lambda r: r["height"]):
+            if alias is not None:
+                planned.append(dict(rendition, mode="skip", alias_of=alias,
+                                    reason=f"source {source_height}p déjà couverte par {alias}"))
+                continue
+            
+            if rendition["height"] >= source_height:
+                # Premier rendu qui contient la source : les suivants seraient identiques
+                alias = rendition["name"]
+                if video_copyable and audio_copyable:
+                    planned.append(dict(rendition, mode="copy",
+                                        reason=f"{video['codec']} {source_height}p déjà conforme"))
+                    continue
+            
+            if audio is not None and audio.get("codec") in self.COPYABLE_AUDIO_CODECS:
+                planned.append(dict(rendition, mode="audio_copy", reason="audio AAC conservé"))
+            else:
+                planned.append(dict(rendition, mode="transcode", reason="réencodage nécessaire"))
+        
+        return planned
+    
+    @staticmethod
+    def plan_analysis_proxy(probe: dict, width: int = 640, gop_seconds: float = 1.0,
+                            crf: int = 28, preset: str = "veryfast") -> dict:
+        """
+        Rendu "proxy" pour les étapes d'analyse (langue, YOLO, sous-titres) :
+        ~width px de large, GOP court pour des seeks rapides, audio conservé.
+        Retourne None si la source est déjà assez petite (elle sert alors de proxy).
+        """
+        if not probe or not probe.get("video") or not probe["video"].get("width"):
+            return None
+        video = probe["video"]
+        if video["width"] <= width:
+            return None
+        
+        height = int(round(video["height"] * width / video["width"]))
+        height -= height % 2
+        gop = max(1, int(round((video.get("fps") or 25.0) * gop_seconds)))
+        return {
+            "name": "proxy",
+            "height": height,
+            "crf": crf,
+            "preset": preset,
+            "audio_bitrate": "96k",
+            "mode": "transcode",
+            "reason": f"proxy d'analyse {width}px, GOP {gop}",
+            # Keyframe toutes les gop_seconds, sans keyframe de changement de scène
+            "output_args": ['-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0']
+        }
+    
+    def estimate_transcode_seconds(self, probe: dict, rendition: dict) -> float:
+        """Durée estimée d'un transcodage complet de ce rendu"""
+        if not probe or not probe.get("video") or not probe["video"].get("height"):
+            return 0.0
+        video = probe["video"]
+        height = min(rendition["height"], video["height"])
+        width = (video.get("width") or 0) * height / video["height"]
+        mpx = width * height / 1e6
+        return probe["duration"] * (mpx * self.encode_seconds_per_mpx + self.AUDIO_ENCODE_SECONDS_PER_SECOND)
+    
+    def estimate_saved_seconds(self, probe: dict, planned: list) -> float:
+        """Temps épargné par les décisions copy / audio_copy / skip"""
+        saved = 0.0
+        for rendition in planned:
+            if rendition["mode"] in ("copy", "skip"):
+                saved += self.estimate_transcode_seconds(probe, rendition)
+            elif rendition["mode"] == "audio_copy" and probe:
+                saved += probe["duration"] * self.AUDIO_ENCODE_SECONDS_PER_SECOND
+        return round(saved, 2)
+    
+    def estimate_timeout(self, probe: dict, renditions: list, minimum: int = 900, factor: float = 4.0) -> int:
+        """
+        Délai maximal d'un downscale : durée estimée des transcodages (durée probée x vitesse
+        d'encodage mesurée) multipliée par une marge, jamais sous minimum. Une vidéo d'une heure
+        encodée sur un seul worker ne doit pas buter sur un délai pensé pour quelques minutes.
+        """
+        estimated = sum(
+            self.estimate_transcode_seconds(probe, r)
+            for r in renditions if r.get("mode", "transcode") not in ("copy", "skip")
+        )
+        return int(max(minimum, estimated * factor))
+    
+    def record_encode_speed(self, probe: dict, transcoded: list, elapsed: float):
+        """Met à jour la vitesse d'encodage mesurée (moyenne glissante)"""
+        if not probe or not probe.get("video") or not probe["video"].get("height") or not transcoded:
+            return
+        video = probe["video"]
+        mpx_seconds = 0.0
+        for rendition in transcoded:
+            height = min(rendition["height"], video["height"])
+            width = (video.get("width") or 0) * height / video["height"]
+            mpx_seconds += probe["duration"] * width * height / 1e6
+        if mpx_seconds > 0:
+            measured = elapsed / mpx_seconds
+            self.encode_seconds_per_mpx = 0.7 * self.encode_seconds_per_mpx + 0.3 * measured
+    
+    @staticmethod
+    def job_stats(elapsed: float, media_seconds: float, frames: int) -> dict:
+        """Vitesse d'un job complet : facteur temps réel et fps moyens"""
+        return {
+            "elapsed": round(elapsed, 3),
+            "out_time": round(media_seconds, 3),
+            "frame": frames,
+            "speed": round(media_seconds / elapsed, 3) if elapsed > 0 else None,
+            "fps": round(frames / elapsed, 2) if elapsed > 0 else None,
+            "done": True
+        }
+    
+    @staticmethod
+    def hls_shared_rendition(renditions: list, hls: dict = None):
+        """
+        Rendu du ladder réutilisable pour le HLS (même hauteur, réencodé, sans options
+        de sortie propres) : son encodage alimente aussi les segments, pas de second encodage.
+        """
+        if not hls:
+            return None
+        height = hls["rendition"]["height"]
+        for rendition in renditions:
+            if rendition.get("mode", "transcode") not in ("copy", "skip") \
+                    and rendition["height"] == height and not rendition.get("output_args"):
+                return rendition
+        return None
+    
+    @staticmethod
+    def tee_escape(value: str) -> str:
+        """Échappe une valeur d'option ou un chemin pour le muxer tee"""
+        for char in ("\\", ":", "|", "[", "]", "="):
+            value = value.replace(char, "\\" + char)
+        return value
+    
+    @staticmethod
+    def hls_muxer_options(hls: dict) -> list:
+        """Options du muxer HLS : (nom, valeur)"""
+        return [
+            ('hls_time', str(hls.get("segment_seconds", 4))),
+            ('hls_list_size', '0'),
+            # "event" : la playlist ne fait que grandir, ENDLIST écrit à la fin
+            ('hls_playlist_type', 'event'),
+            # temp_file : un segment n'apparaît qu'une fois complet
+            ('hls_flags', 'independent_segments+temp_file'),
+            ('hls_segment_filename', hls["segment_pattern"]),
+        ]
+    
+    @staticmethod
+    def hls_keyframe_args(hls: dict) -> list:
+        """Keyframe à chaque frontière de segment : durées régulières"""
+        return ['-force_key_frames', f'expr:gte(t,n_forced*{hls.get("segment_seconds", 4)})']
+    
+    @staticmethod
+    def build_ladder_command(input_video: str, outputs: list, hls: dict = None,
+                             input_args: list = None, audio: bool = True, threads: int = None,
+                             taps: list = None, movflags: list = None) -> list:
+        """
+        Construit une commande FFmpeg unique : un décodage, un split,
+        puis N branches scale + encodage (une par rendu).
+        outputs : liste de (rendition, output_path)
+        hls : {"rendition", "playlist", "segment_pattern", "segment_seconds"}
+              segments HLS dont la playlist grandit pendant l'encodage ; si un rendu
+              du ladder a la même hauteur, son encodage est envoyé (tee) à la fois
+              dans le MP4 et dans les segments, sinon une branche HLS est ajoutée
+        input_args : options placées avant -i (ex. seek)
+        audio : False pour des sorties vidéo seule (encodage par morceaux)
+        threads : threads d'encodage par sortie
+        taps : sorties d'analyse branchées sur le même décodage, chacune
+               {"source": "v" | "a", "filter", "args", "output"}
+               (ex. frames brutes vers un pipe, PCM 16 kHz)
+        movflags : options de muxage MP4 des rendus (fast-start par défaut,
+                   [] pour les morceaux intermédiaires)
+        """
+        movflags = movflags_args() if movflags is None else movflags
+        encoded = [(r, p) for r, p in outputs if r.get("mode") != "copy"]
+        copied = [(r, p) for r, p in outputs if r.get("mode") == "copy"]
+        
+        taps = taps or []
+        video_taps = [t for t in taps if t["source"] == "v"]
+        audio_taps = [t for t in taps if t["source"] == "a"]
+        
+        shared = DownscaleProcessor.hls_shared_rendition([r for r, _ in encoded], hls)
+        hls_branch = bool(hls) and shared is None
+        branches = [r for r, _ in encoded] + ([hls["rendition"]] if hls_branch else [])
+        n = len(branches) + len(video_taps)
+        graph = []
+        if n:
+            graph = [f"[0:v]split={n}" + "".join(f"[v{i}]" for i in range(n))]
+        for i, rendition in enumerate(branches):
+            height = rendition["height"]
+            # -2 garde le ratio avec une largeur paire; min() évite l'upscale
+            graph.append(f"[v{i}]scale=-2:'min({height},ih)'[o{i}]")
+        for j, tap in enumerate(video_taps):
+            graph.append(f"[v{len(branches) + j}]{tap['filter']}[tv{j}]")
+        for j, tap in enumerate(audio_taps):
+            graph.append(f"[0:a]{tap['filter']}[ta{j}]")
+        
+        def audio_args(rendition):
+            if not audio:
+                return ['-an']
+            if rendition.get("mode") == "audio_copy":
+                return ['-map', '0:a?', '-c:a', 'copy']
+            return ['-map', '0:a?', '-c:a', 'aac', '-b:a', rendition.get("audio_bitrate", "128k")]
+        
+        def thread_args(rendition):
+            count = threads or rendition.get("threads")
+            return ['-threads', str(count)] if count else []
+        
+        cmd = ['ffmpeg', '-y'] + (input_args or []) + ['-i', input_video]
+        if graph:
+            cmd += ['-filter_complex', ";".join(graph)]
+        for i, (rendition, output_path) in enumerate(encoded):
+            cmd += [
+                '-map', f'[o{i}]',
+                '-c:v', 'libx264',
+                '-crf', str(rendition.get("crf", 23)),
+                '-preset', rendition.get("preset", "fast"),
+            ] + thread_args(rendition) + audio_args(rendition)
+            if rendition is shared:
+                # Un seul encodage, deux muxers : MP4 du rendu + segments HLS
+                escape = DownscaleProcessor.tee_escape
+                mp4_options = [(k.lstrip('-'), v) for k, v in zip(movflags[::2], movflags[1::2])]
+                hls_options = [('f', 'hls')] + DownscaleProcessor.hls_muxer_options(hls)
+                slaves = [
+                    (mp4_options, output_path),
+                    (hls_options, hls["playlist"])
+                ]
+                cmd += DownscaleProcessor.hls_keyframe_args(hls) + ['-f', 'tee', "|".join(
+                    ("[" + ":".join(f"{k}={escape(v)}" for k, v in options) + "]" if options else "")
+                    + escape(path)
+                    for options, path in slaves
+                )]
+                continue
+            cmd += movflags + rendition.get("output_args", []) + [output_path]
+        
+        # Remux sans décodage : même démuxage, aucune branche de filtre
+        for rendition, output_path in copied:
+            cmd += ['-map', '0:v:0'] + (['-map', '0:a?'] if audio else ['-an']) + ['-c', 'copy'] + movflags + [output_path]
+        
+        if hls_branch:
+            # Aucun rendu de la hauteur HLS à réencoder : branche dédiée
+            rendition = hls["rendition"]
+            cmd += [
+                '-map', f'[o{len(branches) - 1}]',
+                '-c:v', 'libx264',
+                '-crf', str(rendition.get("crf", 23)),
+                '-preset', rendition.get("preset", "fast"),
+            ] + DownscaleProcessor.hls_keyframe_args(hls) + thread_args(rendition) + audio_args(rendition) + ['-f', 'hls']
+            for name, value in DownscaleProcessor.hls_muxer_options(hls):
+                cmd += [f'-{name}', value]
+            cmd += [hls["playlist"]]
+        
+        for j, tap in enumerate(video_taps):
+            cmd += ['-map', f'[tv{j}]'] + tap.get("args", []) + [tap["output"]]
+        for j, tap in enumerate(audio_taps):
+            cmd += ['-map', f'[ta{j}]'] + tap.get("args", []) + [tap["output"]]
+        return cmd
+    
+    def pod_downscale_ladder(self, input_video: str, output_dir: str, file_id: str,
+                             renditions: list, timeout: int = 900, hls: dict = None,
+                             probe: dict = None, on_progress=None) -> dict:
+        """
+        Produit tous les rendus (240p, 360p, 720p...) en un seul décodage.
+        Avec hls (voir build_ladder_command), des segments HLS sont écrits
+        au fil de l'encodage pour une lecture immédiate.
+        Retourne {nom: {"path", "height", "size"}} pour les rendus réussis.
+        """
         try:
-            print(f"🔊 Extraction audio...")
+            print(f"\n📉 DOWNSCALE LADDER")
+            print(f"   Input: {input_video}")
+            print(f"   Rendus: {', '.join(r['name'] for r in renditions)}")
+            
+            if not Path(input_video).exists():
+                print(f"❌ Fichier d'entrée inexistant: {input_video}")
+                return {}
             
-            audio_path = str(self.temp_dir / "temp_audio.wav")
+            if not renditions and not hls:
+                return {}
             
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vn',
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                audio_path
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            outputs = [
+                (r, str(Path(output_dir) / f"downscaled_{r['name']}_{file_id}"))
+                for r in renditions
             ]
             
-            result = subprocess.run(
+            if hls:
+                Path(hls["playlist"]).parent.mkdir(parents=True, exist_ok=True)
+            
+            cmd = self.build_ladder_command(input_video, outputs, hls)
+            
+            transcoded = [r for r, _ in outputs if r.get("mode") != "copy"]
+            print(f"   🚀 Exécution FFmpeg (1 décodage, {len(transcoded)} encodages, "
+                  f"{len(outputs) - len(transcoded)} remux)...\n")
+            
+            result = run_ffmpeg(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
+                duration=probe["duration"] if probe else None,
+                on_progress=on_progress,
+                timeout=timeout
             )
             
-            if result.returncode == 0 and Path(audio_path).exists():
-                size_mb = Path(audio_path).stat().st_size / 1024 / 1024
-                print(f"✅ Audio extrait: {size_mb:.2f}MB\n")
-                return audio_path
-            else:
-                print(f"❌ Erreur extraction audio")
-                return None
+            if result["returncode"] != 0:
+                print(f"❌ Erreur FFmpeg:")
+                print(f"   {result['stderr'][-1000:]}\n")
+                return {}
+            
+            print(f"   ⏱️  {result['elapsed']:.1f}s, {result['speed'] or 0:.2f}x temps réel, {result['fps'] or 0:.0f} fps")
+            if not hls:
+                self.record_encode_speed(probe, transcoded, result["elapsed"])
+            if on_progress:
+                on_progress(1.0, self.job_stats(result["elapsed"], result["out_time"], result["frames"]))
+            
+            produced = {}
+            for rendition, output_path in outputs:
+                if Path(output_path).exists():
+                    produced[rendition["name"]] = {
+                        "path": output_path,
+                        "height": rendition["height"],
+                        "mode": rendition.get("mode", "transcode"),
+                        "size": Path(output_path).stat().st_size
+                    }
+                    print(f"✅ {rendition['name']}: {produced[rendition['name']]['size'] / 1024 / 1024:.2f} MB")
+            
+            print()
+            return produced
+        
+        except subprocess.TimeoutExpired:
+            print(f"❌ Timeout downscale ladder (> {timeout}s)")
+            return {}
+        except FileNotFoundError:
+            print(f"❌ FFmpeg non trouvé")
+            print(f"   Installe FFmpeg: https://ffmpeg.org/download.html")
+            return {}
+        except Exception as e:
+            print(f"❌ Erreur downscale ladder: {e}\n")
+            import traceback
+            traceback.print_exc()
+            return {}
+    
+    def pod_downscale_ladder_parallel(self, input_video: str, output_dir: str, file_id: str,
+                                      renditions: list, workers: int = None, chunk_seconds: float = 30,
+                                      timeout: int = 900, hls: dict = None, probe: dict = None,
+                                      on_progress=None, threads: int = None) -> dict:
+        """
+        Downscale par morceaux en parallèle :
+        1. coupe sans réencodage aux keyframes (probe) en morceaux vidéo
+        2. encode chaque morceau (tous les rendus) dans un pool de workers
+        3. encode l'audio une seule fois, en parallèle des morceaux
+        4. concatène sans perte (-c copy) et remuxe l'audio
+        Avec hls, le rendu de même hauteur (ou un rendu dédié) est encodé dans les morceaux
+        avec une keyframe toutes les segment_seconds, puis segmenté sans réencodage.
+        Un morceau en échec n'annule rien : les rendus manquants (et le HLS) sont refaits
+        par le ladder séquentiel, les remux "copy" et l'audio déjà produits sont gardés.
+        Retourne le même dict que pod_downscale_ladder.
+        """
+        workers = workers or os.cpu_count() or 1
+        chunks_dir = Path(output_dir) / f"temp_chunks_{file_id.replace('.', '_')}"
+        produced = {}
+        
+        try:
+            print(f"\n📉 DOWNSCALE PARALLÈLE")
+            print(f"   Input: {input_video}")
+            
+            probe = probe or probe_media(input_video)
+            
+            # Les rendus "copy" ne demandent qu'un remux : pas besoin de découper
+            copied = [r for r in renditions if r.get("mode") == "copy"]
+            renditions = [r for r in renditions if r.get("mode") != "copy"]
+            if copied:
+                produced = self.pod_downscale_ladder(input_video, output_dir, file_id, copied, timeout,
+                                                     probe=probe)
+            if not renditions and not hls:
+                return produced
+            
+            keyframes = probe_keyframes(input_video)
+            duration = probe["duration"] if probe else 0.0
+            points = choose_split_points(keyframes, duration, chunk_seconds)
+            
+            if not probe or not points:
+                print(f"   ℹ️  Pas assez de keyframes pour découper, mode séquentiel\n")
+                produced.update(self.pod_downscale_ladder(input_video, output_dir, file_id, renditions,
+                                                          timeout, hls=hls, probe=probe,
+                                                          on_progress=on_progress))
+                return produced
+            
+            # Rendus encodés par morceaux ; le HLS réutilise celui de sa hauteur, sinon un rendu dédié
+            # (keyframes forcées : le découpage en segments se fait ensuite sans réencodage)
+            shared = self.hls_shared_rendition(renditions, hls)
+            chunk_renditions = [
+                dict(r, output_args=r.get("output_args", []) + self.hls_keyframe_args(hls)) if r is shared else r
+                for r in renditions
+            ]
+            hls_name = None
+            if hls:
+                hls_name = shared["name"] if shared else "hls"
+                if not shared:
+                    chunk_renditions.append(dict(hls["rendition"], name="hls", output_args=self.hls_keyframe_args(hls)))
+            
+            starts = [0.0] + points
+            ends = points + [duration]
+            n_chunks = len(starts)
+            threads = threads or max(1, (os.cpu_count() or 1) // workers)
+            print(f"   {n_chunks} morceaux, {workers} workers x {threads} threads")
+            
+            chunks_dir.mkdir(parents=True, exist_ok=True)
+            
+            # 1. Découpage sans décodage
+            split_cmd = [
+                'ffmpeg', '-y', '-i', input_video,
+                '-map', '0:v:0', '-c', 'copy',
+                '-f', 'segment',
+                '-segment_times', ",".join(f"{p:.6f}" for p in points),
+                '-reset_timestamps', '1',
+                str(chunks_dir / "src_%05d.mkv")
+            ]
+            result = run_ffmpeg(split_cmd, timeout=timeout)
+            sources = sorted(chunks_dir.glob("src_*.mkv"))
+            if result["returncode"] != 0 or not sources:
+                print(f"❌ Erreur découpage: {result['stderr'][-500:]}")
+                return self.sequential_fallback(input_video, output_dir, file_id, renditions, produced,
+                                                timeout, hls=hls, probe=probe, on_progress=on_progress)
+            
+            # Le muxer segment peut produire un nombre de morceaux légèrement différent
+            n_chunks = len(sources)
+            starts = starts[:n_chunks]
+            ends = (ends[:n_chunks - 1] + [duration]) if n_chunks > 1 else [duration]
+            
+            # Avancement agrégé : secondes encodées de chaque morceau / durée totale
+            chunk_positions = [0.0] * n_chunks
+            chunk_frames = [0] * n_chunks
+            progress_lock = threading.Lock()
+            
+            def chunk_progress(i):
+                def callback(fraction, stats):
+                    with progress_lock:
+                        chunk_positions[i] = min(stats["out_time"], ends[i] - starts[i])
+                        chunk_frames[i] = stats["frame"]
+                        encoded = sum(chunk_positions)
+                    if on_progress:
+                        on_progress(encoded / duration, self.job_stats(time.perf_counter() - started,
+                                                                       encoded, sum(chunk_frames)))
+                return callback
+            
+            def chunk_task(i):
+                outputs = [(r, str(chunks_dir / f"{r['name']}_{i:05d}.mp4")) for r in chunk_renditions]
+                cmd = self.build_ladder_command(str(sources[i]), outputs, audio=False, threads=threads, movflags=[])
+                res = run_ffmpeg(cmd, duration=ends[i] - starts[i], on_progress=chunk_progress(i), timeout=timeout)
+                if res["returncode"] != 0:
+                    raise RuntimeError(f"morceau {i}: {res['stderr'][-300:]}")
+                return i
+            
+            def audio_task():
+                audio_path = chunks_dir / "audio.m4a"
+                if all(r.get("mode") == "audio_copy" for r in chunk_renditions):
+                    audio_codec = ['-c:a', 'copy']
+                else:
+                    audio_codec = ['-c:a', 'aac', '-b:a', chunk_renditions[0].get("audio_bitrate", "128k")]
+                cmd = ['ffmpeg', '-y', '-i', input_video, '-vn'] + audio_codec + [str(audio_path)]
+                res = run_ffmpeg(cmd, timeout=timeout)
+                return str(audio_path) if res["returncode"] == 0 and audio_path.exists() else None
+            
+            # 2 + 3. Encodage parallèle (les threads ne font qu'attendre les process ffmpeg)
+            started = time.perf_counter()
+            failed_chunks = []
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                audio_future = pool.submit(audio_task) if probe.get("audio") else None
+                futures = [pool.submit(chunk_task, i) for i in range(n_chunks)]
                 
+                for i, future in enumerate(futures):
+                    try:
+                        future.result()
+                        print(f"   ✅ Morceau {i + 1}/{n_chunks}")
+                    except Exception as e:
+                        failed_chunks.append(i)
+                        print(f"   ❌ Morceau {i + 1}/{n_chunks}: {e}")
+                
+                try:
+                    audio_path = audio_future.result() if audio_future else None
+                except Exception as e:
+                    print(f"   ❌ Audio: {e}")
+                    audio_path = None
+            
+            encode_elapsed = time.perf_counter() - started
+            print(f"   ⏱️  {encode_elapsed:.1f}s, {duration / encode_elapsed:.2f}x temps réel")
+            if failed_chunks:
+                return self.sequential_fallback(input_video, output_dir, file_id, renditions, produced,
+                                                timeout, hls=hls, probe=probe, on_progress=on_progress)
+            
+            self.record_encode_speed(probe, chunk_renditions, encode_elapsed)
+            if on_progress:
+                on_progress(1.0, self.job_stats(encode_elapsed, duration, sum(chunk_frames)))
+            
+            # 4. Concaténation sans réencodage
+            hls_source = None
+            for rendition in chunk_renditions:
+                list_file = chunks_dir / f"{rendition['name']}.txt"
+                with open(list_file, "w", encoding="utf-8") as f:
+                    for i in range(n_chunks):
+                        f.write(f"file '{chunks_dir / (rendition['name'] + f'_{i:05d}.mp4')}'\n")
+                
+                # Le rendu HLS dédié n'est qu'une étape : concaténé dans le dossier temporaire
+                if rendition["name"] == "hls" and not shared:
+                    output_path = str(chunks_dir / "hls.mp4")
+                else:
+                    output_path = str(Path(output_dir) / f"downscaled_{rendition['name']}_{file_id}")
+                cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_file)]
+                if audio_path:
+                    cmd += ['-i', audio_path, '-map', '0:v', '-map', '1:a']
+                cmd += ['-c', 'copy'] + movflags_args() + [output_path]
+                
+                res = run_ffmpeg(cmd, timeout=timeout)
+                if res["returncode"] != 0 or not Path(output_path).exists():
+                    print(f"❌ Erreur concat {rendition['name']}: {res['stderr'][-300:]}")
+                    continue
+                if rendition["name"] == hls_name:
+                    hls_source = output_path
+                if output_path.startswith(str(chunks_dir)):
+                    continue
+                produced[rendition["name"]] = {
+                    "path": output_path,
+                    "height": rendition["height"],
+                    "mode": rendition.get("mode", "transcode"),
+                    "size": Path(output_path).stat().st_size
+                }
+                print(f"✅ {rendition['name']}: {produced[rendition['name']]['size'] / 1024 / 1024:.2f} MB")
+            
+            # 5. HLS : segments coupés aux keyframes forcées, sans réencodage
+            hls_ready = bool(hls_source) and self.package_hls(hls_source, hls, timeout)
+            
+            print()
+            return self.sequential_fallback(input_video, output_dir, file_id, renditions, produced, timeout,
+                                            hls=None if hls_ready else hls, probe=probe, on_progress=on_progress)
+        
+        except subprocess.TimeoutExpired:
+            print(f"❌ Timeout downscale parallèle (> {timeout}s par étape)")
+            return produced
+        except FileNotFoundError:
+            print(f"❌ FFmpeg non trouvé")
+            print(f"   Installe FFmpeg: https://ffmpeg.org/download.html")
+            return produced
         except Exception as e:
-            print(f"❌ Erreur: {e}")
+            print(f"❌ Erreur downscale parallèle: {e}\n")
+            import traceback
+            traceback.print_exc()
+            return produced
+        finally:
+            shutil.rmtree(chunks_dir, ignore_errors=True)
+    
+    def sequential_fallback(self, input_video: str, output_dir: str, file_id: str, renditions: list,
+                            produced: dict, timeout: int = 900, hls: dict = None, probe: dict = None,
+                            on_progress=None) -> dict:
+        """
+        Refait avec le ladder séquentiel les rendus absents de produced (et le HLS s'il est
+        demandé) ; les rendus déjà produits sont gardés tels quels.
+        """
+        missing = [r for r in renditions if r["name"] not in produced]
+        if not missing and not hls:
+            return produced
+        print(f"   ⚠️  Repli séquentiel: {', '.join(r['name'] for r in missing) or '-'}"
+              f"{' + HLS' if hls else ''}")
+        produced.update(self.pod_downscale_ladder(input_video, output_dir, file_id, missing, timeout,
+                                                  hls=hls, probe=probe, on_progress=on_progress))
+        return produced
+    
+    def package_hls(self, source: str, hls: dict, timeout: int = 900) -> bool:
+        """
+        Segmente en HLS, sans réencodage (-c copy), un MP4 déjà encodé avec une keyframe
+        toutes les segment_seconds. Retourne True si la playlist est complète.
+        """
+        Path(hls["playlist"]).parent.mkdir(parents=True, exist_ok=True)
+        cmd = ['ffmpeg', '-y', '-i', source, '-map', '0:v:0', '-map', '0:a?', '-c', 'copy', '-f', 'hls']
+        for name, value in self.hls_muxer_options(hls):
+            cmd += [f'-{name}', value]
+        cmd += [hls["playlist"]]
+        
+        res = run_ffmpeg(cmd, timeout=timeout)
+        if res["returncode"] != 0:
+            print(f"❌ Erreur segmentation HLS: {res['stderr'][-300:]}")
+            return False
+        return self.hls_complete(hls["playlist"])
+    
+    @staticmethod
+    def hls_complete(playlist: str) -> bool:
+        """Playlist terminée : le muxer n'écrit #EXT-X-ENDLIST qu'en fin d'encodage réussie"""
+        try:
+            return "#EXT-X-ENDLIST" in Path(playlist).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return False
+    
+    def extract_audio(self, video_path: str):
+        """Extrait l'audio d'une vidéo (PCM 16 kHz mono float32, en mémoire)"""
+        print(f"🔊 Extraction audio...")
+        
+        samples = load_pcm(video_path)
+        if samples is None:
+            print(f"❌ Erreur extraction audio")
             return None
+        
+        print(f"✅ Audio extrait: {len(samples) / SAMPLE_RATE:.1f}s\n")
+        return samples
     
     def pod_lang_ident(self, audio_path: str) -> str:
         """Identifie la langue"""
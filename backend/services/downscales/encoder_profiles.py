@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class EncoderProfiles:
+    """
+    Choix des réglages libx264 (preset / CRF / threads) selon un profil :
+    - throughput : le plus rapide à qualité acceptable
+    - balanced   : le plus compact parmi les réglages assez rapides
+    - archive    : la meilleure qualité parmi les réglages assez rapides
+
+    S'appuie sur les mesures de benchmark.py (débit, taille, SSIM) prises sur
+    la machine ; sans mesures, retombe sur des réglages par défaut.
+    """
+
+    PROFILES = ("throughput", "balanced", "archive")
+
+    # SSIM minimum accepté par profil
+    MIN_SSIM = {"throughput": 0.90, "balanced": 0.95, "archive": 0.97}
+
+    # Réglages utilisés tant qu'aucun benchmark n'a été lancé
+    DEFAULTS = {
+        "throughput": {"preset": "veryfast", "crf": 26, "threads": None},
+        "balanced": {"preset": "fast", "crf": 23, "threads": None},
+        "archive": {"preset": "slow", "crf": 20, "threads": None},
+    }
+
+    def __init__(self, results_path: str):
+        self.results_path = Path(results_path)
+        self._results = None
+        self._mtime = None
+
+    def results(self) -> List[Dict]:
+        """Mesures du dernier benchmark (rechargées si le fichier a changé)"""
+        if not self.results_path.exists():
+            return []
+        mtime = self.results_path.stat().st_mtime
+        if self._results is None or mtime != self._mtime:
+            try:
+                with open(self.results_path, "r", encoding="utf-8") as f:
+                    self._results = json.load(f).get("results", [])
+                self._mtime = mtime
+            except Exception as e:
+                print(f"⚠️  Benchmark encodeur illisible: {e}")
+                return []
+        return self._results
+
+    @staticmethod
+    def pixel_rate(width: float, height: float, fps: float) -> float:
+        return (width or 0) * (height or 0) * (fps or 25.0)
+
+    def estimate_speed(self, result: Dict, probe: Optional[Dict], height: int) -> float:
+        """
+        Facteur temps réel attendu pour ce job : le débit mesuré est ramené
+        au nombre de pixels à encoder par seconde de média.
+        """
+        speed = result.get("speed") or 0.0
+        if not probe or not probe.get("video") or not probe["video"].get("height"):
+            return speed
+        video = probe["video"]
+        out_height = min(height, video["height"])
+        out_width = (video.get("width") or 0) * out_height / video["height"]
+        job_rate = self.pixel_rate(out_width, out_height, video.get("fps"))
+        bench_rate = self.pixel_rate(result.get("width"), result.get("height"), result.get("source_fps"))
+        if not job_rate or not bench_rate:
+            return speed
+        return speed * bench_rate / job_rate
+
+    def select(self, profile: str, probe: Optional[Dict] = None, height: int = 360,
+               target_realtime: float = 1.0) -> Dict:
+        """
+        Retourne {"profile", "preset", "crf", "threads", "expected_speed", "source"}
+        satisfaisant le facteur temps réel demandé quand c'est possible.
+        """
+        if profile not in self.PROFILES:
+            print(f"⚠️  Profil encodeur inconnu '{profile}', utilisation de 'balanced'")
+            profile = "balanced"
+
+        candidates = []
+        for result in self.results():
+            if result.get("ssim") is None or result.get("speed") is None:
+                continue
+            candidates.append(dict(result, expected_speed=self.estimate_speed(result, probe, height)))
+
+        if not candidates:
+            return dict(self.DEFAULTS[profile], profile=profile, expected_speed=None, source="default")
+
+        fast_enough = [c for c in candidates if c["expected_speed"] >= target_realtime]
+        good = [c for c in fast_enough if c["ssim"] >= self.MIN_SSIM[profile]]
+
+        if profile == "throughput":
+            pool = [c for c in candidates if c["ssim"] >= self.MIN_SSIM[profile]] or candidates
+            best = max(pool, key=lambda c: c["expected_speed"])
+        elif not fast_enough:
+            # Aucun réglage n'atteint la cible : prendre le plus rapide
+            best = max(candidates, key=lambda c: c["expected_speed"])
+        elif profile == "balanced":
+            best = min(good or fast_enough, key=lambda c: (c["bitrate"], -c["ssim"]))
+        else:
+            best = max(good or fast_enough, key=lambda c: (c["ssim"], -c["bitrate"]))
+
+        return {
+            "profile": profile,
+            "preset": best["preset"],
+            "crf": best["crf"],
+            "threads": best.get("threads"),
+            "expected_speed": round(best["expected_speed"], 2),
+            "source": "benchmark"
+        }
+
+    @staticmethod
+    def apply(renditions: List[Dict], choice: Dict) -> List[Dict]:
+        """Applique le réglage choisi aux rendus transcodés"""
+        return [
+            dict(r, preset=choice["preset"], crf=choice["crf"], threads=choice.get("threads"))
+            for r in renditions
+        ]
@@ -0,0 +1,197 @@
+import math
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from backend.services.artifacts import ArtifactRegistry
+
+
+class FusedPreprocessor:
+    """
+    Prétraitement en une seule passe : un démuxage, un décodage, un graphe FFmpeg
+    qui produit à la fois
+      - les rendus MP4 (et la branche HLS) du downscale,
+      - le PCM 16 kHz mono pour la langue / transcription,
+      - un flux de frames brutes BGR échantillonnées, lu dans NumPy via stdout.
+    Le PCM et les frames sont inscrits dans l'ArtifactRegistry du job.
+    """
+
+    AUDIO_SAMPLE_RATE = 16000
+
+    def __init__(self, downscale, frame_fps: float = 1.0, frame_width: int = 640, max_frames: int = 24):
+        self.downscale = downscale
+        self.frame_fps = frame_fps
+        self.frame_width = frame_width
+        self.max_frames = max_frames
+
+    def frame_geometry(self, probe: dict):
+        """Taille (largeur, hauteur paires) et cadence des frames d'analyse"""
+        video = probe["video"]
+        width = min(self.frame_width, video["width"])
+        width -= width % 2
+        height = int(round(video["height"] * width / video["width"]))
+        height -= height % 2
+
+        fps = self.frame_fps
+        if probe["duration"] and self.max_frames:
+            # Borne le nombre de frames (mémoire et coût d'inférence) sur les vidéos longues
+            fps = min(fps, self.max_frames / probe["duration"])
+        return width, height, fps
+
+    def run(self, input_video: str, work_dir: str, file_id: str, renditions: list,
+            probe: dict, hls: dict = None, on_progress=None, timeout: int = 900) -> dict:
+        """
+        Lance le graphe fusionné.
+        Retourne {"renditions": {nom: {...}}, "audio": path | None, "frames": entrée | None}
+        """
+        registry = ArtifactRegistry(work_dir)
+        result = {"renditions": {}, "audio": None, "frames": None}
+
+        try:
+            print(f"\n🧩 PRÉTRAITEMENT FUSIONNÉ")
+            print(f"   Input: {input_video}")
+
+            if not probe or not Path(input_video).exists():
+                print(f"❌ Source illisible: {input_video}")
+                return result
+
+            work_dir = Path(work_dir)
+            work_dir.mkdir(parents=True, exist_ok=True)
+            outputs = [
+                (r, str(work_dir / f"downscaled_{r['name']}_{file_id}"))
+                for r in renditions
+            ]
+            if hls:
+                Path(hls["playlist"]).parent.mkdir(parents=True, exist_ok=True)
+
+            taps = []
+            audio_path = work_dir / "audio_16k.wav"
+            if probe.get("audio"):
+                taps.append({
+                    "source": "a",
+                    "filter": f"aresample={self.AUDIO_SAMPLE_RATE},aformat=sample_fmts=s16:channel_layouts=mono",
+                    "args": ['-c:a', 'pcm_s16le'],
+                    "output": str(audio_path)
+                })
+
+            frames = None
+            if probe.get("video"):
+                width, height, fps = self.frame_geometry(probe)
+                count = max(1, math.ceil(probe["duration"] * fps) + 1) if probe["duration"] else self.max_frames
+                frames_path = work_dir / "frames_bgr24.npy"
+                frames = {
+                    "path": frames_path, "width": width, "height": height, "fps": fps,
+                    "buffer": np.lib.format.open_memmap(
+                        frames_path, mode="w+", dtype=np.uint8, shape=(count, height, width, 3)
+                    )
+                }
+                taps.append({
+                    "source": "v",
+                    "filter": f"fps={fps:.6f},scale={width}:{height},format=bgr24",
+                    "args": ['-f', 'rawvideo', '-pix_fmt', 'bgr24'],
+                    "output": "pipe:1"
+                })
+
+            cmd = self.downscale.build_ladder_command(input_video, outputs, hls, taps=taps)
+            summary = [f"{len(outputs)} rendu(s)"]
+            if hls:
+                summary.append("HLS")
+            if probe.get("audio"):
+                summary.append("PCM 16 kHz")
+            if frames:
+                summary.append(f"frames {frames['width']}x{frames['height']} @ {frames['fps']:.3f} fps")
+            print(f"   🚀 1 décodage → {' + '.join(summary)}\n")
+
+            started = time.perf_counter()
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE)
+
+            # stderr drainé à part : un pipe plein bloquerait ffmpeg
+            stderr_tail = deque(maxlen=200)
+            reader = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True)
+            reader.start()
+            killer = threading.Timer(timeout, proc.kill)
+            killer.start()
+
+            received = 0
+            try:
+                if frames:
+                    buffer = frames["buffer"]
+                    frame_size = frames["width"] * frames["height"] * 3
+                    while received < len(buffer):
+                        # Lecture directe dans le memmap, sans copie intermédiaire
+                        view = memoryview(buffer[received].reshape(-1))
+                        filled = 0
+                        while filled < frame_size:
+                            n = proc.stdout.readinto(view[filled:])
+                            if not n:
+                                break
+                            filled += n
+                        if filled < frame_size:
+                            break
+                        received += 1
+                        if on_progress and probe["duration"]:
+                            position = received / frames["fps"]
+                            on_progress(min(1.0, position / probe["duration"]),
+                                        self.downscale.job_stats(time.perf_counter() - started, position, received))
+                    # Frames au-delà de l'estimation : ignorées
+                    while proc.stdout.read(1 << 20):
+                        pass
+                proc.wait()
+            finally:
+                killer.cancel()
+                reader.join(timeout=5)
+
+            elapsed = time.perf_counter() - started
+            if proc.returncode != 0:
+                print(f"❌ Erreur FFmpeg (prétraitement):")
+                print(f"   {b''.join(stderr_tail).decode(errors='replace')[-1000:]}\n")
+                return result
+
+            print(f"   ⏱️  {elapsed:.1f}s, {probe['duration'] / elapsed if elapsed else 0:.2f}x temps réel")
+            if not hls:
+                self.downscale.record_encode_speed(probe, [r for r, _ in outputs if r.get("mode") != "copy"], elapsed)
+            if on_progress:
+                on_progress(1.0, self.downscale.job_stats(elapsed, probe["duration"], received))
+
+            for rendition, output_path in outputs:
+                if Path(output_path).exists():
+                    entry = {
+                        "path": output_path,
+                        "height": rendition["height"],
+                        "mode": rendition.get("mode", "transcode"),
+                        "size": Path(output_path).stat().st_size
+                    }
+                    result["renditions"][rendition["name"]] = entry
+                    print(f"✅ {rendition['name']}: {entry['size'] / 1024 / 1024:.2f} MB")
+
+            if probe.get("audio") and audio_path.exists():
+                result["audio"] = str(audio_path)
+                registry.register("audio_pcm", str(audio_path), "audio",
+                                  sample_rate=self.AUDIO_SAMPLE_RATE, channels=1, format="wav_s16le")
+                print(f"✅ PCM 16 kHz: {audio_path.stat().st_size / 1024 / 1024:.2f} MB")
+
+            if frames and received:
+                frames["buffer"].flush()
+                result["frames"] = registry.register(
+                    "frames", str(frames["path"]), "frames",
+                    count=received, fps=frames["fps"], width=frames["width"], height=frames["height"],
+                    pix_fmt="bgr24"
+                )
+                print(f"✅ Frames: {received} x {frames['width']}x{frames['height']}")
+
+            print()
+            return result
+
+        except FileNotFoundError:
+            print(f"❌ FFmpeg non trouvé")
+            return result
+        except Exception as e:
+            print(f"❌ Erreur prétraitement: {e}\n")
+            import traceback
+            traceback.print_exc()
+            return result
@@ -0,0 +1,139 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from backend.services.animal.animal_classes import animal_ids_from_names
+from backend.services.language.languages import language_code_from_name
+
+
+class FacetIndex:
+    """
+    Index à facettes normalisées (SQLite) :
+    facette ("animal", "language") + valeur (id de classe COCO, code langue) → file_ids
+    """
+
+    FACETS = ("animal", "language")
+
+    # Version du contenu de l'index : incrémentée quand facets_of change, force une reconstruction
+    SCHEMA_VERSION = 3
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS facets (
+                    facet TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    PRIMARY KEY (facet, value, file_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS facets_by_file ON facets (file_id)")
+
+    @contextmanager
+    def _connect(self):
+        """Connexion courte : commit en fin de bloc puis fermeture"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def facets_of(video: Dict) -> List[tuple]:
+        """
+        Extrait les paires (facette, valeur) normalisées d'un enregistrement.
+        Anciens enregistrements sans animal_ids / language_code : ids déduits des noms stockés.
+        """
+        if "animal_ids" in video:
+            animal_ids = video["animal_ids"] or []
+        else:
+            animal_ids = animal_ids_from_names(video.get("animals"))
+        language_code = video.get("language_code") or language_code_from_name(video.get("language"))
+        pairs = [("animal", str(class_id)) for class_id in animal_ids]
+        if language_code:
+            pairs.append(("language", language_code))
+        return pairs
+
+    def update(self, file_id: str, video: Optional[Dict]):
+        """Remplace les facettes d'une vidéo (video=None pour la retirer)"""
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM facets WHERE file_id = ?", (file_id,))
+            if video:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO facets (facet, value, file_id) VALUES (?, ?, ?)",
+                    [(facet, value, file_id) for facet, value in self.facets_of(video)]
+                )
+
+    def rebuild(self, videos: Iterable[Dict]) -> int:
+        """Reconstruit l'index complet à partir des enregistrements"""
+        rows = [
+            (facet, value, v["file_id"])
+            for v in videos
+            for facet, value in self.facets_of(v)
+        ]
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM facets")
+            conn.executemany(
+                "INSERT OR IGNORE INTO facets (facet, value, file_id) VALUES (?, ?, ?)", rows
+            )
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        return len(rows)
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM facets LIMIT 1").fetchone() is None
+
+    def needs_rebuild(self) -> bool:
+        """Index vide ou construit par une version antérieure de facets_of"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        return version < self.SCHEMA_VERSION or self.is_empty()
+
+    @staticmethod
+    def _match_subquery(filters: Dict[str, List[str]]):
+        """
+        Sous-requête SQL des file_ids sélectionnés :
+        OU entre les valeurs d'une même facette, ET entre facettes différentes
+        """
+        clauses, params = [], []
+        for facet, values in filters.items():
+            if not values:
+                continue
+            placeholders = ", ".join("?" for _ in values)
+            clauses.append(f"SELECT file_id FROM facets WHERE facet = ? AND value IN ({placeholders})")
+            params.extend([facet, *(str(value) for value in values)])
+        return " INTERSECT ".join(clauses), params
+
+    def query(self, filters: Dict[str, List[str]]) -> Optional[Set[str]]:
+        """
+        Requête à facettes, ex. {"animal": ["22", "23"], "language": ["en"]}
+        (zèbre OU girafe, ET en anglais).
+        Retourne None si aucun filtre n'est donné (= toutes les vidéos).
+        """
+        subquery, params = self._match_subquery(filters)
+        if not subquery:
+            return None
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute(subquery, params)}
+
+    def counts(self, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, int]]:
+        """Nombre de vidéos par valeur de facette, restreint aux vidéos filtrées"""
+        subquery, params = self._match_subquery(filters or {})
+        sql = "SELECT facet, value, count(*) FROM facets"
+        if subquery:
+            sql += f" WHERE file_id IN ({subquery})"
+        sql += " GROUP BY facet, value ORDER BY facet, count(*) DESC"
+
+        result = {facet: {} for facet in self.FACETS}
+        with self._connect() as conn:
+            for facet, value, count in conn.execute(sql, params):
+                result.setdefault(facet, {})[value] = count
+        return result
@@ -4,9 +4,18 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from backend.services.storage_events import storage_events, stats_delta
+from backend.services.facet_index import FacetIndex
+
 class JSONStorage:
     """Stockage des vidéos en fichiers JSON"""
     
+    # Champs normalisés alimentant l'index à facettes
+    FACET_FIELDS = ("animal_ids", "language_code")
+    
+    # Champs ajoutés après coup : acceptés en mise à jour même sur les anciens enregistrements
+    EXTENDED_FIELDS = FACET_FIELDS + ("renditions", "hls", "metrics")
+    
     def __init__(self, storage_dir: str = None):
         self.storage_dir = Path(storage_dir) or Path("data/videos")
         self.storage_dir.mkdir(parents=True, exist_ok=True)
@@ -18,6 +27,21 @@ class JSONStorage:
         if not self.index_file.exists():
             self._save_index([])
             print(f"✅ Index créé: {self.index_file}")
+        
+        # Index à facettes partagé par toutes les instances sur ce répertoire
+        self.facets = FacetIndex(str(self.storage_dir / "facets.db"))
+        if self.facets.needs_rebuild():
+            self.facets.rebuild(self._load_index())
+    
+    def _notify(self, action: str, file_id: str, before: Optional[Dict], after: Optional[Dict]):
+        """Publie un changement d'état vers les abonnés du dashboard"""
+        storage_events.publish({
+            "type": "video",
+            "action": action,
+            "file_id": file_id,
+            "video": after,
+            "stats_delta": stats_delta(before, after)
+        })
     
     def _load_index(self) -> List[Dict]:
         """Charge l'index des vidéos"""
@@ -52,6 +76,11 @@ class JSONStorage:
                 "status": "processing",
                 "language": None,
                 "animals": None,
+                "animal_ids": [],
+                "language_code": None,
+                "renditions": {},
+                "hls": None,
+                "metrics": {},
                 "subtitles_path": None,
                 "file_size": file_size,
                 "created_at": datetime.utcnow().isoformat(),
@@ -67,6 +96,8 @@ class JSONStorage:
             index = self._load_index()
             index.append(video_data)
             self._save_index(index)
+            self.facets.update(file_id, video_data)
+            self._notify("created", file_id, None, video_data)
             
             print(f"✅ Vidéo créée: {file_id}")
             return video_data
@@ -95,11 +126,16 @@ class JSONStorage:
                 print(f"⚠️  Vidéo non trouvée: {file_id}")
                 return None
             
+            before = dict(video)
+            
             # Mettre à jour les champs
             for key, value in kwargs.items():
-                if key in video:
+                if key in video or key in self.EXTENDED_FIELDS:
                     video[key] = value
             
+            if video == before:
+                return video
+            
             # Sauvegarder le fichier JSON
             video_file = self._get_video_file(file_id)
             with open(video_file, 'w', encoding='utf-8') as f:
@@ -112,6 +148,9 @@ class JSONStorage:
                     index[i] = video
                     break
             self._save_index(index)
+            if any(before.get(f) != video.get(f) for f in self.FACET_FIELDS):
+                self.facets.update(file_id, video)
+            self._notify("updated", file_id, before, video)
             
             print(f"✅ Vidéo mise à jour: {file_id}")
             return video
@@ -128,9 +167,37 @@ class JSONStorage:
             print(f"❌ Erreur lecture vidéos: {e}")
             return []
     
+    def query_videos(self, animal_ids: List[int] = None, language_codes: List[str] = None) -> List[Dict]:
+        """Vidéos contenant l'un des animaux demandés ET dans l'une des langues demandées"""
+        try:
+            matching = self.facets.query({
+                "animal": [str(a) for a in (animal_ids or [])],
+                "language": list(language_codes or [])
+            })
+            videos = self._load_index()
+            if matching is None:
+                return videos
+            return [v for v in videos if v['file_id'] in matching]
+        except Exception as e:
+            print(f"❌ Erreur requête facettes: {e}")
+            return []
+    
+    def facet_counts(self, animal_ids: List[int] = None, language_codes: List[str] = None) -> Dict:
+        """Comptes par facette pour la sélection courante"""
+        try:
+            return self.facets.counts({
+                "animal": [str(a) for a in (animal_ids or [])],
+                "language": list(language_codes or [])
+            })
+        except Exception as e:
+            print(f"❌ Erreur comptes facettes: {e}")
+            return {"animal": {}, "language": {}}
+    
     def delete_video(self, file_id: str) -> bool:
         """Supprime une vidéo"""
         try:
+            before = self.get_video(file_id)
+            
             # Supprimer le fichier JSON
             video_file = self._get_video_file(file_id)
             if video_file.exists():
@@ -141,6 +208,10 @@ class JSONStorage:
             index = [v for v in index if v['file_id'] != file_id]
             self._save_index(index)
             
+            self.facets.update(file_id, None)
+            if before:
+                self._notify("deleted", file_id, before, None)
+            
             print(f"✅ Vidéo supprimée: {file_id}")
             return True
             
@@ -154,17 +225,20 @@ class JSONStorage:
             videos = self.get_all_videos()
             total = len(videos)
             processed = len([v for v in videos if v.get('status') == 'completed'])
-            storage = sum([v.get('file_size', 0) for v in videos]) / 1024 / 1024
+            storage_bytes = sum([v.get('file_size', 0) for v in videos])
+            storage = storage_bytes / 1024 / 1024
             
             return {
                 "total_videos": total,
                 "processed": processed,
-                "storage_used": f"{storage:.2f} MB"
+                "storage_used": f"{storage:.2f} MB",
+                "storage_bytes": storage_bytes
             }
         except Exception as e:
             print(f"❌ Erreur stats: {e}")
             return {
                 "total_videos": 0,
                 "processed": 0,
-                "storage_used": "0 MB"
+                "storage_used": "0 MB",
+                "storage_bytes": 0
             }
\ No newline at end of file
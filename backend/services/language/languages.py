@@ -0,0 +1,36 @@
+from typing import Optional
+
+# Codes de langue → libellés affichés
+LANGUAGE_MAP = {
+    'fr': 'Français 🇫🇷',
+    'en': 'Anglais 🇬🇧',
+    'es': 'Espagnol 🇪🇸',
+    'de': 'Allemand 🇩🇪',
+    'it': 'Italien 🇮🇹',
+    'pt': 'Portugais 🇵🇹',
+    'ru': 'Russe 🇷🇺',
+    'ja': 'Japonais 🇯🇵',
+    'zh': 'Chinois 🇨🇳',
+    'ar': 'Arabe 🇸🇦',
+    'ko': 'Coréen 🇰🇷',
+    'unk': 'Inconnue ❓',
+    'none': 'Aucune parole 🔇'
+}
+
+# Résultat explicite de la porte "pas de parole" (ce n'est pas une langue)
+NO_SPEECH_CODE = 'none'
+
+
+def _label_key(name: str) -> str:
+    """Libellé sans drapeau ni casse ("Français 🇫🇷" et "Français" → "français")"""
+    return " ".join(w for w in name.lower().split() if any(c.isalpha() for c in w))
+
+
+_CODES_BY_LABEL = {_label_key(name): code for code, name in LANGUAGE_MAP.items()}
+
+
+def language_code_from_name(name: Optional[str]) -> Optional[str]:
+    """Code de langue déduit d'un libellé stocké (anciens enregistrements sans language_code)"""
+    if not name:
+        return None
+    return _CODES_BY_LABEL.get(_label_key(name))
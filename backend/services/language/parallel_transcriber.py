@@ -0,0 +1,262 @@
+import math
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
+import numpy as np
+import speech_recognition as sr
+
+from backend.services.model_registry import model_registry
+from backend.utils.audio import SAMPLE_RATE, BYTES_PER_SAMPLE
+
+
+class TranscriptionBackend:
+    """
+    Interface commune des moteurs de reconnaissance.
+    segments(samples, language) reçoit un morceau PCM 16 kHz mono int16 et retourne
+    ses segments [{"start", "end", "text", "probability"}], temps relatifs au morceau
+    (liste vide si aucune parole reconnue).
+    language=None : langue détectée par le moteur (si detects_language), ajoutée
+    à chaque segment ("language").
+    """
+
+    name = "base"
+    # Appels simultanés utiles (réseau : beaucoup ; modèle local : ses workers)
+    max_workers = 1
+    # Le moteur sait reconnaître la langue lui-même (transcription sans langue imposée)
+    detects_language = False
+
+    def segments(self, samples: np.ndarray, language: str) -> list:
+        raise NotImplementedError
+
+
+class GoogleRecognizerBackend(TranscriptionBackend):
+    """API Google Speech (réseau) via SpeechRecognition : un segment par morceau, sans minutage fin"""
+
+    name = "google"
+
+    # Codes de langue de l'API Google
+    LANGUAGES = {
+        'fr': 'fr-FR', 'en': 'en-US', 'es': 'es-ES', 'de': 'de-DE', 'it': 'it-IT', 'pt': 'pt-PT',
+        'ru': 'ru-RU', 'ja': 'ja-JP', 'zh': 'zh-CN', 'ar': 'ar-SA', 'ko': 'ko-KR'
+    }
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+
+    def segments(self, samples: np.ndarray, language: str) -> list:
+        r = sr.Recognizer()
+        # Morceau construit en mémoire depuis les octets PCM : ni WAV temporaire, ni relecture
+        audio_data = sr.AudioData(samples.tobytes(), SAMPLE_RATE, BYTES_PER_SAMPLE)
+        try:
+            text = r.recognize_google(audio_data, language=self.LANGUAGES.get(language, "en-US"),
+                                      show_all=False)
+        except sr.UnknownValueError:
+            return []
+        return [{"start": 0.0, "end": len(samples) / SAMPLE_RATE, "text": text, "probability": None}]
+
+
+class WhisperBackend(TranscriptionBackend):
+    """faster-whisper local (modèle partagé du registre), hors ligne, segments minutés"""
+
+    name = "whisper"
+    detects_language = True
+
+    def __init__(self, model_size: str = "small", compute_type: str = "int8"):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        # Au-delà des workers CTranslate2 du modèle, les appels attendent leur tour
+        self.max_workers = model_registry.num_workers
+
+    def segments(self, samples: np.ndarray, language: str) -> list:
+        audio = samples.astype(np.float32) / 32768.0
+        with model_registry.use("faster_whisper", self.model_size, compute_type=self.compute_type) as model:
+            segments, info = model.transcribe(audio, language=language, beam_size=1,
+                                              condition_on_previous_text=False)
+            return [
+                {
+                    "start": float(segment.start),
+                    "end": float(segment.end),
+                    "text": segment.text.strip(),
+                    "probability": round(math.exp(segment.avg_logprob), 3),
+                    "language": info.language
+                }
+                for segment in segments if segment.text.strip()
+            ]
+
+
+class ParallelTranscriber:
+    """
+    Transcription par morceaux en parallèle, en un seul passage ASR.
+    - morceaux de chunk_seconds prolongés de overlap_seconds : un mot coupé à la
+      frontière est entendu entier dans l'un des deux morceaux
+    - morceaux répartis sur un pool de workers, résultats remis dans l'ordre
+    - recollage : chaque morceau garde les segments qui commencent dans sa part
+      propre, les mots répétés dans le chevauchement sont retirés
+    Les segments (start, end, text, language, probability) alimentent à la fois
+    la transcription, les sous-titres et la langue.
+    """
+
+    def __init__(self, backend: TranscriptionBackend, chunk_seconds: float = 30.0,
+                 overlap_seconds: float = 1.5, workers: int = None):
+        self.backend = backend
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.workers = max(1, min(workers or backend.max_workers, backend.max_workers))
+
+    def pieces(self, audio) -> Iterator[np.ndarray]:
+        """
+        Morceaux de chunk_seconds + chevauchement, à partir d'un tableau PCM (vues, sans copie)
+        ou d'un flux de blocs de chunk_seconds (PCMSource.chunks) : un seul bloc d'avance en RAM.
+        """
+        step = int(self.chunk_seconds * SAMPLE_RATE)
+        overlap = int(self.overlap_seconds * SAMPLE_RATE)
+        if isinstance(audio, np.ndarray):
+            for start in range(0, len(audio), step):
+                yield audio[start:start + step + overlap]
+            return
+
+        previous = None
+        for block in audio:
+            if previous is not None:
+                yield np.concatenate([previous, block[:overlap]])
+            previous = block
+        if previous is not None:
+            yield previous
+
+    @staticmethod
+    def _words(text: str) -> list:
+        return [re.sub(r"[^\w']", "", w.lower()) for w in text.split()]
+
+    @staticmethod
+    def dedupe(previous: str, text: str, max_overlap_words: int = 12, max_shift: int = 2) -> str:
+        """
+        Retire du début de text les mots déjà présents à la fin de previous (chevauchement audio).
+        max_shift : mots tolérés avant la reprise (mot coupé mal reconnu à la frontière)
+        """
+        words = text.split()
+        tail_words = ParallelTranscriber._words(" ".join(previous.split()[-max_overlap_words:]))
+        current = ParallelTranscriber._words(text)
+        for k in range(min(max_overlap_words, len(tail_words), len(current)), 0, -1):
+            tail = tail_words[-k:]
+            shift = next((j for j in range(min(max_shift, len(current) - k) + 1)
+                          if current[j:j + k] == tail), None)
+            if shift is not None:
+                return " ".join(words[shift + k:])
+        return text
+
+    def merge(self, index: int, segments: list, previous: dict = None) -> list:
+        """
+        Segments du morceau index en temps absolu, limités à sa part propre
+        et dédoublonnés avec le dernier segment déjà retenu (previous).
+        """
+        offset = index * self.chunk_seconds
+        merged = []
+        for segment in segments:
+            # Commence dans le chevauchement : le morceau suivant l'entend en entier
+            if segment["start"] >= self.chunk_seconds:
+                continue
+            segment = dict(segment, start=round(offset + segment["start"], 3),
+                           end=round(offset + segment["end"], 3))
+            if not merged and previous is not None:
+                segment["text"] = self.dedupe(previous["text"], segment["text"])
+                if not segment["text"]:
+                    continue
+            merged.append(segment)
+        return merged
+
+    @staticmethod
+    def dominant_language(segments: list) -> tuple:
+        """Langue qui porte le plus de durée de parole : (code, part de la durée), (None, None) sans segment"""
+        durations = {}
+        for segment in segments:
+            if segment.get("language"):
+                durations[segment["language"]] = durations.get(segment["language"], 0.0) \
+                    + max(0.0, segment["end"] - segment["start"])
+        total = sum(durations.values())
+        if not total:
+            return None, None
+        code = max(durations, key=durations.get)
+        return code, round(durations[code] / total, 3)
+
+    def transcribe(self, audio, language: str, on_segment: Callable[[dict], None] = None) -> dict:
+        """
+        Transcrit tout l'audio (PCM 16 kHz mono int16, tableau ou flux de blocs).
+        language=None : langue reconnue par le moteur sur chaque morceau
+        Au plus 2 x workers morceaux en vol : la mémoire ne dépend pas de la durée.
+        on_segment : appelé (thread de l'appelant) pour chaque segment définitif, dans l'ordre,
+                     dès que son morceau est recollé ; le dernier segment d'un morceau attend
+                     le morceau suivant, qui peut encore borner sa fin
+        Retourne {"text", "segments", "language", "language_probability",
+                  "chunks", "recognized", "workers", "elapsed_seconds"}
+        (language : langue imposée, sinon langue dominante des segments)
+        """
+        started = time.perf_counter()
+
+        def run(i, piece):
+            try:
+                segments = self.backend.segments(piece, language)
+            except sr.RequestError as e:
+                print(f"   [Chunk {i + 1}] ❌ Erreur API: {e}")
+                return []
+            except Exception as e:
+                print(f"   [Chunk {i + 1}] ❌ Erreur {self.backend.name}: {e}")
+                return []
+            text = " ".join(s["text"] for s in segments)
+            if text:
+                print(f"   [Chunk {i + 1}] ✅ Transcrit: '{text[:50]}...'")
+            else:
+                print(f"   [Chunk {i + 1}] ⚠️  Parole non reconnue")
+            return segments
+
+        segments = []
+        counts = {"chunks": 0, "recognized": 0, "emitted": 0}
+
+        def emit(final: int):
+            if on_segment is None:
+                return
+            while counts["emitted"] < final:
+                segment = segments[counts["emitted"]]
+                counts["emitted"] += 1
+                try:
+                    on_segment(dict(segment))
+                except Exception as e:
+                    print(f"   ⚠️  Diffusion segment: {e}")
+
+        def collect(future):
+            chunk_segments = future.result()
+            merged = self.merge(counts["chunks"], chunk_segments, segments[-1] if segments else None)
+            counts["chunks"] += 1
+            counts["recognized"] += 1 if chunk_segments else 0
+            for segment in merged:
+                segment["language"] = language or segment.get("language")
+                # Cues sans recouvrement : fin bornée au début du segment suivant
+                if segments and segments[-1]["end"] > segment["start"]:
+                    segments[-1]["end"] = segment["start"]
+                segments.append(segment)
+            emit(len(segments) - 1)
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for i, piece in enumerate(self.pieces(audio)):
+                pending.append(pool.submit(run, i, piece))
+                # Résultats récupérés dans l'ordre des morceaux quel que soit l'ordre de fin
+                while len(pending) >= 2 * self.workers:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+        emit(len(segments))
+
+        detected, probability = (language, None) if language else self.dominant_language(segments)
+        return {
+            "text": " ".join(s["text"] for s in segments),
+            "segments": segments,
+            "language": detected,
+            "language_probability": probability,
+            "chunks": counts["chunks"],
+            "recognized": counts["recognized"],
+            "workers": self.workers,
+            "elapsed_seconds": round(time.perf_counter() - started, 2)
+        }
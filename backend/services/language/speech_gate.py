@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+
+from backend.services.language.vad import EnergyVAD
+
+
+class SpeechGate:
+    """
+    Porte "pas de parole" : analyse audio vectorisée (une passe en flux) qui décide
+    s'il y a quelque chose à transcrire avant la langue, la transcription et les sous-titres.
+    Caractéristiques par segment d'une seconde (trames de 30 ms) :
+      - sonie : énergie moyenne (dBFS)
+      - LSTER : part de trames d'énergie < 0.5 x la moyenne du segment
+        (la parole a des pauses entre syllabes, la musique et le vent non)
+      - HZCRR : part de trames au taux de passage par zéro > 1.5 x la moyenne
+        (alternance voisé / fricatives propre à la parole)
+    Un segment audible est "parole" si LSTER et HZCRR dépassent leurs seuils, sinon "musique / ambiance".
+    """
+
+    SEGMENT_SECONDS = 1.0
+    LSTER_MIN = 0.15
+    HZCRR_MIN = 0.05
+
+    def __init__(self, min_loudness_db: float = -55.0, min_speech_ratio: float = 0.05,
+                 min_speech_seconds: float = 2.0):
+        self.vad = EnergyVAD()
+        self.min_loudness_db = min_loudness_db
+        self.min_speech_ratio = min_speech_ratio
+        self.min_speech_seconds = min_speech_seconds
+
+    def segment_features(self, energy: np.ndarray, zcr: np.ndarray) -> dict:
+        """Caractéristiques par segment (tableaux de longueur n_segments)"""
+        per_segment = max(1, int(self.SEGMENT_SECONDS / self.vad.frame_seconds))
+        n = len(energy) // per_segment
+        if not n:
+            # Audio plus court qu'un segment : un seul segment
+            per_segment, n = len(energy), 1
+        energy = energy[:n * per_segment].reshape(n, per_segment)
+        zcr = zcr[:n * per_segment].reshape(n, per_segment)
+
+        power = 10 ** (energy / 10)
+        mean_power = power.mean(axis=1, keepdims=True)
+        mean_zcr = zcr.mean(axis=1, keepdims=True)
+        return {
+            "loudness_db": 10 * np.log10(mean_power[:, 0] + 1e-10),
+            "lster": (power < 0.5 * mean_power).mean(axis=1),
+            "hzcrr": (zcr > 1.5 * mean_zcr).mean(axis=1)
+        }
+
+    def analyze(self, audio) -> dict:
+        """
+        audio : PCMSource, tableau PCM ou flux de morceaux
+        Retourne les caractéristiques globales et la décision {"speech": bool, "reason"}
+        """
+        started = time.perf_counter()
+        chunks = audio.chunks(60) if hasattr(audio, "chunks") else audio
+        features = self.vad.frame_features(chunks)
+        energy, zcr = features["energy"], features["zcr"]
+
+        if not len(energy):
+            return {"speech": False, "reason": "no_audio", "duration_seconds": 0.0,
+                    "elapsed_seconds": round(time.perf_counter() - started, 3)}
+
+        seg = self.segment_features(energy, zcr)
+        # Segment audible (seuil absolu : un fond sonore constant reste "actif")
+        active = seg["loudness_db"] >= self.min_loudness_db
+        speech = active & (seg["lster"] >= self.LSTER_MIN) & (seg["hzcrr"] >= self.HZCRR_MIN)
+        music = active & ~speech
+
+        duration = len(energy) * self.vad.frame_seconds
+        loudness = float(10 * np.log10(np.mean(10 ** (energy.astype(np.float64) / 10)) + 1e-10))
+        speech_ratio = float(speech.mean())
+        speech_seconds = float(speech.sum() * self.SEGMENT_SECONDS)
+
+        if loudness < self.min_loudness_db:
+            decision, reason = False, "silence"
+        elif speech_ratio < self.min_speech_ratio or speech_seconds < self.min_speech_seconds:
+            decision, reason = False, "music_or_ambient"
+        else:
+            decision, reason = True, "speech"
+
+        return {
+            "speech": decision,
+            "reason": reason,
+            "duration_seconds": round(duration, 2),
+            "loudness_db": round(loudness, 1),
+            "active_ratio": round(float(active.mean()), 3),
+            "speech_ratio": round(speech_ratio, 3),
+            "speech_seconds": round(speech_seconds, 1),
+            "music_ratio": round(float(music.mean()), 3),
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
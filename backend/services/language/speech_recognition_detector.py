@@ -1,203 +1,224 @@
-import os
 import speech_recognition as sr
-from pydub import AudioSegment
 from pathlib import Path
-import subprocess
+
+from backend.app.config import settings
+from backend.services.language.parallel_transcriber import (
+    GoogleRecognizerBackend, ParallelTranscriber, WhisperBackend
+)
+from backend.services.language.languages import LANGUAGE_MAP, NO_SPEECH_CODE
+from backend.services.language.vad import EnergyVAD
+from backend.services.language.whisper_language_id import WhisperLanguageID
+from backend.utils.audio import SAMPLE_RATE, BYTES_PER_SAMPLE, PCMSource
 
 class SpeechRecognitionDetector:
     """Détection de langue et transcription avec SpeechRecognition"""
     
-    LANGUAGE_MAP = {
-        'fr': 'Français 🇫🇷',
-        'en': 'Anglais 🇬🇧',
-        'es': 'Espagnol 🇪🇸',
-        'de': 'Allemand 🇩🇪',
-        'it': 'Italien 🇮🇹',
-        'pt': 'Portugais 🇵🇹',
-        'ru': 'Russe 🇷🇺',
-        'ja': 'Japonais 🇯🇵',
-        'zh': 'Chinois 🇨🇳',
-        'ar': 'Arabe 🇸🇦',
-        'ko': 'Coréen 🇰🇷',
-        'unk': 'Inconnue ❓'
-    }
+    LANGUAGE_MAP = LANGUAGE_MAP
+    
+    # Résultat explicite de la porte "pas de parole" (ce n'est pas une langue)
+    NO_SPEECH_CODE = NO_SPEECH_CODE
     
     @staticmethod
-    def extract_audio(video_path: str, audio_output: str) -> bool:
-        """Extrait l'audio avec FFmpeg"""
-        try:
-            print(f"🔊 Extraction audio...")
-            
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vn',
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                audio_output
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode == 0 and Path(audio_output).exists():
-                size_mb = Path(audio_output).stat().st_size / 1024 / 1024
-                print(f"✅ Audio extrait: {size_mb:.2f}MB\n")
-                return True
-            else:
-                print(f"❌ FFmpeg error")
-                return False
-                
-        except FileNotFoundError:
-            print("❌ FFmpeg non trouvé")
-            return False
-        except Exception as e:
-            print(f"❌ Erreur extraction: {e}")
-            return False
+    def open_audio(source: str):
+        """
+        Audio lu en flux (PCM 16 kHz mono), mémoire bornée quelle que soit la durée.
+        Retourne une PCMSource, ou None si la source n'a pas d'audio décodable.
+        """
+        audio = PCMSource(source)
+        if not audio.has_audio():
+            print(f"❌ Aucun audio décodable")
+            return None
+        mode = "memmap" if audio.native else "flux FFmpeg"
+        duration = f", {audio.duration:.1f}s" if audio.duration else ""
+        print(f"🔊 Audio: {Path(source).name} ({mode}{duration})\n")
+        return audio
     
     @staticmethod
-    def detect_language(audio_path: str) -> str:
+    def identify_window(samples, recognizer=None) -> dict:
         """
-        Détecte la langue sur un extrait audio (première 25 secondes).
-        Retourne le code langue (fr, en, unk)
+        Identifie la langue d'une fenêtre (PCM 16 kHz mono int16).
+        Retourne {code: probabilité} (vide si aucune langue reconnue)
+        """
+        if settings.LANGUAGE_ID_BACKEND == "whisper":
+            # Hors ligne : distribution complète sur LANGUAGE_MAP en une passe
+            codes = [c for c in SpeechRecognitionDetector.LANGUAGE_MAP if c != SpeechRecognitionDetector.NO_SPEECH_CODE]
+            return WhisperLanguageID.probabilities(samples, codes)
+        
+        audio = sr.AudioData(samples.tobytes(), SAMPLE_RATE, BYTES_PER_SAMPLE)
+        for code in ("fr", "en"):
+            try:
+                recognizer.recognize_google(audio, language=GoogleRecognizerBackend.LANGUAGES[code], show_all=False)
+                return {code: 1.0}
+            except sr.UnknownValueError:
+                continue
+        return {}
+    
+    @staticmethod
+    def detect_language(audio) -> tuple:
+        """
+        Détecte la langue sur les fenêtres les plus riches en parole (VAD),
+        réparties sur toute la vidéo, avec arrêt anticipé dès que le vote est sûr.
+        audio : PCMSource (VAD en flux, seules les fenêtres retenues sont relues)
+        Retourne (code de LANGUAGE_MAP, part des votes du code retenu)
         """
         r = sr.Recognizer()
-        langue_code = "unk"
         
         print(f"🗣️  Détection de langue...")
         
         try:
-            with sr.AudioFile(audio_path) as source:
-                # N'écoute que les 25 premières secondes pour la détection rapide
-                audio = r.record(source, duration=25) 
-            
-            # Tentative de détection
-            try:
-                print("   Test français...")
-                r.recognize_google(audio, language="fr-FR", show_all=False)
-                langue_code = "fr"
-                print(f"✅ Langue détectée: Français 🇫🇷\n")
-            except sr.UnknownValueError:
-                try:
-                    print("   Test anglais...")
-                    r.recognize_google(audio, language="en-US", show_all=False)
-                    langue_code = "en"
-                    print(f"✅ Langue détectée: Anglais 🇬🇧\n")
-                except:
-                    langue_code = "unk"
-                    print(f"⚠️  Langue: Inconnue ❓\n")
-            
-            return langue_code
+            windows = EnergyVAD().select_windows(
+                audio.chunks(60),
+                count=settings.LANGUAGE_ID_WINDOWS,
+                window_seconds=settings.LANGUAGE_ID_WINDOW_SECONDS
+            )
+            if not windows:
+                print(f"⚠️  Aucune parole détectée, langue: Inconnue ❓\n")
+                return "unk", None
+            
+            votes = {}
+            for i, window in enumerate(windows):
+                samples = audio.window(window["start"], window["end"] - window["start"])
+                if samples is None or not len(samples):
+                    continue
+                probs = SpeechRecognitionDetector.identify_window(samples, r)
+                for code, p in probs.items():
+                    votes[code] = votes.get(code, 0.0) + p
+                best = max(probs, key=probs.get) if probs else "?"
+                print(f"   Fenêtre {window['start']:.0f}-{window['end']:.0f}s "
+                      f"(parole {window['density']:.0%}): {best} {probs.get(best, 0):.0%}")
+                
+                # Arrêt anticipé : une langue porte l'essentiel des votes de plusieurs fenêtres
+                total = sum(votes.values())
+                if total:
+                    leader = max(votes, key=votes.get)
+                    confident = votes[leader] / total >= settings.LANGUAGE_ID_CONFIDENCE
+                    enough = votes[leader] >= settings.LANGUAGE_ID_MIN_WINDOWS * settings.LANGUAGE_ID_CONFIDENCE
+                    if confident and enough and i + 1 < len(windows):
+                        print(f"   ⏩ Vote sûr après {i + 1}/{len(windows)} fenêtre(s)")
+                        break
+            
+            if not votes:
+                print(f"⚠️  Langue: Inconnue ❓\n")
+                return "unk", None
+            
+            langue_code = max(votes, key=votes.get)
+            probability = round(votes[langue_code] / sum(votes.values()), 3)
+            print(f"✅ Langue détectée: {SpeechRecognitionDetector.LANGUAGE_MAP.get(langue_code, langue_code)} "
+                  f"({probability:.0%})\n")
+            return langue_code, probability
             
         except Exception as e:
             print(f"❌ Erreur lors de la détection de langue: {e}")
             print(f"⚠️  Utilisation du français par défaut\n")
-            return "fr"
+            return "fr", None
     
     @staticmethod
-    def transcribe_full(audio_path: str, langue_code: str) -> str:
+    def transcription_backend():
+        """Moteur de reconnaissance choisi par TRANSCRIBE_BACKEND"""
+        if settings.TRANSCRIBE_BACKEND == "whisper":
+            return WhisperBackend(model_size=settings.TRANSCRIBE_MODEL)
+        return GoogleRecognizerBackend(max_workers=settings.TRANSCRIBE_WORKERS)
+    
+    @staticmethod
+    def transcribe_full(audio, langue_code: str, on_segment=None) -> dict:
         """
-        Transcrit l'intégralité du fichier audio en divisant l'audio en morceaux (chunks).
-        Retourne le texte transcrit
+        Transcrit l'intégralité de l'audio par morceaux de 30 secondes,
+        traités en parallèle puis recollés dans l'ordre.
+        audio : PCMSource lue en flux, blocs en mémoire (aucun fichier intermédiaire)
+        on_segment : reçoit chaque segment définitif au fil de l'eau (sous-titres en direct)
+        Retourne {"text", "segments", "language", "language_probability"} :
+        segments minutés (start, end, text, language, probability) ; langue 'unk' avec un
+        moteur qui reconnaît la langue (whisper) : transcription sans langue imposée et
+        langue dominante des segments
         """
+        backend = SpeechRecognitionDetector.transcription_backend()
+        language = langue_code
         if langue_code == 'unk':
-            print("⚠️  Impossible de transcrire, langue Inconnue\n")
-            return "Impossible de transcrire, langue Inconnue"
-            
-        print(f"📝 Transcription complète en cours (langue: {langue_code})...\n")
-        r = sr.Recognizer()
-        full_transcription = []
+            if not backend.detects_language:
+                print("⚠️  Impossible de transcrire, langue Inconnue\n")
+                return {"text": "Impossible de transcrire, langue Inconnue", "segments": [],
+                        "language": 'unk', "language_probability": None}
+            # Langue non identifiée sur les fenêtres VAD : le moteur la reconnaît pendant la transcription
+            print("⚠️  Langue Inconnue : langue reconnue par la transcription\n")
+            language = None
         
-        # Définir la langue pour l'API Google
-        api_lang = "fr-FR" if langue_code == "fr" else "en-US"
+        transcriber = ParallelTranscriber(
+            backend,
+            chunk_seconds=30,
+            overlap_seconds=settings.TRANSCRIBE_OVERLAP_SECONDS,
+            workers=settings.TRANSCRIBE_WORKERS
+        )
+        print(f"📝 Transcription complète en cours (langue: {language or 'auto'}, "
+              f"{transcriber.backend.name}, {transcriber.workers} worker(s))...\n")
         
-        # Division de l'audio en morceaux de 30 secondes
-        chunk_size_ms = 30000 
-        audio = AudioSegment.from_wav(audio_path)
-        
-        # Itération sur chaque morceau
-        for i, start_ms in enumerate(range(0, len(audio), chunk_size_ms)):
-            end_ms = start_ms + chunk_size_ms
-            chunk = audio[start_ms:end_ms]
-            
-            # Sauvegarde temporaire du morceau
-            temp_dir = str(Path(audio_path).parent)
-            chunk_path = os.path.join(temp_dir, f"temp_chunk_{i}.wav")
-            chunk.export(chunk_path, format="wav")
-            
-            # Reconnaissance vocale sur le morceau
-            with sr.AudioFile(chunk_path) as source:
-                audio_data = r.record(source)
-                
-                try:
-                    text = r.recognize_google(audio_data, language=api_lang, show_all=False)
-                    full_transcription.append(text)
-                    print(f"   [Chunk {i+1}] ✅ Transcrit: '{text[:50]}...'")
-                except sr.UnknownValueValue:
-                    print(f"   [Chunk {i+1}] ⚠️  Parole non reconnue")
-                    pass
-                except sr.RequestError as e:
-                    print(f"   [Chunk {i+1}] ❌ Erreur API: {e}")
-                    pass
-            
-            # Nettoyage du fichier temporaire du chunk
-            try:
-                os.remove(chunk_path)
-            except:
-                pass
-        
-        final_text = " ".join(full_transcription)
+        result = transcriber.transcribe(audio.chunks(transcriber.chunk_seconds), language,
+                                        on_segment=on_segment)
+        final_text = result["text"]
         
         if not final_text:
             print(f"⚠️  Aucune transcription trouvée\n")
-            return "Aucune parole détectée"
+            return {"text": "Aucune parole détectée", "segments": [],
+                    "language": langue_code, "language_probability": None}
         
-        print(f"\n✅ Transcription complète: {len(final_text)} caractères\n")
+        print(f"\n✅ Transcription complète: {len(final_text)} caractères, {len(result['segments'])} segments "
+              f"({result['recognized']}/{result['chunks']} morceaux en {result['elapsed_seconds']}s)\n")
         
-        return final_text
+        return {"text": final_text, "segments": result["segments"],
+                "language": result["language"] or langue_code,
+                "language_probability": result["language_probability"]}
+    
+    @staticmethod
+    def result(lang_code: str, text: str, segments: list = None, probability: float = None) -> dict:
+        """Résultat de l'étape ASR (langue, transcription, segments minutés)"""
+        return {
+            "language": lang_code,
+            "language_name": SpeechRecognitionDetector.LANGUAGE_MAP.get(lang_code, 'Inconnue ❓'),
+            "language_probability": probability,
+            "text": text,
+            "segments": segments or []
+        }
     
     @staticmethod
-    def detect_and_transcribe(video_path: str, temp_dir: str):
-        """Détecte la langue ET transcrit la vidéo"""
+    def detect_and_transcribe(video_path: str, audio_path: str = None, on_segment=None) -> dict:
+        """
+        Détecte la langue ET transcrit la vidéo, en un seul passage ASR.
+        Retourne {"language", "language_name", "language_probability", "text", "segments"} :
+        les segments minutés servent aussi aux sous-titres (plus de seconde transcription).
+        audio_path : PCM 16 kHz mono déjà produit par le prétraitement (lu en memmap),
+                     sinon l'audio de la vidéo est décodé en flux
+        on_segment : callback par segment, appelé pendant la transcription (voir transcribe_full)
+        """
         try:
-            # Extraire l'audio
-            audio_path = str(Path(temp_dir) / "temp_audio.wav")
-            
             print("=" * 70)
             print("🎤 ÉTAPE: LANGUE + TRANSCRIPTION (SpeechRecognition)")
             print("=" * 70)
             print()
             
-            if not SpeechRecognitionDetector.extract_audio(video_path, audio_path):
+            # Audio déjà extrait : pas de nouvelle passe FFmpeg
+            source = audio_path if audio_path and Path(audio_path).exists() else video_path
+            audio = SpeechRecognitionDetector.open_audio(source)
+            if audio is None:
                 print("⚠️  Impossible d'extraire l'audio")
-                return 'fr', 'Français 🇫🇷', "Erreur extraction audio"
+                return SpeechRecognitionDetector.result('fr', "Erreur extraction audio")
             
-            # Détecter la langue
-            lang_code = SpeechRecognitionDetector.detect_language(audio_path)
-            lang_name = SpeechRecognitionDetector.LANGUAGE_MAP.get(lang_code, 'Inconnue ❓')
+            # Détecter la langue (fenêtres VAD) : langue imposée à tous les morceaux
+            lang_code, probability = SpeechRecognitionDetector.detect_language(audio)
             
-            # Transcrire
-            transcription = SpeechRecognitionDetector.transcribe_full(audio_path, lang_code)
-            
-            # Nettoyer
-            try:
-                Path(audio_path).unlink()
-            except:
-                pass
+            # Transcrire ; langue inconnue → celle reconnue par la transcription elle-même
+            transcription = SpeechRecognitionDetector.transcribe_full(audio, lang_code, on_segment)
+            if transcription["language"] != lang_code:
+                lang_code, probability = transcription["language"], transcription["language_probability"]
+                print(f"✅ Langue reconnue par la transcription: "
+                      f"{SpeechRecognitionDetector.LANGUAGE_MAP.get(lang_code, lang_code)}")
             
             print("=" * 70)
             print()
             
-            return lang_code, lang_name, transcription
+            return SpeechRecognitionDetector.result(lang_code, transcription["text"], transcription["segments"],
+                                                    probability)
             
         except Exception as e:
             print(f"❌ Erreur: {e}")
             import traceback
             traceback.print_exc()
-            return 'fr', 'Français 🇫🇷', "Erreur"
+            return SpeechRecognitionDetector.result('fr', "Erreur")
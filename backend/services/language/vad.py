@@ -0,0 +1,110 @@
+import numpy as np
+
+from backend.utils.audio import SAMPLE_RATE
+
+
+class EnergyVAD:
+    """
+    Détection d'activité vocale par énergie, en CPU pur (NumPy).
+    - trames de 30 ms, énergie en dBFS
+    - seuil adaptatif : plancher de bruit (percentile bas) + marge
+    - la parole alterne syllabes et micro-pauses : une fenêtre est notée sur
+      sa densité de trames actives ET la modulation de son énergie, ce qui
+      écarte la musique continue et le silence des génériques
+    """
+
+    def __init__(self, frame_ms: int = 30, margin_db: float = 10.0, min_db: float = -50.0,
+                 sample_rate: int = SAMPLE_RATE):
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.frame_seconds = frame_ms / 1000
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.sample_rate = sample_rate
+
+    def frame_features(self, audio, block_seconds: int = 60) -> dict:
+        """
+        Énergie (dBFS) et taux de passage par zéro de chaque trame.
+        audio : tableau PCM ou itérable de morceaux (flux) ; traité par blocs, mémoire bornée
+        """
+        chunks = audio
+        if isinstance(audio, np.ndarray):
+            block = block_seconds * self.sample_rate
+            chunks = (audio[i:i + block] for i in range(0, len(audio), block))
+
+        energies, zcrs = [], []
+        carry = np.zeros(0, dtype=np.float32)
+        for chunk in chunks:
+            scale = 32768.0 if chunk.dtype == np.int16 else 1.0
+            # Reste de trame du morceau précédent + morceau courant
+            data = np.concatenate([carry, np.asarray(chunk, dtype=np.float32) / scale])
+            usable = len(data) - len(data) % self.frame_samples
+            if usable:
+                frames = data[:usable].reshape(-1, self.frame_samples)
+                energies.append((10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)).astype(np.float32))
+                signs = np.signbit(frames)
+                zcrs.append(np.mean(signs[:, 1:] != signs[:, :-1], axis=1).astype(np.float32))
+            carry = data[usable:]
+
+        if not energies:
+            empty = np.zeros(0, dtype=np.float32)
+            return {"energy": empty, "zcr": empty}
+        return {"energy": np.concatenate(energies), "zcr": np.concatenate(zcrs)}
+
+    def frame_energy(self, audio, block_seconds: int = 60) -> np.ndarray:
+        """Énergie (dBFS) de chaque trame"""
+        return self.frame_features(audio, block_seconds)["energy"]
+
+    def speech_mask(self, energy: np.ndarray) -> np.ndarray:
+        """Trames au-dessus du seuil adaptatif"""
+        if not len(energy):
+            return np.zeros(0, dtype=bool)
+        threshold = max(self.min_db, float(np.percentile(energy, 10)) + self.margin_db)
+        return energy > threshold
+
+    def select_windows(self, audio, count: int = 4, window_seconds: float = 10.0,
+                       min_density: float = 0.3) -> list:
+        """
+        Choisit jusqu'à count fenêtres riches en parole, réparties sur toute la durée
+        (une par zone), triées de la plus dense à la moins dense.
+        audio : tableau PCM ou flux de morceaux (seule l'énergie par trame est conservée)
+        Retourne [{"start", "end", "density", "score"}] en secondes.
+        """
+        energy = self.frame_energy(audio)
+        mask = self.speech_mask(energy)
+        win = max(1, int(window_seconds / self.frame_seconds))
+        if len(mask) < win:
+            # Audio plus court qu'une fenêtre : on le prend entier s'il contient de la parole
+            density = float(mask.mean()) if len(mask) else 0.0
+            if density < min_density:
+                return []
+            return [{"start": 0.0, "end": round(len(mask) * self.frame_seconds, 2),
+                     "density": round(density, 3), "score": round(density, 3)}]
+
+        # Densité et modulation (écart-type de l'énergie) sur fenêtres glissantes, pas d'une demi-fenêtre
+        step = max(1, win // 2)
+        starts = np.arange(0, len(mask) - win + 1, step)
+        active = np.concatenate([[0], np.cumsum(mask)])
+        density = (active[starts + win] - active[starts]) / win
+        e = np.concatenate([[0.0], np.cumsum(energy, dtype=np.float64)])
+        e2 = np.concatenate([[0.0], np.cumsum(energy.astype(np.float64) ** 2)])
+        mean = (e[starts + win] - e[starts]) / win
+        std = np.sqrt(np.maximum(0.0, (e2[starts + win] - e2[starts]) / win - mean ** 2))
+        # ~6 dB d'écart-type : modulation syllabique typique ; au-delà, pas de bonus
+        score = density * np.minimum(1.0, std / 6.0)
+
+        windows = []
+        zones = np.array_split(np.arange(len(starts)), min(count, len(starts)))
+        for zone in zones:
+            if not len(zone):
+                continue
+            best = zone[np.argmax(score[zone])]
+            if density[best] < min_density:
+                continue
+            start = float(starts[best] * self.frame_seconds)
+            windows.append({
+                "start": round(start, 2),
+                "end": round(start + win * self.frame_seconds, 2),
+                "density": round(float(density[best]), 3),
+                "score": round(float(score[best]), 3)
+            })
+        return sorted(windows, key=lambda w: w["score"], reverse=True)
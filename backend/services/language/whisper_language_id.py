@@ -0,0 +1,50 @@
+import numpy as np
+
+from backend.app.config import settings
+from backend.services.model_registry import model_registry
+
+
+class WhisperLanguageID:
+    """
+    Identification de langue hors ligne : tête de langue de Whisper (faster-whisper)
+    appliquée au log-mel d'une fenêtre de 30 s max.
+    Un seul passage encodeur + décodeur d'un token donne la distribution sur
+    toutes les langues ; le modèle vient du registre partagé par le process.
+    """
+
+    @staticmethod
+    def model_spec() -> tuple:
+        """Clé du modèle dans le registre partagé"""
+        return ("faster_whisper", settings.LANGUAGE_ID_MODEL, "cpu", "int8")
+
+    @classmethod
+    def probabilities(cls, samples: np.ndarray, codes) -> dict:
+        """
+        Distribution de probabilités sur codes (ex. clés de LANGUAGE_MAP).
+        samples : PCM 16 kHz mono int16 ou float32 (fréquence attendue par Whisper)
+        La masse des langues hors liste est rapportée sur "unk" si présent.
+        """
+        with model_registry.use(*cls.model_spec()) as model:
+            return cls._probabilities(model, samples, codes)
+
+    @staticmethod
+    def _probabilities(model, samples: np.ndarray, codes) -> dict:
+        audio = np.asarray(samples, dtype=np.float32)
+        if samples.dtype == np.int16:
+            audio = audio / 32768.0
+
+        extractor = model.feature_extractor
+        audio = audio[:extractor.n_samples]
+        if len(audio) < extractor.n_samples:
+            audio = np.pad(audio, (0, extractor.n_samples - len(audio)))
+        features = extractor(audio)[:, :extractor.nb_max_frames]
+
+        encoder_output = model.encode(features)
+        results = model.model.detect_language(encoder_output)[0]
+
+        # Tokens "<|fr|>" → "fr"
+        all_probs = {token[2:-2]: prob for token, prob in results}
+        probs = {code: float(all_probs.get(code, 0.0)) for code in codes if code != "unk"}
+        if "unk" in codes:
+            probs["unk"] = max(0.0, 1.0 - sum(probs.values()))
+        return probs
@@ -0,0 +1,225 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from backend.app.config import settings
+from backend.services.cpu_budget import cpu_budget
+
+
+def _rss_mb() -> float:
+    """Mémoire résidente du process (Linux), 0 si indisponible"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+        return pages * resource.getpagesize() / 1024 / 1024
+    except (OSError, ValueError, IndexError, ImportError):
+        return 0.0
+
+
+class ModelRegistry:
+    """
+    Registre de modèles partagé par tout le process.
+    Clé : (famille, taille, device, compute_type).
+    - chargement paresseux au premier usage, préchargement optionnel au démarrage
+    - une seule instance par clé, partagée entre jobs (accès exclusif sur demande)
+    - éviction LRU des modèles inutilisés quand le budget mémoire est dépassé
+    - temps de chargement, hits / misses et mémoire par modèle pour les métriques
+    """
+
+    # Empreinte mémoire estimée (MB, CPU) avant le premier chargement ; mesurée ensuite
+    ESTIMATED_MB = {
+        "tiny": 150, "base": 300, "small": 1000, "medium": 3000,
+        "large": 6000, "large-v2": 6000, "large-v3": 6000
+    }
+
+    def __init__(self, memory_budget_mb: int = 4096, cpu_threads: int = 0, num_workers: int = 1,
+                 budget=None):
+        self.memory_budget_mb = memory_budget_mb
+        # Threads CTranslate2 par worker, fixés au chargement du modèle partagé.
+        # 0 : part du budget CPU au moment du chargement, répartie entre les num_workers
+        # (un modèle partagé n'exécute jamais plus de num_workers appels à la fois)
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        print(f"✅ ModelRegistry: budget {memory_budget_mb} MB, {num_workers} worker(s), "
+              f"{cpu_threads or ('budget CPU' if budget else 'auto')} thread(s) par worker")
+
+    # ---------- chargeurs par famille ----------
+
+    def _load(self, family: str, size: str, device: str, compute_type: str, cpu_threads: int = 0):
+        if family == "whisper":
+            import whisper
+            return whisper.load_model(size, device=device)
+        if family == "faster_whisper":
+            from faster_whisper import WhisperModel
+            return WhisperModel(size, device=device, compute_type=compute_type,
+                                cpu_threads=cpu_threads, num_workers=self.num_workers)
+        raise ValueError(f"Famille de modèle inconnue: {family}")
+
+    def load_threads(self) -> int:
+        """Threads par worker d'un modèle chargé maintenant (0 : défaut de la bibliothèque)"""
+        if self.cpu_threads or self.budget is None:
+            return self.cpu_threads
+        return self.budget.threads_for("whisper", workers=self.num_workers)
+
+    def estimate_mb(self, family: str, size: str, compute_type: str) -> float:
+        estimate = self.ESTIMATED_MB.get(size, 1000)
+        if family == "faster_whisper" and compute_type == "int8":
+            estimate /= 2
+        return estimate
+
+    # ---------- accès ----------
+
+    def get(self, family: str, size: str, device: str = "cpu", compute_type: str = "default"):
+        """Modèle partagé (chargé si besoin)"""
+        return self._acquire((family, size, device, compute_type), pin=False)["model"]
+
+    @contextmanager
+    def use(self, family: str, size: str, device: str = "cpu", compute_type: str = "default",
+            exclusive: bool = False):
+        """
+        Modèle réservé pendant le bloc : il ne peut pas être évincé.
+        exclusive : un seul appelant à la fois (modèles torch non réentrants)
+        """
+        entry = self._acquire((family, size, device, compute_type), pin=True)
+        try:
+            if exclusive:
+                with entry["lock"]:
+                    yield entry["model"]
+            else:
+                yield entry["model"]
+        finally:
+            with self._lock:
+                entry["in_use"] -= 1
+
+    def _hit(self, key: Tuple, entry: Dict, pin: bool) -> Dict:
+        """Modèle déjà chargé (appelé sous _lock)"""
+        self._entries.move_to_end(key)
+        entry["hits"] += 1
+        entry["last_used"] = time.time()
+        self._counters["hits"] += 1
+        if pin:
+            entry["in_use"] += 1
+        return entry
+
+    def _acquire(self, key: Tuple, pin: bool) -> Dict:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                return self._hit(key, entry, pin)
+
+        # Chargements sérialisés : évite les doublons et fiabilise la mesure mémoire
+        with self._load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry:
+                    return self._hit(key, entry, pin)
+                self._counters["misses"] += 1
+                self._evict(self.estimate_mb(key[0], key[1], key[3]))
+
+            family, size, device, compute_type = key
+            print(f"📦 Chargement modèle {family}/{size} ({device}, {compute_type})...")
+            cpu_threads = self.load_threads()
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            model = self._load(family, size, device, compute_type, cpu_threads)
+            load_seconds = time.perf_counter() - started
+            measured = _rss_mb() - rss_before
+            estimate = self.estimate_mb(family, size, compute_type)
+            # Mesure faussée (poids mappés paresseusement, chargement concurrent ailleurs) : estimation
+            memory_mb = measured if measured >= estimate / 4 else estimate
+
+            entry = {
+                "model": model,
+                "lock": threading.RLock(),
+                "memory_mb": round(memory_mb, 1),
+                "load_seconds": round(load_seconds, 2),
+                "cpu_threads": cpu_threads,
+                "loaded_at": time.time(),
+                "last_used": time.time(),
+                "hits": 0,
+                "in_use": 1 if pin else 0
+            }
+            with self._lock:
+                self._entries[key] = entry
+            print(f"✅ Modèle {family}/{size} chargé en {load_seconds:.1f}s (~{entry['memory_mb']:.0f} MB)")
+            return entry
+
+    def _evict(self, needed_mb: float):
+        """LRU : libère les modèles inutilisés jusqu'à faire de la place (appelé sous _lock)"""
+        used = sum(e["memory_mb"] for e in self._entries.values())
+        for key in list(self._entries):
+            if used + needed_mb <= self.memory_budget_mb:
+                return
+            entry = self._entries[key]
+            if entry["in_use"]:
+                continue
+            del self._entries[key]
+            used -= entry["memory_mb"]
+            self._counters["evictions"] += 1
+            print(f"♻️  Modèle évincé (LRU): {key[0]}/{key[1]} ({entry['memory_mb']:.0f} MB)")
+            gc.collect()
+        if used + needed_mb > self.memory_budget_mb:
+            print(f"⚠️  Budget mémoire modèles dépassé: {used + needed_mb:.0f}/{self.memory_budget_mb} MB")
+
+    def warmup(self, specs: List[str]):
+        """
+        Précharge en arrière-plan des modèles "famille:taille[:compute_type]"
+        (ex. "faster_whisper:small:int8"), pour que le premier job n'attende pas.
+        """
+        def load():
+            for spec in specs:
+                parts = spec.strip().split(":")
+                if len(parts) < 2:
+                    continue
+                try:
+                    self.get(parts[0], parts[1], compute_type=parts[2] if len(parts) > 2 else "default")
+                except Exception as e:
+                    print(f"⚠️  Préchargement {spec}: {e}")
+        if specs:
+            threading.Thread(target=load, daemon=True).start()
+
+    def threads_of(self, family: str, size: str, device: str = "cpu", compute_type: str = "default"):
+        """Threads par worker du modèle tel qu'il a été chargé (None s'il n'est pas chargé)"""
+        with self._lock:
+            entry = self._entries.get((family, size, device, compute_type))
+            return entry["cpu_threads"] if entry else None
+
+    def stats(self) -> Dict:
+        """Métriques : modèles chargés, mémoire, temps de chargement, taux de hit"""
+        with self._lock:
+            counters = dict(self._counters)
+            models = [
+                {
+                    "family": key[0], "size": key[1], "device": key[2], "compute_type": key[3],
+                    "memory_mb": e["memory_mb"], "load_seconds": e["load_seconds"],
+                    "cpu_threads": e["cpu_threads"],
+                    "hits": e["hits"], "in_use": e["in_use"],
+                    "loaded_at": e["loaded_at"], "last_used": e["last_used"]
+                }
+                for key, e in self._entries.items()
+            ]
+        requests = counters["hits"] + counters["misses"]
+        return {
+            "memory_budget_mb": self.memory_budget_mb,
+            "memory_used_mb": round(sum(m["memory_mb"] for m in models), 1),
+            "hit_rate": round(counters["hits"] / requests, 3) if requests else None,
+            **counters,
+            "models": models
+        }
+
+
+# Instance unique : un modèle de chaque clé pour tout le process
+model_registry = ModelRegistry(
+    memory_budget_mb=settings.MODEL_MEMORY_BUDGET_MB,
+    num_workers=settings.MODEL_NUM_WORKERS,
+    budget=cpu_budget
+)
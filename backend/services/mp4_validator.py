@@ -0,0 +1,117 @@
+import fnmatch
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from backend.app.config import settings
+from backend.utils.mp4_layout import mp4_layout, remux_faststart
+
+
+class MP4Validator:
+    """
+    Vérifie que les MP4 produits (downscale, fusion sous-titres) sont lisibles
+    progressivement, et remuxe en arrière-plan ceux dont le moov est en fin de fichier.
+    """
+
+    # Fichiers produits par le traitement (les originaux uploadés ne sont pas modifiés)
+    PATTERNS = ("downscaled_*", "merged_*.mp4", "final_*.mp4")
+
+    # Un fichier modifié récemment est peut-être encore en cours d'écriture
+    MIN_AGE_SECONDS = 60
+
+    def __init__(self, roots: List[str], layout: str = "faststart"):
+        self.roots = [Path(r) for r in roots]
+        self.layout = layout
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._thread = None
+        self.last_run = None
+
+    def _candidates(self) -> List[Path]:
+        files = []
+        for root in self.roots:
+            if not root.exists():
+                continue
+            for path in root.rglob("*"):
+                if path.is_file() and not path.name.startswith("temp_") \
+                        and any(fnmatch.fnmatch(path.name, p) for p in self.PATTERNS):
+                    files.append(path)
+        return files
+
+    def scan(self) -> Dict:
+        """Rapport : disposition de chaque MP4 produit"""
+        counts = {"faststart": 0, "fragmented": 0, "tail": 0, "unknown": 0}
+        needs_remux = []
+        for path in self._candidates():
+            layout = mp4_layout(str(path)) or "unknown"
+            counts[layout] += 1
+            if layout == "tail":
+                needs_remux.append(str(path))
+        return {
+            "layout": self.layout,
+            "counts": counts,
+            "needs_remux": needs_remux,
+            "running": self.running,
+            "last_run": self.last_run
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def ensure(self, path: str):
+        """Planifie le remux d'un fichier servi s'il n'est pas fast-start"""
+        if mp4_layout(str(path)) == "tail":
+            with self._lock:
+                self._pending.add(str(path))
+            self.start()
+
+    def start(self, full_scan: bool = False) -> bool:
+        """Lance le remux en arrière-plan (un seul thread à la fois)"""
+        if full_scan:
+            with self._lock:
+                self._pending.update(self.scan()["needs_remux"])
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+        return True
+
+    def _worker(self):
+        fixed, failed, deferred = 0, 0, 0
+        started = time.time()
+        while True:
+            with self._lock:
+                if not self._pending:
+                    break
+                path = self._pending.pop()
+
+            source = Path(path)
+            if not source.exists():
+                continue
+            if time.time() - source.stat().st_mtime < self.MIN_AGE_SECONDS:
+                deferred += 1
+                continue
+            if mp4_layout(path) != "tail":
+                continue
+
+            print(f"🔧 Remux fast-start: {source.name}")
+            if remux_faststart(path, self.layout):
+                fixed += 1
+            else:
+                failed += 1
+
+        self.last_run = {
+            "finished_at": time.time(),
+            "elapsed_seconds": round(time.time() - started, 2),
+            "remuxed": fixed,
+            "failed": failed,
+            "deferred": deferred
+        }
+        print(f"✅ Validation MP4: {fixed} remuxé(s), {failed} échec(s), {deferred} reporté(s)")
+
+
+# Instance unique : un seul thread de remux pour tout le process
+mp4_validator = MP4Validator([str(settings.DATA_DIR)])
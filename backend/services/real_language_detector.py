@@ -1,5 +1,5 @@
-import subprocess
-from pathlib import Path
+from backend.services.model_registry import model_registry
+from backend.utils.audio import SAMPLE_RATE, load_pcm
 
 class RealLanguageDetector:
     """Détecteur de langue via Whisper"""
@@ -19,61 +19,19 @@ class RealLanguageDetector:
     }
     
     @staticmethod
-    def extract_audio_ffmpeg(video_path: str, audio_output: str) -> bool:
-        """Extrait l'audio avec FFmpeg"""
+    def detect_language_whisper(audio) -> tuple:
+        """Détecte la langue avec Whisper (audio : PCM 16 kHz float32)"""
         try:
-            print(f"🔊 Extraction audio: {video_path}")
-            
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vn',
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                audio_output
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode == 0 and Path(audio_output).exists():
-                size_mb = Path(audio_output).stat().st_size / 1024 / 1024
-                print(f"✅ Audio extrait: {size_mb:.2f}MB")
-                return True
-            else:
-                print(f"❌ FFmpeg error: {result.stderr[:200]}")
-                return False
-                
-        except FileNotFoundError:
-            print("❌ FFmpeg non trouvé")
-            print("   Windows: choco install ffmpeg")
-            print("   Linux: sudo apt-get install ffmpeg")
-            return False
-        except Exception as e:
-            print(f"❌ Erreur extraction: {e}")
-            return False
-    
-    @staticmethod
-    def detect_language_whisper(audio_path: str) -> tuple:
-        """Détecte la langue avec Whisper"""
-        try:
-            print(f"🎧 Analyse audio avec Whisper: {audio_path}")
+            print(f"🎧 Analyse audio avec Whisper: {len(audio) / SAMPLE_RATE:.1f}s")
             
             import whisper
             
-            print("   Chargement du modèle Whisper...")
-            model = whisper.load_model("base")
-            
             print("   Détection de la langue...")
-            result = model.detect_language(audio_path)
+            with model_registry.use("whisper", "base", exclusive=True) as model:
+                mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)).to(model.device)
+                _, probs = model.detect_language(mel)
             
-            lang_code = result
+            lang_code = max(probs, key=probs.get)
             lang_name = RealLanguageDetector.LANGUAGE_MAP.get(
                 lang_code,
                 (lang_code, lang_code)
@@ -91,20 +49,14 @@ class RealLanguageDetector:
     def detect_from_video(video_path: str) -> tuple:
         """Détecte la langue d'une vidéo"""
         try:
-            audio_path = str(Path(video_path).parent / f"{Path(video_path).stem}_temp.wav")
+            # Whisper n'écoute que 30 s : inutile de décoder le reste
+            audio = load_pcm(video_path, duration=30)
             
-            if not RealLanguageDetector.extract_audio_ffmpeg(video_path, audio_path):
+            if audio is None:
                 print("⚠️  Impossible d'extraire l'audio, langue par défaut")
                 return 'fr', 'Français'
             
-            lang_code, lang_name = RealLanguageDetector.detect_language_whisper(audio_path)
-            
-            try:
-                Path(audio_path).unlink()
-            except:
-                pass
-            
-            return lang_code, lang_name
+            return RealLanguageDetector.detect_language_whisper(audio)
             
         except Exception as e:
             print(f"❌ Erreur détection: {e}")
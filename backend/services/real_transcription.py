@@ -1,60 +1,21 @@
-import subprocess
-from pathlib import Path
+from backend.services.model_registry import model_registry
+from backend.utils.audio import load_pcm
 
 class RealTranscription:
     """Transcription vidéo en texte avec Whisper"""
     
     @staticmethod
-    def extract_audio_ffmpeg(video_path: str, audio_output: str) -> bool:
-        """Extrait l'audio"""
-        try:
-            print(f"🔊 Extraction audio: {video_path}")
-            
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vn',
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                audio_output
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode == 0 and Path(audio_output).exists():
-                print(f"✅ Audio extrait")
-                return True
-            return False
-            
-        except FileNotFoundError:
-            print("❌ FFmpeg non trouvé")
-            return False
-        except Exception as e:
-            print(f"❌ Erreur: {e}")
-            return False
-    
-    @staticmethod
-    def transcribe_with_whisper(audio_path: str, language_code: str = None) -> str:
-        """Transcrit l'audio avec Whisper"""
+    def transcribe_with_whisper(audio, language_code: str = None) -> str:
+        """Transcrit l'audio avec Whisper (PCM 16 kHz float32 ou chemin)"""
         try:
             print(f"🎤 Transcription avec Whisper...")
             
-            import whisper
-            
-            model = whisper.load_model("base")
-            
             options = {"fp16": False}
             if language_code:
                 options["language"] = language_code
             
-            result = model.transcribe(audio_path, **options)
+            with model_registry.use("whisper", "base", exclusive=True) as model:
+                result = model.transcribe(audio, **options)
             
             transcription = result["text"]
             print(f"✅ Transcription complétée: {len(transcription)} caractères")
@@ -69,19 +30,12 @@ class RealTranscription:
     def transcribe_video(video_path: str, language_code: str = 'fr') -> str:
         """Transcrit une vidéo en texte"""
         try:
-            audio_path = str(Path(video_path).parent / f"{Path(video_path).stem}_temp.wav")
+            audio = load_pcm(video_path)
             
-            if not RealTranscription.extract_audio_ffmpeg(video_path, audio_path):
+            if audio is None:
                 return "Erreur extraction audio"
             
-            transcription = RealTranscription.transcribe_with_whisper(audio_path, language_code)
-            
-            try:
-                Path(audio_path).unlink()
-            except:
-                pass
-            
-            return transcription
+            return RealTranscription.transcribe_with_whisper(audio, language_code)
             
         except Exception as e:
             print(f"❌ Erreur: {e}")
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class StorageEventBus:
+    """Diffusion des changements du stockage vers les abonnés (SSE dashboard)"""
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        """Crée une file d'événements pour un client (à appeler depuis la boucle asyncio)"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.append((loop, queue))
+        print(f"📡 Abonné ajouté ({len(self._subscribers)} actifs)")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Retire un abonné"""
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+        print(f"📡 Abonné retiré ({len(self._subscribers)} actifs)")
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: Dict):
+        """
+        Publie un événement à tous les abonnés.
+        Sans abonné, ne fait rien : aucun coût quand personne n'écoute.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._enqueue, queue, event)
+            except RuntimeError:
+                # Boucle fermée : l'abonné sera retiré à la déconnexion
+                pass
+
+    @staticmethod
+    def _enqueue(queue: asyncio.Queue, event: Dict):
+        """Ajoute l'événement; si le client est trop lent, on lui demande une resynchronisation"""
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+
+
+def stats_delta(before: Optional[Dict], after: Optional[Dict]) -> Dict:
+    """Calcule la variation des statistiques entre deux versions d'un enregistrement"""
+    def contribution(video: Optional[Dict]) -> Tuple[int, int, int]:
+        if not video:
+            return 0, 0, 0
+        processed = 1 if video.get('status') == 'completed' else 0
+        return 1, processed, video.get('file_size') or 0
+
+    total_b, processed_b, size_b = contribution(before)
+    total_a, processed_a, size_a = contribution(after)
+
+    return {
+        "total_videos": total_a - total_b,
+        "processed": processed_a - processed_b,
+        "storage_bytes": size_a - size_b
+    }
+
+
+# Instance unique partagée par tous les JSONStorage du processus
+storage_events = StorageEventBus()
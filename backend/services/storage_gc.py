@@ -0,0 +1,245 @@
+import fnmatch
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+
+class StorageGC:
+    """Rétention du stockage : orphelins, fichiers temporaires et quota disque (LRU)"""
+
+    # Sous-répertoires de DATA_DIR qui ne sont pas des répertoires de travail
+    RESERVED_DIRS = {"videos", "index", "temp"}
+
+    # Fichiers temporaires laissés par un traitement interrompu
+    TEMP_PATTERNS = ("temp_*",)
+
+    # Artefacts régénérables à partir de l'original (évincés en premier)
+    REGENERABLE_PATTERNS = ("downscaled_*", "hls", "*.wav", "frames*")
+
+    def __init__(self, storage, uploads_dir: str, data_dir: str, quota_bytes: int,
+                 temp_max_age: int = 3600, evict_originals: bool = False,
+                 processing_max_age: int = 21600):
+        self.storage = storage
+        self.uploads_dir = Path(uploads_dir)
+        self.data_dir = Path(data_dir)
+        self.quota_bytes = quota_bytes
+        self.temp_max_age = temp_max_age
+        self.evict_originals = evict_originals
+        # Au-delà, un job "processing" sans activité est considéré comme planté
+        self.processing_max_age = processing_max_age
+
+    @staticmethod
+    def work_dir_name(file_id: str) -> str:
+        """Même convention que file_utils.get_work_dir"""
+        return file_id.replace(".", "_")
+
+    @staticmethod
+    def _matches(path: Path, patterns) -> bool:
+        return any(fnmatch.fnmatch(path.name, p) for p in patterns)
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        if path.is_file():
+            return path.stat().st_size
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+    @staticmethod
+    def _last_used(path: Path) -> float:
+        """Dernier accès connu (atime peut être figé selon le montage, d'où le max avec mtime)"""
+        files = [path] if path.is_file() else [f for f in path.rglob("*") if f.is_file()]
+        if not files:
+            st = path.stat()
+            return max(st.st_atime, st.st_mtime)
+        return max(max(f.stat().st_atime, f.stat().st_mtime) for f in files)
+
+    def _item(self, path: Path, kind: str, reason: str, file_id: str = None) -> Dict:
+        return {
+            "path": str(path),
+            "kind": kind,
+            "reason": reason,
+            "file_id": file_id,
+            "size": self._size(path),
+            "last_used": self._last_used(path)
+        }
+
+    def _busy(self, video: Dict, now: float) -> bool:
+        """
+        Vidéo en cours de traitement : statut "processing" ET activité récente (création
+        du job ou écriture dans son répertoire de travail depuis moins de processing_max_age).
+        Un job planté en cours de route redevient ainsi récupérable.
+        """
+        if video.get('status') != 'processing':
+            return False
+        activity = []
+        try:
+            created = datetime.fromisoformat(video['created_at'])
+            # created_at est écrit en UTC sans fuseau
+            activity.append(created.replace(tzinfo=created.tzinfo or timezone.utc).timestamp())
+        except (KeyError, TypeError, ValueError):
+            pass
+        work_dir = self.data_dir / self.work_dir_name(video['file_id'])
+        if work_dir.is_dir():
+            activity.append(self._last_used(work_dir))
+        if not activity:
+            return True
+        return now - max(activity) <= self.processing_max_age
+
+    def _work_dirs(self) -> List[Path]:
+        if not self.data_dir.exists():
+            return []
+        return [d for d in self.data_dir.iterdir() if d.is_dir() and d.name not in self.RESERVED_DIRS]
+
+    def usage(self) -> int:
+        """Octets occupés par les uploads et les répertoires de travail"""
+        total = 0
+        for root in (self.uploads_dir, self.data_dir):
+            if root.exists():
+                total += sum(f.stat().st_size for f in root.rglob("*") if f.is_file())
+        return total
+
+    def plan(self) -> Dict:
+        """Calcule ce qui serait libéré, sans rien supprimer"""
+        now = time.time()
+        videos = self.storage.get_all_videos()
+        by_work_dir = {self.work_dir_name(v['file_id']): v for v in videos}
+        known_uploads = {v['file_id'] for v in videos}
+        busy = {v['file_id'] for v in videos if self._busy(v, now)}
+
+        items = []
+
+        # 1. Répertoires de travail sans enregistrement
+        for work_dir in self._work_dirs():
+            if work_dir.name not in by_work_dir and now - self._last_used(work_dir) > self.temp_max_age:
+                items.append(self._item(work_dir, "orphan_work_dir", "aucune vidéo associée"))
+
+        # 2. Uploads sans enregistrement
+        if self.uploads_dir.exists():
+            for upload in self.uploads_dir.iterdir():
+                if upload.is_file() and upload.name not in known_uploads \
+                        and now - self._last_used(upload) > self.temp_max_age:
+                    items.append(self._item(upload, "orphan_upload", "aucune vidéo associée"))
+
+        # 3. Fichiers temporaires abandonnés
+        temp_roots = [d for d in self._work_dirs() if d.name in by_work_dir]
+        temp_roots.append(self.data_dir / "temp")
+        for root in temp_roots:
+            if not root.exists():
+                continue
+            for path in root.iterdir():
+                if self._matches(path, self.TEMP_PATTERNS) and now - self._last_used(path) > self.temp_max_age:
+                    video = by_work_dir.get(root.name)
+                    items.append(self._item(path, "temp", "fichier temporaire abandonné",
+                                            video['file_id'] if video else None))
+
+        usage = self.usage()
+        projected = usage - sum(i["size"] for i in items)
+        planned = {i["path"] for i in items}
+
+        # 4. Quota : éviction LRU des artefacts régénérables, puis des originaux si autorisé
+        if projected > self.quota_bytes:
+            regenerable = []
+            for work_dir in self._work_dirs():
+                video = by_work_dir.get(work_dir.name)
+                if not video or video['file_id'] in busy:
+                    continue
+                for path in work_dir.iterdir():
+                    if str(path) not in planned and self._matches(path, self.REGENERABLE_PATTERNS) \
+                            and not self._matches(path, self.TEMP_PATTERNS):
+                        regenerable.append(self._item(path, "regenerable", "quota dépassé (LRU)",
+                                                      video['file_id']))
+
+            originals = []
+            if self.evict_originals and self.uploads_dir.exists():
+                for video in videos:
+                    upload = self.uploads_dir / video['file_id']
+                    if video['file_id'] not in busy and upload.is_file():
+                        originals.append(self._item(upload, "original", "quota dépassé (LRU)",
+                                                    video['file_id']))
+
+            for tier in (regenerable, originals):
+                for item in sorted(tier, key=lambda i: i["last_used"]):
+                    if projected <= self.quota_bytes:
+                        break
+                    items.append(item)
+                    projected -= item["size"]
+
+        return {
+            "quota_bytes": self.quota_bytes,
+            "usage_before": usage,
+            "usage_after": projected,
+            "bytes_freed": usage - projected,
+            "over_quota": projected > self.quota_bytes,
+            "items": items
+        }
+
+    def run(self, dry_run: bool = True) -> Dict:
+        """Exécute la collecte (ou produit seulement le rapport en dry-run)"""
+        report = self.plan()
+        report["dry_run"] = dry_run
+
+        if dry_run:
+            print(f"🧹 GC (dry-run): {len(report['items'])} élément(s), "
+                  f"{report['bytes_freed'] / 1024 / 1024:.2f} MB libérables")
+            return report
+
+        freed = 0
+        for item in report["items"]:
+            path = Path(item["path"])
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                elif path.exists():
+                    path.unlink()
+                freed += item["size"]
+            except Exception as e:
+                item["error"] = str(e)
+                print(f"⚠️  GC: impossible de supprimer {path}: {e}")
+
+        report["bytes_freed"] = freed
+        report["usage_after"] = report["usage_before"] - freed
+        report["updated_videos"] = self.forget_evicted(
+            [i for i in report["items"] if "error" not in i and i["kind"] == "regenerable"]
+        )
+        print(f"🧹 GC: {freed / 1024 / 1024:.2f} MB libérés")
+        return report
+
+    def forget_evicted(self, items: List[Dict]) -> List[str]:
+        """
+        Met à jour les vidéos dont des artefacts ont été évincés : les rendus supprimés
+        sortent de "renditions", le HLS supprimé passe en statut "evicted".
+        Retourne les file_id modifiés.
+        """
+        evicted = {}
+        for item in items:
+            if item["file_id"]:
+                evicted.setdefault(item["file_id"], set()).add(Path(item["path"]))
+
+        updated = []
+        for file_id, paths in evicted.items():
+            video = self.storage.get_video(file_id)
+            if not video:
+                continue
+            changes = {}
+            renditions = video.get("renditions") or {}
+            kept = {name: r for name, r in renditions.items() if Path(r.get("path", "")) not in paths}
+            if kept != renditions:
+                changes["renditions"] = kept
+            hls = video.get("hls")
+            if hls and hls.get("playlist") and Path(hls["playlist"]).parent in paths:
+                changes["hls"] = dict(hls, status="evicted")
+            if changes:
+                self.storage.update_video(file_id=file_id, **changes)
+                updated.append(file_id)
+        return updated
+
+    def purge_video(self, file_id: str) -> int:
+        """Supprime le répertoire de travail complet d'une vidéo (VTT, downscale, temporaires)"""
+        work_dir = self.data_dir / self.work_dir_name(file_id)
+        if not work_dir.is_dir():
+            return 0
+        size = self._size(work_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"🧹 Répertoire de travail supprimé: {work_dir}")
+        return size
@@ -48,40 +48,109 @@ def generate_subtitles(video_path: Path) -> str | None:
 
 import subprocess
 import os
+import threading
+import time
 
-from faster_whisper import WhisperModel
+from backend.services.model_registry import model_registry
 
 
-def generate_subtitles(audio_path: str, output_path: str, model_size="small"):
+def generate_subtitles(audio_path: str, output_path: str, model_size="small", on_segment=None):
     """
     Génère des sous-titres SRT à partir d'un fichier audio WAV.
     Compatible Windows + Python 3.12 + GPU/CPU.
+    Le modèle vient du registre partagé (chargé une fois par process).
+    on_segment : reçoit chaque segment dès qu'il est décodé (ex. VTTStream.append)
+    Le pipeline vidéo n'appelle plus cette fonction : ses sous-titres viennent des
+    segments de la transcription unique (write_vtt / write_srt).
     """
 
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio introuvable : {audio_path}")
 
-    # Charge le modèle
-    model = WhisperModel(model_size, device="cpu")  # change to "cuda" si tu as GPU
+    # Modèle partagé, réservé pendant la transcription (segments générés paresseusement)
+    with model_registry.use("faster_whisper", model_size, compute_type="int8") as model:
+        segments, info = model.transcribe(audio_path)
+        collected = []
+        for seg in segments:
+            segment = {"start": seg.start, "end": seg.end, "text": seg.text.strip()}
+            collected.append(segment)
+            if on_segment:
+                on_segment(segment)
+        return write_srt(collected, output_path)
 
-    segments, info = model.transcribe(audio_path)
 
+def write_srt(segments: list, output_path: str) -> str:
+    """Écrit des segments {"start", "end", "text"} (secondes) au format SRT"""
     with open(output_path, "w", encoding="utf-8") as f:
         for idx, segment in enumerate(segments, start=1):
-            start = format_srt_time(segment.start)
-            end = format_srt_time(segment.end)
-            text = segment.text.strip()
-
             f.write(f"{idx}\n")
-            f.write(f"{start} --> {end}\n")
-            f.write(f"{text}\n\n")
+            f.write(f"{format_srt_time(segment['start'])} --> {format_srt_time(segment['end'])}\n")
+            f.write(f"{segment['text'].strip()}\n\n")
 
     return output_path
 
 
+def write_vtt(segments: list, output_path: str, language: str = None) -> str:
+    """
+    Écrit des segments {"start", "end", "text"} (secondes) au format WebVTT.
+    Fichier temporaire puis remplacement : un lecteur ne voit jamais un VTT à moitié écrit.
+    """
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(vtt_header(language))
+        for segment in segments:
+            f.write(vtt_cue(segment))
+
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def vtt_header(language: str = None) -> str:
+    header = "WEBVTT\n"
+    if language:
+        header += f"Language: {language}\n"
+    return header + "\n"
+
+
+def vtt_cue(segment: dict) -> str:
+    return (f"{format_vtt_time(segment['start'])} --> {format_vtt_time(segment['end'])}\n"
+            f"{segment['text'].strip()}\n\n")
+
+
+class VTTStream:
+    """
+    VTT qui grandit pendant la transcription : en-tête à l'ouverture, puis un cue
+    ajouté (et écrit sur disque) par segment. Le fichier reste un WebVTT valide à
+    tout instant et peut être servi pendant le traitement.
+    Appelable depuis le thread de transcription.
+    """
+
+    def __init__(self, output_path: str, language: str = None):
+        self.output_path = output_path
+        self.count = 0
+        self.first_cue_at = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(vtt_header(language))
+
+    def append(self, segment: dict):
+        with self._lock:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(vtt_cue(segment))
+                f.flush()
+            self.count += 1
+            if self.first_cue_at is None:
+                self.first_cue_at = round(time.perf_counter() - self._started, 2)
+
+
 def format_srt_time(seconds: float):
     ms = int((seconds % 1) * 1000)
     s = int(seconds) % 60
     m = int(seconds // 60) % 60
     h = int(seconds // 3600)
     return f"{h:02}:{m:02}:{s:02},{ms:03}"
+
+
+def format_vtt_time(seconds: float):
+    return format_srt_time(seconds).replace(",", ".")
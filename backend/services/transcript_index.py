@@ -0,0 +1,241 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+from backend.utils.subtitle_utils import parse_subtitle_cues
+
+
+class TranscriptIndex:
+    """Index plein texte des transcriptions (SQLite FTS5)"""
+
+    # Version du schéma et du contenu indexé : incrémentée quand l'indexation change, force une reconstruction
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Une ligne par vidéo : rowid du transcript + plage contiguë des rowids de cues
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    file_id TEXT UNIQUE NOT NULL,
+                    language TEXT,
+                    cue_first INTEGER,
+                    cue_last INTEGER
+                )
+            """)
+            # Un document par vidéo pour le classement global (rowid = documents.id)
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5(
+                    text,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            # Un document par cue pour retrouver les timestamps
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS cues USING fts5(
+                    text,
+                    start UNINDEXED,
+                    end UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+
+        print(f"🔎 Transcript index initialized: {self.db_path}")
+
+    @contextmanager
+    def _connect(self):
+        """Connexion courte : commit en fin de bloc puis fermeture"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def build_query(query: str) -> str:
+        """
+        Transforme une saisie utilisateur en requête FTS5 sûre :
+        chaque mot devient un terme entre guillemets (ET implicite),
+        un '*' final est conservé pour la recherche par préfixe.
+        """
+        terms = []
+        for word in re.findall(r'[\w\']+\*?', query):
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '""')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+        return " ".join(terms)
+
+    @staticmethod
+    def _delete_document(conn: sqlite3.Connection, file_id: str):
+        row = conn.execute(
+            "SELECT id, cue_first, cue_last FROM documents WHERE file_id = ?", (file_id,)
+        ).fetchone()
+        if not row:
+            return
+        conn.execute("DELETE FROM transcripts WHERE rowid = ?", (row["id"],))
+        if row["cue_first"] is not None:
+            conn.execute(
+                "DELETE FROM cues WHERE rowid BETWEEN ? AND ?", (row["cue_first"], row["cue_last"])
+            )
+        conn.execute("DELETE FROM documents WHERE id = ?", (row["id"],))
+
+    def index_video(self, file_id: str, transcription: str, language: str = None,
+                    subtitles_path: str = None) -> bool:
+        """Indexe (ou ré-indexe) la transcription et les cues d'une vidéo"""
+        try:
+            cues = parse_subtitle_cues(subtitles_path) if subtitles_path else []
+
+            with self._write_lock, self._connect() as conn:
+                self._delete_document(conn, file_id)
+
+                cue_first = cue_last = None
+                if cues:
+                    cue_first = conn.execute("SELECT coalesce(max(rowid), 0) + 1 FROM cues").fetchone()[0]
+                    cue_last = cue_first + len(cues) - 1
+                    conn.executemany(
+                        "INSERT INTO cues (rowid, text, start, end) VALUES (?, ?, ?, ?)",
+                        [(cue_first + i, c["text"], c["start"], c["end"]) for i, c in enumerate(cues)]
+                    )
+
+                doc_id = conn.execute(
+                    "INSERT INTO documents (file_id, language, cue_first, cue_last) VALUES (?, ?, ?, ?)",
+                    (file_id, language, cue_first, cue_last)
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO transcripts (rowid, text) VALUES (?, ?)",
+                    (doc_id, transcription or "")
+                )
+
+            print(f"🔎 Transcription indexée: {file_id} ({len(cues)} cues)")
+            return True
+
+        except Exception as e:
+            print(f"❌ Erreur indexation: {e}")
+            return False
+
+    def remove_video(self, file_id: str) -> bool:
+        """Retire une vidéo de l'index"""
+        try:
+            with self._write_lock, self._connect() as conn:
+                self._delete_document(conn, file_id)
+            return True
+        except Exception as e:
+            print(f"❌ Erreur suppression index: {e}")
+            return False
+
+    def search(self, query: str, limit: int = 20, cues_per_video: int = 5) -> Dict:
+        """
+        Recherche classée (BM25) avec extraits et timestamps des cues
+        """
+        started = time.perf_counter()
+        fts_query = self.build_query(query)
+
+        if not fts_query:
+            return {"query": query, "results": [], "took_ms": 0.0}
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute("""
+                    SELECT d.file_id, d.language, d.cue_first, d.cue_last,
+                           snippet(transcripts, 0, '<mark>', '</mark>', '…', 16) AS snippet,
+                           bm25(transcripts) AS score
+                    FROM transcripts
+                    JOIN documents d ON d.id = transcripts.rowid
+                    WHERE transcripts MATCH ?
+                    ORDER BY score
+                    LIMIT ?
+                """, (fts_query, limit)).fetchall()
+
+                results = []
+                for row in rows:
+                    cue_rows = []
+                    if row["cue_first"] is not None:
+                        # La contrainte sur rowid est résolue par FTS5 sans parcourir les autres vidéos
+                        cue_rows = conn.execute("""
+                            SELECT start, end,
+                                   snippet(cues, 0, '<mark>', '</mark>', '…', 12) AS snippet
+                            FROM cues
+                            WHERE cues MATCH ? AND rowid BETWEEN ? AND ?
+                            ORDER BY rowid
+                            LIMIT ?
+                        """, (fts_query, row["cue_first"], row["cue_last"], cues_per_video)).fetchall()
+
+                    results.append({
+                        "file_id": row["file_id"],
+                        "language": row["language"],
+                        "score": round(-row["score"], 4),
+                        "snippet": row["snippet"],
+                        "cues": [
+                            {"start": float(c["start"]), "end": float(c["end"]), "snippet": c["snippet"]}
+                            for c in cue_rows
+                        ]
+                    })
+
+        except sqlite3.OperationalError as e:
+            print(f"❌ Erreur recherche: {e}")
+            results = []
+
+        return {
+            "query": query,
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def rebuild_from_metadata(self, data_dir: str) -> int:
+        """Ré-indexe toutes les vidéos à partir des metadata.json existants"""
+        with self._write_lock, self._connect() as conn:
+            # Repartir d'un index vide : pas de documents orphelins d'une version antérieure
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM transcripts")
+            conn.execute("DELETE FROM cues")
+
+        count = 0
+        for metadata_file in Path(data_dir).glob("*/metadata.json"):
+            try:
+                with open(metadata_file, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+
+                subtitles_path = metadata.get("subtitles_path")
+                if subtitles_path and not Path(subtitles_path).exists():
+                    # Chemin absolu d'une autre machine : chercher le VTT à côté du metadata
+                    local = metadata_file.parent / Path(subtitles_path.replace("\\", "/")).name
+                    subtitles_path = str(local) if local.exists() else None
+
+                if self.index_video(
+                    metadata["file_id"],
+                    metadata.get("transcription", ""),
+                    metadata.get("language_code"),
+                    subtitles_path
+                ):
+                    count += 1
+            except Exception as e:
+                print(f"⚠️  Metadata ignoré {metadata_file}: {e}")
+
+        with self._write_lock, self._connect() as conn:
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+        print(f"✅ Index reconstruit: {count} vidéo(s)")
+        return count
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT count(*) FROM documents").fetchone()[0]
+
+    def needs_rebuild(self) -> bool:
+        """Index vide ou construit par une version antérieure du schéma"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        return version < self.SCHEMA_VERSION or self.count() == 0
@@ -69,7 +69,9 @@ class VideoMerger:
                 vcodec=encoding,
                 preset=preset,
                 audio_codec='aac',
-                q=0
+                q=0,
+                # moov en tête : lecture et seek sans télécharger la fin du fichier
+                movflags='+faststart'
             )
             
             ffmpeg.run(stream, capture_stdout=True, capture_stderr=True, overwrite_output=True)
@@ -120,7 +122,8 @@ class VideoMerger:
                 subtitle_stream,
                 output_path,
                 c="copy",
-                c_s="mov_text"
+                c_s="mov_text",
+                movflags='+faststart'
             )
             
             ffmpeg.run(stream, capture_stdout=True, capture_stderr=True, overwrite_output=True)
@@ -1,7 +1,8 @@
-import subprocess
 import os
 from pathlib import Path
 
+from backend.utils.audio import SAMPLE_RATE, load_pcm
+
 class VideoProcessor:
     """Traitement des vidéos"""
     
@@ -11,42 +12,17 @@ class VideoProcessor:
         print(f"✅ VideoProcessor initialized: {self.temp_dir}")
     
    
-    def extract_audio(self, video_path: str) -> str:
-        """Extrait l'audio d'une vidéo"""
-        try:
-            print(f"🔊 Extraction audio...")
-            
-            audio_path = str(self.temp_dir / "temp_audio.wav")
-            
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-vn',
-                '-acodec', 'pcm_s16le',
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                audio_path
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode == 0 and Path(audio_path).exists():
-                size_mb = Path(audio_path).stat().st_size / 1024 / 1024
-                print(f"✅ Audio extrait: {size_mb:.2f}MB\n")
-                return audio_path
-            else:
-                print(f"❌ Erreur extraction audio")
-                return None
-                
-        except Exception as e:
-            print(f"❌ Erreur: {e}")
+    def extract_audio(self, video_path: str):
+        """Extrait l'audio d'une vidéo (PCM 16 kHz mono float32, en mémoire)"""
+        print(f"🔊 Extraction audio...")
+        
+        samples = load_pcm(video_path)
+        if samples is None:
+            print(f"❌ Erreur extraction audio")
             return None
+        
+        print(f"✅ Audio extrait: {len(samples) / SAMPLE_RATE:.1f}s\n")
+        return samples
     
     def pod_lang_ident(self, audio_path: str) -> str:
         """Identifie la langue"""
@@ -0,0 +1,241 @@
+"""
+
+utils/audio.py
+
+Décodage audio partagé : PCM 16 kHz mono lu directement dans NumPy,
+sans WAV temporaire.
+- WAV déjà au bon format (artefact du prétraitement) : lecture en memmap
+- autre source (vidéo, autre WAV) : ffmpeg écrit le PCM sur un pipe
+Fenêtres temporelles (start / duration), lecture par morceaux, et
+débordement optionnel dans un fichier memmap pour les audios longs.
+PCMSource : source relisible en flux, mémoire bornée quelle que soit la durée.
+
+"""
+
+import struct
+import subprocess
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+
+class PCMDecodeError(RuntimeError):
+    """Décodage ffmpeg interrompu en cours de flux : l'audio lu jusque-là est incomplet"""
+
+
+def pcm_command(source: str, start: float = None, duration: float = None,
+                sample_rate: int = SAMPLE_RATE) -> list:
+    """Commande ffmpeg : PCM s16le mono brut sur stdout"""
+    cmd = ['ffmpeg', '-nostdin', '-v', 'error']
+    if start:
+        # -ss avant -i : seek rapide sur le conteneur
+        cmd += ['-ss', f"{start:.3f}"]
+    cmd += ['-i', str(source)]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    cmd += ['-vn', '-ac', '1', '-ar', str(sample_rate), '-acodec', 'pcm_s16le', '-f', 's16le', 'pipe:1']
+    return cmd
+
+
+def _wav_pcm_info(path: str) -> Optional[dict]:
+    """
+    Position et taille du chunk data d'un WAV PCM s16 mono, sinon None.
+    Parcourt les chunks RIFF sans lire les échantillons.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+                return None
+            fmt = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, size = struct.unpack("<4sI", chunk)
+                if chunk_id == b"fmt ":
+                    data = f.read(size)
+                    audio_format, channels, rate, _, _, bits = struct.unpack("<HHIIHH", data[:16])
+                    fmt = {"format": audio_format, "channels": channels, "sample_rate": rate, "bits": bits}
+                    f.seek(size % 2, 1)
+                elif chunk_id == b"data":
+                    if not fmt:
+                        return None
+                    return dict(fmt, offset=f.tell(), size=size)
+                else:
+                    f.seek(size + size % 2, 1)
+    except (OSError, struct.error):
+        return None
+
+
+def _is_native_wav(info: Optional[dict], sample_rate: int) -> bool:
+    return bool(info) and info["format"] == 1 and info["channels"] == 1 \
+        and info["bits"] == 16 and info["sample_rate"] == sample_rate
+
+
+def _to_dtype(samples: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == "float32":
+        return samples.astype(np.float32) / 32768.0
+    return samples
+
+
+def iter_pcm_chunks(source: str, chunk_seconds: float = 30.0, start: float = None,
+                    duration: float = None, sample_rate: int = SAMPLE_RATE,
+                    dtype: str = "int16", read_timeout: float = 120) -> Iterator[np.ndarray]:
+    """
+    Génère l'audio par morceaux de chunk_seconds (int16 ou float32 [-1, 1]).
+    Mémoire bornée : seul le morceau courant est en RAM.
+    read_timeout : attente maximale d'un morceau de la part de ffmpeg ; le temps passé
+                   par le consommateur entre deux morceaux (transcription) ne compte pas
+    Lève PCMDecodeError si ffmpeg est bloqué ou échoue après avoir produit de l'audio
+    (sans aucun échantillon, la source n'a simplement pas d'audio : flux vide).
+    """
+    chunk_samples = max(1, int(chunk_seconds * sample_rate))
+    info = _wav_pcm_info(source) if str(source).lower().endswith(".wav") else None
+
+    if _is_native_wav(info, sample_rate):
+        samples = np.memmap(source, dtype="<i2", mode="r", offset=info["offset"],
+                            shape=(info["size"] // BYTES_PER_SAMPLE,))
+        first = int((start or 0) * sample_rate)
+        last = len(samples) if not duration else min(len(samples), first + int(duration * sample_rate))
+        for pos in range(first, last, chunk_samples):
+            yield _to_dtype(np.array(samples[pos:min(pos + chunk_samples, last)]), dtype)
+        return
+
+    proc = subprocess.Popen(pcm_command(source, start, duration, sample_rate),
+                            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr_tail = deque(maxlen=50)
+    reader = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True)
+    reader.start()
+    stalled = threading.Event()
+
+    def kill():
+        stalled.set()
+        proc.kill()
+
+    received = 0
+    try:
+        chunk_bytes = chunk_samples * BYTES_PER_SAMPLE
+        while True:
+            # Délai par lecture, réarmé à chaque morceau
+            watchdog = threading.Timer(read_timeout, kill) if read_timeout else None
+            if watchdog:
+                watchdog.start()
+            try:
+                data = proc.stdout.read(chunk_bytes)
+            finally:
+                if watchdog:
+                    watchdog.cancel()
+            if not data:
+                break
+            received += len(data)
+            # Un échantillon coupé en fin de flux est ignoré
+            data = data[:len(data) - len(data) % BYTES_PER_SAMPLE]
+            yield _to_dtype(np.frombuffer(data, dtype="<i2"), dtype)
+        proc.wait()
+        reader.join(timeout=5)
+        error = b''.join(stderr_tail).decode(errors='replace')[-300:]
+        if stalled.is_set():
+            raise PCMDecodeError(f"ffmpeg sans sortie depuis {read_timeout}s ({received} octets lus)")
+        if proc.returncode != 0:
+            if received:
+                raise PCMDecodeError(f"décodage interrompu après {received} octets: {error}")
+            print(f"❌ Décodage audio: {error}")
+    finally:
+        # Générateur abandonné en cours de route : arrêter ffmpeg
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        reader.join(timeout=5)
+
+
+def load_pcm(source: str, start: float = None, duration: float = None,
+             sample_rate: int = SAMPLE_RATE, dtype: str = "float32",
+             spill_path: str = None, read_timeout: float = 120) -> Optional[np.ndarray]:
+    """
+    Charge l'audio (ou la fenêtre [start, start + duration]) dans un tableau NumPy.
+    spill_path : les échantillons sont écrits au fil de l'eau dans ce fichier et
+                 retournés en memmap (audio long, RAM constante).
+    Retourne None si la source n'a pas d'audio décodable ou si le décodage a été
+    interrompu (jamais un audio tronqué).
+    """
+    try:
+        info = _wav_pcm_info(source) if str(source).lower().endswith(".wav") else None
+        if _is_native_wav(info, sample_rate) and dtype == "int16":
+            # Zéro copie : vue memmap sur le fichier
+            samples = np.memmap(source, dtype="<i2", mode="r", offset=info["offset"],
+                                shape=(info["size"] // BYTES_PER_SAMPLE,))
+            first = int((start or 0) * sample_rate)
+            last = len(samples) if not duration else first + int(duration * sample_rate)
+            return samples[first:last]
+
+        chunks = iter_pcm_chunks(source, start=start, duration=duration, sample_rate=sample_rate,
+                                 dtype=dtype, read_timeout=read_timeout)
+
+        if spill_path:
+            np_dtype = np.float32 if dtype == "float32" else np.int16
+            count = 0
+            with open(spill_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk.astype(np_dtype, copy=False).tobytes())
+                    count += len(chunk)
+            if not count:
+                return None
+            return np.memmap(spill_path, dtype=np_dtype, mode="r", shape=(count,))
+
+        parts = list(chunks)
+        if not parts:
+            return None
+        return np.concatenate(parts)
+
+    except FileNotFoundError:
+        print("❌ FFmpeg non trouvé")
+        return None
+    except Exception as e:
+        print(f"❌ Erreur décodage audio: {e}")
+        return None
+
+
+class PCMSource:
+    """
+    Audio d'un job lu en flux : chaque consommateur (VAD, langue, transcription)
+    parcourt des morceaux de taille fixe au lieu de charger toute la piste.
+    WAV au bon format : memmap (pages du cache disque, pas de copie anonyme) ;
+    autre source : ffmpeg redécode à chaque parcours, seul le morceau courant est en RAM.
+    """
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE):
+        self.path = str(path)
+        self.sample_rate = sample_rate
+        info = _wav_pcm_info(self.path) if self.path.lower().endswith(".wav") else None
+        self.native = _is_native_wav(info, sample_rate)
+        # Durée connue sans décodage pour un WAV natif, sinon None
+        self.duration = info["size"] / BYTES_PER_SAMPLE / sample_rate if self.native else None
+
+    def chunks(self, chunk_seconds: float = 30.0, start: float = None, duration: float = None,
+               dtype: str = "int16") -> Iterator[np.ndarray]:
+        return iter_pcm_chunks(self.path, chunk_seconds, start=start, duration=duration,
+                               sample_rate=self.sample_rate, dtype=dtype)
+
+    def window(self, start: float, duration: float, dtype: str = "int16") -> Optional[np.ndarray]:
+        """Fenêtre [start, start + duration] seule (seek ffmpeg ou tranche du memmap)"""
+        return load_pcm(self.path, start=start, duration=duration, sample_rate=self.sample_rate, dtype=dtype)
+
+    def has_audio(self) -> bool:
+        """Vrai si au moins quelques échantillons sont décodables"""
+        if self.native:
+            return self.duration > 0
+        chunks = self.chunks(0.1)
+        try:
+            return next(chunks, None) is not None
+        except Exception:
+            return False
+        finally:
+            chunks.close()
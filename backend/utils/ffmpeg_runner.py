@@ -0,0 +1,123 @@
+"""
+
+utils/ffmpeg_runner.py
+
+Exécution de ffmpeg avec lecture de la progression machine (-progress pipe:1) :
+position courante (out_time), vitesse, fps, remontées via un callback.
+
+"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+ProgressCallback = Callable[[Optional[float], Dict], None]
+
+
+def _parse_out_time(block: Dict[str, str]) -> float:
+    """Position en secondes (out_time_us, sinon out_time HH:MM:SS.micro)"""
+    for key in ("out_time_us", "out_time_ms"):
+        # out_time_ms est aussi en microsecondes (bug historique de ffmpeg)
+        try:
+            return max(0.0, int(block[key]) / 1_000_000)
+        except (KeyError, ValueError):
+            continue
+    try:
+        h, m, s = block["out_time"].split(":")
+        return max(0.0, int(h) * 3600 + int(m) * 60 + float(s))
+    except (KeyError, ValueError):
+        return 0.0
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value.rstrip("x"))
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_progress_block(block: Dict[str, str]) -> Dict:
+    """Convertit un bloc clé=valeur de -progress en statistiques"""
+    return {
+        "out_time": _parse_out_time(block),
+        "frame": int(_parse_float(block.get("frame")) or 0),
+        "fps": _parse_float(block.get("fps")),
+        "speed": _parse_float(block.get("speed")),
+        "done": block.get("progress") == "end"
+    }
+
+
+def run_ffmpeg(cmd: List[str], duration: Optional[float] = None,
+               on_progress: Optional[ProgressCallback] = None,
+               timeout: Optional[float] = None) -> Dict:
+    """
+    Lance ffmpeg et suit sa progression.
+
+    on_progress(fraction, stats) est appelé à chaque bloc -progress (~2x/s) ;
+    fraction vaut None si la durée est inconnue.
+    Retourne {returncode, stderr, elapsed, out_time, frames, speed, fps} où speed
+    est le facteur temps réel moyen du job (secondes de média par seconde).
+    Lève subprocess.TimeoutExpired au-delà de timeout, comme subprocess.run.
+    """
+    cmd = [cmd[0], '-progress', 'pipe:1', '-nostats'] + list(cmd[1:])
+    started = time.perf_counter()
+
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1
+    )
+
+    # stderr lu en parallèle : un pipe plein bloquerait ffmpeg
+    stderr_tail = deque(maxlen=200)
+    reader = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True)
+    reader.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    killer = threading.Timer(timeout, kill) if timeout else None
+    if killer:
+        killer.start()
+
+    stats = parse_progress_block({})
+    block = {}
+    try:
+        for line in proc.stdout:
+            key, _, value = line.strip().partition("=")
+            block[key] = value
+            if key != "progress":
+                continue
+            # Le bloc n'est pas vidé : une clé absente garde sa dernière valeur
+            stats = parse_progress_block(block)
+            if on_progress:
+                fraction = min(1.0, stats["out_time"] / duration) if duration else None
+                on_progress(fraction, stats)
+        proc.wait()
+    finally:
+        if killer:
+            killer.cancel()
+        reader.join(timeout=5)
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "returncode": proc.returncode,
+        "stderr": "".join(stderr_tail),
+        "elapsed": round(elapsed, 3),
+        "out_time": round(stats["out_time"], 3),
+        "frames": stats["frame"],
+        "speed": round(stats["out_time"] / elapsed, 3) if elapsed > 0 else None,
+        "fps": round(stats["frame"] / elapsed, 2) if elapsed > 0 else None
+    }
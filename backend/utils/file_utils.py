@@ -6,12 +6,17 @@ def get_upload_path(filename: str) -> Path:
     """Retourne le chemin de upload"""
     return settings.UPLOADS_DIR / filename
 
-def get_work_dir(file_id: str) -> Path:
-    """Retourne le répertoire de travail"""
+def get_work_dir(file_id: str, create: bool = True) -> Path:
+    """Retourne le répertoire de travail (create=False pour une simple lecture)"""
     work_dir = settings.DATA_DIR / file_id.replace(".", "_")
-    work_dir.mkdir(parents=True, exist_ok=True)
+    if create:
+        work_dir.mkdir(parents=True, exist_ok=True)
     return work_dir
 
+def get_hls_dir(file_id: str, create: bool = True) -> Path:
+    """Retourne le répertoire des segments HLS (playlist + segments)"""
+    return get_work_dir(file_id, create) / "hls"
+
 def clean_filename(filename: str) -> str:
     """Nettoie le nom du fichier"""
     import re
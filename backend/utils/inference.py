@@ -1,6 +1,7 @@
 import subprocess
 import os
-import whisper
+
+from backend.services.model_registry import model_registry
 
 
 def transcribe_audio_to_srt(audio_path: str, output_path: str, model_size="small"):
@@ -12,8 +13,8 @@ def transcribe_audio_to_srt(audio_path: str, output_path: str, model_size="small
     if not os.path.exists(audio_path):
         raise FileNotFoundError("Audio introuvable pour la transcription.")
 
-    model = whisper.load_model(model_size)
-    result = model.transcribe(audio_path)
+    with model_registry.use("whisper", model_size, exclusive=True) as model:
+        result = model.transcribe(audio_path)
 
     segments = result["segments"]
 
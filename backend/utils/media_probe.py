@@ -0,0 +1,125 @@
+"""
+
+utils/media_probe.py
+
+Lecture des caractéristiques d'un fichier média via ffprobe :
+durée, flux vidéo/audio (codec, résolution, débit) et keyframes.
+
+"""
+
+import json
+import subprocess
+from typing import Dict, List, Optional
+
+
+def probe_media(path: str, timeout: int = 30) -> Optional[Dict]:
+    """Retourne un résumé des flux du fichier, ou None si ffprobe échoue"""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries",
+        "format=duration,bit_rate,format_name:"
+        "stream=index,codec_type,codec_name,profile,pix_fmt,width,height,"
+        "avg_frame_rate,bit_rate,sample_rate,channels",
+        "-of", "json",
+        path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            print(f"❌ ffprobe error: {result.stderr[:200]}")
+            return None
+        data = json.loads(result.stdout)
+    except FileNotFoundError:
+        print("❌ ffprobe non trouvé")
+        return None
+    except Exception as e:
+        print(f"❌ Erreur ffprobe: {e}")
+        return None
+
+    fmt = data.get("format", {})
+    video = next((s for s in data.get("streams", []) if s.get("codec_type") == "video"), None)
+    audio = next((s for s in data.get("streams", []) if s.get("codec_type") == "audio"), None)
+
+    def to_float(value, default=0.0):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def frame_rate(value):
+        try:
+            num, den = value.split("/")
+            return float(num) / float(den) if float(den) else 0.0
+        except (AttributeError, ValueError):
+            return 0.0
+
+    return {
+        "duration": to_float(fmt.get("duration")),
+        "bit_rate": int(to_float(fmt.get("bit_rate"))),
+        "format_name": fmt.get("format_name"),
+        "video": {
+            "codec": video.get("codec_name"),
+            "profile": video.get("profile"),
+            "pix_fmt": video.get("pix_fmt"),
+            "width": video.get("width"),
+            "height": video.get("height"),
+            "fps": frame_rate(video.get("avg_frame_rate")),
+            "bit_rate": int(to_float(video.get("bit_rate")))
+        } if video else None,
+        "audio": {
+            "codec": audio.get("codec_name"),
+            "sample_rate": int(to_float(audio.get("sample_rate"))),
+            "channels": audio.get("channels"),
+            "bit_rate": int(to_float(audio.get("bit_rate")))
+        } if audio else None
+    }
+
+
+def probe_keyframes(path: str, timeout: int = 120) -> List[float]:
+    """
+    Timestamps des keyframes du premier flux vidéo.
+    Lit seulement les paquets (flag K), sans décoder les images.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return []
+    except Exception as e:
+        print(f"❌ Erreur ffprobe keyframes: {e}")
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) >= 2 and "K" in parts[1]:
+            try:
+                keyframes.append(float(parts[0]))
+            except ValueError:
+                continue
+    return sorted(keyframes)
+
+
+def choose_split_points(keyframes: List[float], duration: float, chunk_seconds: float) -> List[float]:
+    """
+    Choisit des points de coupe parmi les keyframes, espacés d'au moins chunk_seconds.
+    Le dernier morceau est fusionné s'il est trop court (< chunk_seconds / 2).
+    """
+    points = []
+    last = 0.0
+    for t in keyframes:
+        if t - last >= chunk_seconds:
+            points.append(t)
+            last = t
+
+    if points and duration and duration - points[-1] < chunk_seconds / 2:
+        points.pop()
+    return points
@@ -0,0 +1,90 @@
+"""
+
+utils/mp4_layout.py
+
+Disposition des boîtes MP4 : un fichier "fast-start" a son moov avant le mdat,
+le navigateur peut donc lancer la lecture (et les seeks) dès les premiers octets.
+Un MP4 fragmenté (moof) est lisible progressivement lui aussi.
+
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from backend.utils.ffmpeg_runner import run_ffmpeg
+
+
+# Options de muxage MP4 par disposition
+MOVFLAGS = {
+    "faststart": "+faststart",
+    "fragmented": "+frag_keyframe+empty_moov+default_base_moof",
+}
+
+
+def movflags_args(layout: str = "faststart") -> List[str]:
+    """Arguments ffmpeg pour écrire un MP4 dans la disposition demandée"""
+    return ['-movflags', MOVFLAGS.get(layout, MOVFLAGS["faststart"])]
+
+
+def read_top_level_boxes(path: str, limit: int = 64) -> List[Tuple[str, int, int]]:
+    """(type, offset, taille) des boîtes de premier niveau, sans lire leur contenu"""
+    boxes = []
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            offset = 0
+            while offset + 8 <= file_size and len(boxes) < limit:
+                f.seek(offset)
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                size, box_type = struct.unpack(">I4s", header)
+                if size == 1:
+                    size = struct.unpack(">Q", f.read(8))[0]
+                elif size == 0:
+                    size = file_size - offset
+                if size < 8:
+                    break
+                boxes.append((box_type.decode("latin-1"), offset, size))
+                offset += size
+    except OSError:
+        return []
+    return boxes
+
+
+def mp4_layout(path: str) -> Optional[str]:
+    """
+    "faststart" (moov avant mdat), "fragmented" (moof), "tail" (moov en fin de fichier),
+    ou None si ce n'est pas un MP4 lisible.
+    """
+    types = [box_type for box_type, _, _ in read_top_level_boxes(path)]
+    if "ftyp" not in types[:2]:
+        return None
+    if "moof" in types:
+        return "fragmented"
+    if "moov" not in types or "mdat" not in types:
+        return None
+    return "faststart" if types.index("moov") < types.index("mdat") else "tail"
+
+
+def remux_faststart(path: str, layout: str = "faststart", timeout: int = 600) -> bool:
+    """Réécrit le fichier sans réencodage (-c copy) puis le remplace atomiquement"""
+    source = Path(path)
+    tmp = source.with_name(f"temp_remux_{source.name}")
+    cmd = ['ffmpeg', '-y', '-i', str(source), '-map', '0', '-c', 'copy'] + movflags_args(layout) + [
+        '-f', 'mp4', str(tmp)
+    ]
+    try:
+        result = run_ffmpeg(cmd, timeout=timeout)
+        if result["returncode"] != 0 or not tmp.exists():
+            print(f"❌ Remux {source.name}: {result['stderr'][-300:]}")
+            return False
+        os.replace(tmp, source)
+        return True
+    except Exception as e:
+        print(f"❌ Remux {source.name}: {e}")
+        return False
+    finally:
+        tmp.unlink(missing_ok=True)
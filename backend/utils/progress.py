@@ -1,5 +1,8 @@
+import asyncio
 import json
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional
 from fastapi import WebSocket
 
 class ProgressManager:
@@ -34,3 +37,104 @@ class ProgressManager:
             percentage = int((self.current_step / self.total_steps) * 100)
         
         await self.send(step, percentage, message)
+    
+    def stage_reporter(self, step: str, start: int, end: int, message: str = "",
+                       min_interval: float = 1.0) -> "StageReporter":
+        """Callback de progression d'une étape longue, utilisable depuis un thread"""
+        return StageReporter(self, step, start, end, message, min_interval)
+    
+    async def send_cue(self, cue: Dict):
+        """Envoie un cue de sous-titre au frontend, pendant la transcription"""
+        if not self.websocket:
+            return
+        
+        try:
+            payload = {
+                "type": "subtitle",
+                "step": "subtitle",
+                "cue": cue,
+                "timestamp": str(__import__('datetime').datetime.now())
+            }
+            await self.websocket.send_json(payload)
+        except Exception as e:
+            print(f"❌ Cue error: {e}")
+    
+    def cue_reporter(self) -> "CueReporter":
+        """Callback de diffusion des cues, utilisable depuis le thread de transcription"""
+        return CueReporter(self)
+
+
+class StageReporter:
+    """
+    Projette l'avancement d'une tâche (fraction 0-1) sur la plage [start, end]
+    de la barre globale. Monotone et limité à un envoi par min_interval ;
+    appelable depuis le thread qui exécute ffmpeg.
+    """
+    
+    def __init__(self, progress: ProgressManager, step: str, start: int, end: int,
+                 message: str = "", min_interval: float = 1.0):
+        self.progress = progress
+        self.step = step
+        self.start = start
+        self.end = end
+        self.message = message
+        self.min_interval = min_interval
+        self.last_percentage = start
+        self.last_sent = 0.0
+        self.stats: Dict = {}
+        self._lock = threading.Lock()
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+    
+    def __call__(self, fraction: Optional[float], stats: Dict):
+        self.stats = stats
+        if fraction is None or not self._loop:
+            return
+        
+        percentage = self.start + int((self.end - self.start) * max(0.0, min(1.0, fraction)))
+        now = time.monotonic()
+        with self._lock:
+            if percentage <= self.last_percentage:
+                return
+            if now - self.last_sent < self.min_interval and percentage < self.end:
+                return
+            self.last_percentage = percentage
+            self.last_sent = now
+        
+        message = self.message
+        if stats.get("speed"):
+            message = f"{message} ({stats['speed']:.1f}x)"
+        asyncio.run_coroutine_threadsafe(self.progress.send(self.step, percentage, message), self._loop)
+
+
+class CueReporter:
+    """
+    Diffuse sur la WebSocket les segments de transcription au fur et à mesure
+    ({"index", "start", "end", "text", "language"}). Appelable depuis un thread :
+    les envois sont planifiés dans l'ordre sur la boucle asyncio du job.
+    """
+    
+    def __init__(self, progress: ProgressManager):
+        self.progress = progress
+        self.count = 0
+        self._lock = threading.Lock()
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+    
+    def __call__(self, segment: Dict):
+        if not self._loop:
+            return
+        with self._lock:
+            cue = {
+                "index": self.count,
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+                "language": segment.get("language")
+            }
+            self.count += 1
+            asyncio.run_coroutine_threadsafe(self.progress.send_cue(cue), self._loop)
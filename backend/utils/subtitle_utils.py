@@ -0,0 +1,47 @@
+import re
+from pathlib import Path
+from typing import List, Dict
+
+# Accepte "hh:mm:ss.mmm", "mm:ss.mmm" (VTT) et "hh:mm:ss,mmm" (SRT)
+TIMING_RE = re.compile(
+    r'((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})'
+)
+
+
+def parse_timestamp(value: str) -> float:
+    """Convertit un timestamp VTT/SRT en secondes"""
+    value = value.replace(',', '.')
+    parts = value.split(':')
+    seconds = float(parts[-1])
+    minutes = int(parts[-2]) if len(parts) >= 2 else 0
+    hours = int(parts[-3]) if len(parts) >= 3 else 0
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_subtitle_cues(path: str) -> List[Dict]:
+    """
+    Lit un fichier VTT ou SRT et retourne les cues
+    sous forme de dicts {start, end, text} (secondes)
+    """
+    file_path = Path(path)
+    if not file_path.exists():
+        return []
+
+    cues = []
+    content = file_path.read_text(encoding='utf-8', errors='replace')
+
+    for block in re.split(r'\n\s*\n', content.replace('\r\n', '\n')):
+        lines = [l.strip() for l in block.strip().split('\n') if l.strip()]
+        for i, line in enumerate(lines):
+            match = TIMING_RE.search(line)
+            if match:
+                text = " ".join(lines[i + 1:]).strip()
+                if text:
+                    cues.append({
+                        "start": parse_timestamp(match.group(1)),
+                        "end": parse_timestamp(match.group(2)),
+                        "text": text
+                    })
+                break
+
+    return cues
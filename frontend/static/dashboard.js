@@ -285,12 +285,9 @@ window.addEventListener("beforeunload", () => {
 });
 */
 
-setInterval(() => {
-  console.log("❤️ heartbeat", new Date().toISOString());
-}, 2000);
 let allVideos = [];
 let deleteFileId = null;
-let autoRefreshInterval = null;
+let eventSource = null;
 
 class DashboardManager {
     constructor() {
@@ -312,11 +309,46 @@ class DashboardManager {
     async init() {
         console.log("🚀 DashboardManager initialized");
 
-        await this.loadData();
+        this.stats = { total_videos: 0, processed: 0, storage_bytes: 0 };
+
+        if (!window.EventSource) {
+            await this.loadData();
+            return;
+        }
+
+        // 📡 Push serveur : un snapshot initial puis uniquement les changements
+        eventSource = new EventSource("/api/dashboard/events");
+
+        eventSource.addEventListener("snapshot", (e) => {
+            const data = JSON.parse(e.data);
+            allVideos = data.videos || [];
+            this.stats = data.stats;
+            this.updateStats(this.stats);
+            this.renderVideos(allVideos);
+        });
 
-        // 🔄 Refresh raisonnable
-        autoRefreshInterval = setInterval(() => this.loadData(), 1500000);
-        console.log("🔄 Auto-refresh activé (15s)");
+        eventSource.addEventListener("video", (e) => this.applyEvent(JSON.parse(e.data)));
+        console.log("📡 Flux SSE connecté");
+    }
+
+    applyEvent(event) {
+        const index = allVideos.findIndex(v => v.file_id === event.file_id);
+        if (event.action === "deleted") {
+            if (index >= 0) allVideos.splice(index, 1);
+        } else if (index >= 0) {
+            allVideos[index] = event.video;
+        } else {
+            allVideos.push(event.video);
+        }
+
+        const delta = event.stats_delta || {};
+        this.stats.total_videos = (this.stats.total_videos || 0) + (delta.total_videos || 0);
+        this.stats.processed = (this.stats.processed || 0) + (delta.processed || 0);
+        this.stats.storage_bytes = (this.stats.storage_bytes || 0) + (delta.storage_bytes || 0);
+        this.stats.storage_used = `${(this.stats.storage_bytes / 1024 / 1024).toFixed(2)} MB`;
+
+        this.updateStats(this.stats);
+        this.renderVideos(allVideos);
     }
 
     async loadData() {
@@ -355,6 +387,7 @@ class DashboardManager {
                 console.log("🛑 Videos unchanged → no rerender");
             }
 
+            this.stats = stats;
             this.updateStats(stats);
 
         } catch (error) {
@@ -617,7 +650,7 @@ document.addEventListener("DOMContentLoaded", () => {
 });
 
 window.addEventListener("beforeunload", () => {
-    if (autoRefreshInterval) {
-        clearInterval(autoRefreshInterval);
+    if (eventSource) {
+        eventSource.close();
     }
 });
@@ -118,6 +118,11 @@ class VideoUploadManager {
             this.ws.onmessage = (event) => {
                 try {
                     const progress = JSON.parse(event.data);
+                    if (progress.type === "subtitle") {
+                        // Cue produit pendant la transcription (pas une étape de progression)
+                        this.showCue(progress.cue);
+                        return;
+                    }
                     console.log("📊 Progress:", progress);
                     this.updateProgress(progress);
                     
@@ -152,6 +157,11 @@ class VideoUploadManager {
         this.progressStep.textContent = `${progress.step.toUpperCase()}: ${progress.message}`;
     }
     
+    showCue(cue) {
+        console.log("💬 Cue:", cue);
+        this.progressStep.textContent = `💬 ${cue.text}`;
+    }
+    
     showProgress() {
         this.progressSection.classList.add("active");
     }
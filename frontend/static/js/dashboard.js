@@ -1,7 +1,7 @@
 let allVideos = [];
 let deleteFileId = null;
 let currentVideoId = null;
-let autoRefreshInterval = null;
+let eventSource = null;
 
 class DashboardManager {
     constructor() {
@@ -19,12 +19,60 @@ class DashboardManager {
     async init() {
         console.log("🚀 DashboardManager initialized");
         
-        await this.loadData();
+        this.stats = { total_videos: 0, processed: 0, storage_bytes: 0 };
         
-        // Actualiser automatiquement toutes les 3 secondes
-        autoRefreshInterval = setInterval(() => this.loadData(), 3000000);
+        if (window.EventSource) {
+            // Le serveur pousse un instantané puis uniquement les changements
+            this.connectEvents();
+        } else {
+            await this.loadData();
+        }
+    }
+    
+    connectEvents() {
+        eventSource = new EventSource("/api/dashboard/events");
+        
+        eventSource.addEventListener("snapshot", (e) => {
+            const data = JSON.parse(e.data);
+            console.log("📡 Snapshot reçu:", data.videos.length);
+            allVideos = data.videos || [];
+            this.stats = data.stats;
+            this.updateStats(this.stats);
+            this.renderVideos(allVideos);
+        });
+        
+        eventSource.addEventListener("video", (e) => {
+            this.applyEvent(JSON.parse(e.data));
+        });
+        
+        eventSource.onerror = () => {
+            // EventSource se reconnecte seul et reçoit un nouveau snapshot
+            console.warn("⚠️ Flux SSE interrompu, reconnexion...");
+        };
+        
+        console.log("📡 Flux SSE connecté");
+    }
+    
+    applyEvent(event) {
+        console.log(`📡 ${event.action}: ${event.file_id}`);
+        
+        const index = allVideos.findIndex(v => v.file_id === event.file_id);
+        if (event.action === "deleted") {
+            if (index >= 0) allVideos.splice(index, 1);
+        } else if (index >= 0) {
+            allVideos[index] = event.video;
+        } else {
+            allVideos.push(event.video);
+        }
+        
+        const delta = event.stats_delta || {};
+        this.stats.total_videos = (this.stats.total_videos || 0) + (delta.total_videos || 0);
+        this.stats.processed = (this.stats.processed || 0) + (delta.processed || 0);
+        this.stats.storage_bytes = (this.stats.storage_bytes || 0) + (delta.storage_bytes || 0);
+        this.stats.storage_used = `${(this.stats.storage_bytes / 1024 / 1024).toFixed(2)} MB`;
         
-        console.log("🔄 Auto-refresh activé (3s)");
+        this.updateStats(this.stats);
+        this.renderVideos(allVideos);
     }
     
     async loadData() {
@@ -45,6 +93,7 @@ class DashboardManager {
             console.log("✅ Stats loaded:", stats);
             
             allVideos = videos || [];
+            this.stats = stats;
             this.updateStats(stats);
             this.renderVideos(videos);
             
@@ -93,6 +142,7 @@ class DashboardManager {
             <div class="video-card">
                 <div class="video-thumbnail">
                     <video width="100%" height="180" style="background: #000; object-fit: cover;" controls>
+                        ${video.hls ? `<source src="/api/video/hls/${this.escapeJs(fileId)}/index.m3u8" type="application/vnd.apple.mpegurl">` : ""}
                         <source src="/api/video/downscaled/${this.escapeJs(fileId)}" type="video/mp4">
                         🎬
                     </video>
@@ -443,7 +493,7 @@ document.addEventListener("DOMContentLoaded", () => {
 });
 
 window.addEventListener("beforeunload", () => {
-    if (autoRefreshInterval) {
-        clearInterval(autoRefreshInterval);
+    if (eventSource) {
+        eventSource.close();
     }
 });
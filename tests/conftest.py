@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Tests lancés depuis la racine du dépôt : le paquet backend doit être importable
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
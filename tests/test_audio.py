@@ -0,0 +1,125 @@
+import struct
+import sys
+import time
+import wave
+
+import numpy as np
+import pytest
+
+import backend.utils.audio as audio_module
+from backend.utils.audio import (
+    PCMDecodeError, PCMSource, _is_native_wav, _to_dtype, _wav_pcm_info, iter_pcm_chunks, load_pcm, pcm_command
+)
+
+
+def write_wav(path, samples, rate=16000, channels=1):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+    return str(path)
+
+
+def with_list_chunk(path):
+    """Insère un chunk LIST (impair) avant fmt, comme le font certains encodeurs"""
+    data = open(path, "rb").read()
+    extra = b"LIST" + struct.pack("<I", 3) + b"abc\0"
+    body = data[12:]
+    open(path, "wb").write(b"RIFF" + struct.pack("<I", 4 + len(extra) + len(body)) + b"WAVE" + extra + body)
+    return path
+
+
+def test_wav_pcm_info(tmp_path):
+    path = with_list_chunk(write_wav(tmp_path / "a.wav", np.arange(100)))
+    info = _wav_pcm_info(path)
+
+    assert info["size"] == 200 and info["sample_rate"] == 16000
+    assert open(path, "rb").read()[info["offset"]:info["offset"] + 4] == struct.pack("<hh", 0, 1)
+    assert _is_native_wav(info, 16000)
+    assert not _is_native_wav(info, 8000)
+
+
+def test_non_native_wav(tmp_path):
+    stereo = _wav_pcm_info(write_wav(tmp_path / "s.wav", np.zeros(20), channels=2))
+
+    assert not _is_native_wav(stereo, 16000)
+    (tmp_path / "x.wav").write_bytes(b"not a wav")
+    assert _wav_pcm_info(str(tmp_path / "x.wav")) is None
+    assert not _is_native_wav(None, 16000)
+
+
+def test_to_dtype():
+    samples = np.array([-32768, 0, 16384], dtype=np.int16)
+
+    assert _to_dtype(samples, "float32").tolist() == [-1.0, 0.0, 0.5]
+    assert _to_dtype(samples, "int16") is samples
+
+
+def test_native_wav_is_read_without_ffmpeg(tmp_path):
+    path = write_wav(tmp_path / "a.wav", np.arange(32000) % 1000)
+
+    window = load_pcm(path, start=0.5, duration=0.25, dtype="int16")
+    assert isinstance(window, np.memmap)
+    assert window[0] == 8000 % 1000 and len(window) == 4000
+
+    chunks = list(iter_pcm_chunks(path, chunk_seconds=0.75, dtype="float32"))
+    assert [len(c) for c in chunks] == [12000, 12000, 8000]
+    assert chunks[0].dtype == np.float32
+
+    source = PCMSource(path)
+    assert source.native and source.duration == 2.0 and source.has_audio()
+
+
+def test_pcm_command():
+    cmd = pcm_command("in.mp4", start=1.5, duration=2)
+
+    assert cmd[cmd.index("-ss") + 1] == "1.500"
+    assert cmd.index("-ss") < cmd.index("-i") < cmd.index("-t")
+    assert cmd[-3:] == ["-f", "s16le", "pipe:1"]
+
+
+def fake_decoder(monkeypatch, script):
+    """ffmpeg remplacé par un script Python qui écrit du PCM brut sur stdout"""
+    monkeypatch.setattr(audio_module, "pcm_command", lambda *args, **kwargs: [sys.executable, "-c", script])
+
+
+def test_non_native_source_is_streamed_from_the_decoder(monkeypatch):
+    fake_decoder(monkeypatch, "import sys; sys.stdout.buffer.write(bytes(2 * 40000))")
+    source = PCMSource("video.mp4")
+
+    assert not source.native and source.duration is None
+    assert [len(c) for c in source.chunks(1.0)] == [16000, 16000, 8000]
+    assert source.has_audio()
+
+
+def test_slow_consumer_does_not_kill_the_decoder(monkeypatch):
+    fake_decoder(monkeypatch, "import sys; sys.stdout.buffer.write(bytes(2 * 48000))")
+    chunks = []
+    for chunk in iter_pcm_chunks("video.mp4", chunk_seconds=1.0, read_timeout=0.2):
+        time.sleep(0.3)
+        chunks.append(chunk)
+
+    assert len(chunks) == 3
+
+
+def test_stalled_decoder_raises(monkeypatch):
+    fake_decoder(monkeypatch, "import sys, time; sys.stdout.buffer.write(bytes(32000)); sys.stdout.flush(); time.sleep(5)")
+
+    with pytest.raises(PCMDecodeError):
+        list(iter_pcm_chunks("video.mp4", chunk_seconds=1.0, read_timeout=0.5))
+
+
+def test_decoder_failure_after_audio_raises(monkeypatch):
+    fake_decoder(monkeypatch, "import sys; sys.stdout.buffer.write(bytes(32000)); sys.exit(1)")
+
+    with pytest.raises(PCMDecodeError):
+        list(iter_pcm_chunks("video.mp4", chunk_seconds=1.0))
+    assert load_pcm("video.mp4") is None
+
+
+def test_source_without_audio_is_an_empty_stream(monkeypatch):
+    fake_decoder(monkeypatch, "import sys; sys.exit(1)")
+
+    assert list(iter_pcm_chunks("video.mp4")) == []
+    assert not PCMSource("video.mp4").has_audio()
@@ -0,0 +1,63 @@
+import pytest
+
+from backend.services import cpu_budget as cpu_budget_module
+from backend.services.cpu_budget import CPUBudget, detect_cpu_limit
+
+
+@pytest.fixture
+def host(monkeypatch):
+    """Fichiers cgroup, affinité et cpu_count simulés"""
+    files = {}
+    state = {"affinity": 64, "cpu_count": 64}
+    monkeypatch.setattr(cpu_budget_module, "_read", files.get)
+    monkeypatch.setattr(cpu_budget_module.os, "sched_getaffinity", lambda pid: set(range(state["affinity"])),
+                        raising=False)
+    monkeypatch.setattr(cpu_budget_module.os, "cpu_count", lambda: state["cpu_count"])
+    return files, state
+
+
+def test_cgroup_v2_quota_is_rounded_up(host):
+    files, _ = host
+    files["/sys/fs/cgroup/cpu.max"] = "250000 100000"
+    assert detect_cpu_limit() == (3, "cgroup_v2")
+
+
+def test_unlimited_cgroup_v2_falls_back_to_affinity(host):
+    files, state = host
+    files["/sys/fs/cgroup/cpu.max"] = "max 100000"
+    state["affinity"] = 12
+    assert detect_cpu_limit() == (12, "affinity")
+
+
+def test_cgroup_v1_quota(host):
+    files, _ = host
+    files["/sys/fs/cgroup/cpu/cpu.cfs_quota_us"] = "800000"
+    files["/sys/fs/cgroup/cpu/cpu.cfs_period_us"] = "100000"
+    assert detect_cpu_limit() == (8, "cgroup_v1")
+
+    # Quota -1 : pas de limite
+    files["/sys/fs/cgroup/cpu/cpu.cfs_quota_us"] = "-1"
+    assert detect_cpu_limit() == (64, "affinity")
+
+
+def test_share_splits_cpus_between_active_jobs(host):
+    budget = CPUBudget(cpus=9, reserve=1)
+    assert budget.share() == 8
+
+    with budget.job("a"), budget.job("b"), budget.job("c"):
+        assert budget.share() == 2
+        assert budget.threads_for("ffmpeg", "a", workers=4) == 1
+        assert budget.workers_for(4) == 2
+    assert budget.share() == 8
+    assert budget.threads_for("whisper", workers=3) == 2
+    assert budget.workers_for(4) == 4
+
+    decision = budget.snapshot()["decisions"][-1]
+    assert (decision["stage"], decision["share"], decision["threads"]) == ("whisper", 8, 2)
+
+
+def test_share_never_drops_below_one_thread(host):
+    budget = CPUBudget(cpus=2, reserve=4)
+    with budget.job("a"), budget.job("b"), budget.job("c"):
+        assert budget.share() == 1
+        assert budget.threads_for("torch", workers=8) == 1
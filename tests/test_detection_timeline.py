@@ -0,0 +1,66 @@
+import numpy as np
+
+from backend.services.animal.animal_classes import ANIMAL_CLASSES
+from backend.services.animal.detection_timeline import DetectionTimeline
+
+
+def make_timeline():
+    return DetectionTimeline(
+        timestamps=[2.0, 0.5, 1.0, 3.5],
+        class_ids=[16, 15, 16, 23],
+        confidences=[0.9, 0.4, 0.6, 0.8],
+        boxes=[[0, 0, 1, 1], [0, 0, .5, .5], [.1, .1, .2, .2], [.5, .5, 1, 1]],
+        duration=4.0,
+        sampled_frames=8
+    )
+
+
+def test_rows_are_sorted_by_timestamp():
+    timeline = make_timeline()
+
+    assert timeline.timestamps.tolist() == [0.5, 1.0, 2.0, 3.5]
+    assert timeline.class_ids.tolist() == [15, 16, 16, 23]
+    assert timeline.boxes[0].tolist() == [0, 0, .5, .5]
+
+
+def test_window_is_half_open_and_filters():
+    timeline = make_timeline()
+
+    assert timeline.window(1.0, 3.5).timestamps.tolist() == [1.0, 2.0]
+    assert timeline.window(0.0, None, class_ids=[16]).timestamps.tolist() == [1.0, 2.0]
+    assert timeline.window(min_confidence=0.7).class_ids.tolist() == [16, 23]
+    assert timeline.window(1.0, 3.5).duration == 4.0
+
+
+def test_summary_per_class():
+    summary = make_timeline().summary(ANIMAL_CLASSES)
+
+    dogs = next(row for row in summary if row["class_id"] == 16)
+    assert [row["class_id"] for row in summary] == [15, 16, 23]
+    assert dogs["name"] == ANIMAL_CLASSES[16]
+    assert (dogs["count"], dogs["first_seen"], dogs["last_seen"]) == (2, 1.0, 2.0)
+    assert dogs["max_confidence"] == 0.9
+
+
+def test_to_records_limit_and_unknown_names():
+    records = make_timeline().to_records(limit=2)
+
+    assert len(records) == 2
+    assert records[0] == {"t": 0.5, "class_id": 15, "name": "15", "confidence": 0.4, "box": [0.0, 0.0, 0.5, 0.5]}
+
+
+def test_save_load_roundtrip(tmp_path):
+    path = make_timeline().save(str(tmp_path / "animals" / "timeline.npz"))
+    loaded = DetectionTimeline.load(path)
+
+    assert loaded.timestamps.tolist() == [0.5, 1.0, 2.0, 3.5]
+    assert (loaded.duration, loaded.sampled_frames) == (4.0, 8)
+    assert DetectionTimeline.load(str(tmp_path / "missing.npz")) is None
+
+
+def test_from_chunks():
+    chunk = {"timestamps": np.array([1.0], dtype=np.float32), "class_ids": np.array([14], dtype=np.uint8),
+             "confidences": np.array([0.5], dtype=np.float16), "boxes": np.zeros((1, 4), dtype=np.float16)}
+
+    assert len(DetectionTimeline.from_chunks([chunk, chunk], duration=2.0)) == 2
+    assert len(DetectionTimeline.from_chunks([], duration=2.0)) == 0
@@ -0,0 +1,69 @@
+import json
+import os
+
+from backend.services.downscales.encoder_profiles import EncoderProfiles
+
+# Mesures prises sur une source 640x360 à 25 fps
+RESULTS = [
+    {"preset": "ultrafast", "crf": 28, "threads": 2, "speed": 12.0, "ssim": 0.91, "bitrate": 900},
+    {"preset": "veryfast", "crf": 26, "threads": 4, "speed": 6.0, "ssim": 0.955, "bitrate": 600},
+    {"preset": "medium", "crf": 22, "threads": 4, "speed": 3.0, "ssim": 0.975, "bitrate": 700},
+    {"preset": "slow", "crf": 20, "threads": 8, "speed": 0.5, "ssim": 0.99, "bitrate": 800},
+]
+
+
+def profiles(tmp_path, results=RESULTS):
+    path = tmp_path / "encoder_benchmark.json"
+    path.write_text(json.dumps({"results": [
+        dict(r, width=640, height=360, source_fps=25.0) for r in results
+    ]}), encoding="utf-8")
+    return EncoderProfiles(str(path))
+
+
+def picked(choice):
+    return choice["preset"], choice["source"]
+
+
+def test_defaults_without_benchmark(tmp_path):
+    choice = EncoderProfiles(str(tmp_path / "missing.json")).select("archive")
+    assert choice == dict(EncoderProfiles.DEFAULTS["archive"], profile="archive",
+                          expected_speed=None, source="default")
+
+
+def test_profiles_pick_among_fast_enough_settings(tmp_path):
+    encoders = profiles(tmp_path)
+    assert picked(encoders.select("throughput")) == ("ultrafast", "benchmark")
+    # balanced : le plus compact au-dessus de 0.95 SSIM ; archive : la meilleure qualité assez rapide
+    assert picked(encoders.select("balanced")) == ("veryfast", "benchmark")
+    assert picked(encoders.select("archive")) == ("medium", "benchmark")
+    assert encoders.select("unknown")["profile"] == "balanced"
+
+
+def test_speed_is_scaled_to_the_job_resolution(tmp_path):
+    encoders = profiles(tmp_path)
+    probe = {"duration": 60.0, "video": {"width": 1920, "height": 1080, "fps": 25.0}}
+
+    # 720p = 4x les pixels de la mesure 360p : medium tombe à 0.75x, archive se rabat sur veryfast
+    choice = encoders.select("archive", probe, height=720)
+    assert (choice["preset"], choice["expected_speed"]) == ("veryfast", 1.5)
+
+    # Aucun réglage assez rapide : le plus rapide est retenu
+    assert encoders.select("balanced", probe, height=720, target_realtime=10.0)["preset"] == "ultrafast"
+
+
+def test_results_are_reloaded_when_the_file_changes(tmp_path):
+    encoders = profiles(tmp_path, RESULTS[-1:])
+    assert encoders.select("throughput")["preset"] == "slow"
+
+    path = encoders.results_path
+    path.write_text(json.dumps({"results": [dict(RESULTS[0], width=640, height=360, source_fps=25.0)]}),
+                    encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert encoders.select("throughput")["preset"] == "ultrafast"
+
+
+def test_apply_sets_encoder_options_on_every_rendition():
+    choice = {"preset": "fast", "crf": 23, "threads": 4}
+    applied = EncoderProfiles.apply([{"name": "360p", "height": 360}], choice)
+    assert applied == [{"name": "360p", "height": 360, "preset": "fast", "crf": 23, "threads": 4}]
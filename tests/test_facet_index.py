@@ -0,0 +1,102 @@
+import json
+import sqlite3
+
+from backend.services.animal.animal_classes import ANIMAL_CLASSES, ANIMAL_IDS, animal_ids_from_names
+from backend.services.facet_index import FacetIndex
+from backend.services.json_storage import JSONStorage
+from backend.services.language.languages import language_code_from_name
+
+
+def make_index(tmp_path, videos):
+    index = FacetIndex(str(tmp_path / "facets.db"))
+    index.rebuild(videos)
+    return index
+
+
+VIDEOS = [
+    {"file_id": "a", "animal_ids": [15, 16], "language_code": "fr"},
+    {"file_id": "b", "animal_ids": [16], "language_code": "en"},
+    {"file_id": "c", "animal_ids": [23], "language_code": "en"},
+]
+
+
+def test_coco_animal_ids():
+    assert ANIMAL_CLASSES[14] == "oiseau"
+    assert ANIMAL_CLASSES[15] == "chat"
+    assert ANIMAL_CLASSES[16] == "chien"
+    assert ANIMAL_CLASSES[23] == "girafe"
+    assert 24 not in ANIMAL_CLASSES
+    assert ANIMAL_IDS["girafe"] == 23
+
+
+def test_values_of_one_facet_are_ored(tmp_path):
+    index = make_index(tmp_path, VIDEOS)
+    assert index.query({"language": ["fr", "en"]}) == {"a", "b", "c"}
+    assert index.query({"animal": ["15", "23"]}) == {"a", "c"}
+
+
+def test_facets_are_anded(tmp_path):
+    index = make_index(tmp_path, VIDEOS)
+    assert index.query({"animal": ["16"], "language": ["en"]}) == {"b"}
+    assert index.query({"animal": ["15", "16"], "language": ["fr", "en"]}) == {"a", "b"}
+    assert index.query({"animal": ["23"], "language": ["fr"]}) == set()
+
+
+def test_no_filter_means_everything(tmp_path):
+    index = make_index(tmp_path, VIDEOS)
+    assert index.query({}) is None
+    assert index.query({"animal": [], "language": []}) is None
+
+
+def test_counts_restricted_to_selection(tmp_path):
+    index = make_index(tmp_path, VIDEOS)
+    assert index.counts() == {"animal": {"16": 2, "15": 1, "23": 1}, "language": {"en": 2, "fr": 1}}
+    counts = index.counts({"language": ["en"]})
+    assert counts["animal"] == {"16": 1, "23": 1}
+
+
+def test_update_replaces_and_removes(tmp_path):
+    index = make_index(tmp_path, VIDEOS)
+    index.update("a", {"file_id": "a", "animal_ids": [23], "language_code": "fr"})
+    assert index.query({"animal": ["15"]}) == set()
+    assert index.query({"animal": ["23"]}) == {"a", "c"}
+    index.update("a", None)
+    assert index.query({"language": ["fr"]}) == set()
+
+
+def test_legacy_names_are_mapped_with_the_shifted_table():
+    # Anciens noms : "chien" = 15, "girafe" = 22, "papillon" = 24 (sac à dos, ignoré)
+    assert animal_ids_from_names("chien, girafe, papillon, licorne") == [15, 22]
+    assert animal_ids_from_names(None) == []
+    assert language_code_from_name("Français 🇫🇷") == "fr"
+    assert language_code_from_name("Anglais") == "en"
+    assert language_code_from_name("Klingon") is None
+
+
+def test_legacy_records_are_backfilled(tmp_path):
+    legacy = [{"file_id": "old", "animals": "chat, chien", "language": "Anglais 🇬🇧"}]
+    index = make_index(tmp_path, legacy)
+    assert index.query({"animal": ["14"], "language": ["en"]}) == {"old"}
+
+
+def test_records_with_animal_ids_ignore_names(tmp_path):
+    index = make_index(tmp_path, [{"file_id": "new", "animal_ids": [], "animals": "chat"}])
+    assert index.query({"animal": ["14"]}) == set()
+
+
+def test_outdated_index_is_rebuilt(tmp_path):
+    storage_dir = tmp_path / "videos"
+    storage_dir.mkdir()
+    (storage_dir / "index.json").write_text(json.dumps(
+        [{"file_id": "old", "animals": "oiseau", "language": "Français 🇫🇷"}]
+    ), encoding="utf-8")
+
+    # Index construit par une version antérieure : non vide, sans la vidéo ancienne
+    with sqlite3.connect(str(storage_dir / "facets.db")) as conn:
+        conn.execute("CREATE TABLE facets (facet TEXT NOT NULL, value TEXT NOT NULL, "
+                     "file_id TEXT NOT NULL, PRIMARY KEY (facet, value, file_id)) WITHOUT ROWID")
+        conn.execute("INSERT INTO facets VALUES ('language', 'en', 'other')")
+
+    storage = JSONStorage(str(storage_dir))
+    assert [v["file_id"] for v in storage.query_videos(animal_ids=[23], language_codes=["fr"])] == ["old"]
+    assert not storage.facets.needs_rebuild()
@@ -0,0 +1,54 @@
+import os
+import subprocess
+
+import pytest
+
+from backend.utils.ffmpeg_runner import parse_progress_block, run_ffmpeg
+
+
+def test_parse_progress_block():
+    stats = parse_progress_block({"frame": "250", "fps": "49.5", "out_time_us": "10000000",
+                                  "speed": "2.5x", "progress": "continue"})
+
+    assert stats == {"out_time": 10.0, "frame": 250, "fps": 49.5, "speed": 2.5, "done": False}
+
+
+def test_out_time_fallbacks():
+    # out_time_ms est en microsecondes, comme out_time_us
+    assert parse_progress_block({"out_time_ms": "1500000"})["out_time"] == 1.5
+    assert parse_progress_block({"out_time": "01:02:03.500000"})["out_time"] == 3723.5
+    assert parse_progress_block({"out_time_us": "N/A", "speed": "N/A", "progress": "end"}) == {
+        "out_time": 0.0, "frame": 0, "fps": None, "speed": None, "done": True}
+
+
+def fake_ffmpeg(tmp_path, body):
+    script = tmp_path / "ffmpeg"
+    script.write_text("#!/bin/sh\n" + body)
+    os.chmod(script, 0o755)
+    return str(script)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="script shell")
+def test_run_ffmpeg_reports_progress(tmp_path):
+    binary = fake_ffmpeg(tmp_path, (
+        'echo "$1 $2" >&2\n'
+        'printf "frame=25\\nout_time_us=1000000\\nprogress=continue\\n"\n'
+        'printf "frame=50\\nout_time_us=4000000\\nprogress=end\\n"\n'
+    ))
+    calls = []
+
+    result = run_ffmpeg([binary, "-i", "in.mp4"], duration=2.0,
+                        on_progress=lambda fraction, stats: calls.append((fraction, stats["frame"])))
+
+    assert calls == [(0.5, 25), (1.0, 50)]
+    assert result["returncode"] == 0
+    assert result["out_time"] == 4.0 and result["frames"] == 50
+    assert "-progress pipe:1" in result["stderr"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="script shell")
+def test_run_ffmpeg_timeout(tmp_path):
+    binary = fake_ffmpeg(tmp_path, "exec sleep 5\n")
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_ffmpeg([binary], timeout=0.2)
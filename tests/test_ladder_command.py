@@ -0,0 +1,78 @@
+from backend.services.downscales.downscale import DownscaleProcessor
+from backend.utils.mp4_layout import movflags_args
+
+HLS = {
+    "rendition": {"name": "360p", "height": 360},
+    "playlist": "/work/hls/index.m3u8",
+    "segment_pattern": "/work/hls/seg_%05d.ts",
+    "segment_seconds": 4
+}
+
+
+def encoders(cmd):
+    return cmd.count("libx264")
+
+
+def test_hls_reuses_ladder_rendition_of_same_height():
+    outputs = [({"name": "360p", "height": 360}, "/work/o360.mp4"),
+               ({"name": "720p", "height": 720}, "/work/o720.mp4")]
+    cmd = DownscaleProcessor.build_ladder_command("in.mp4", outputs, HLS)
+
+    assert encoders(cmd) == 2
+    assert "split=2" in cmd[cmd.index("-filter_complex") + 1]
+    tee = cmd[cmd.index("tee") + 1]
+    assert tee.startswith("[movflags=+faststart]/work/o360.mp4|[f=hls:hls_time=4:")
+    assert tee.endswith("]/work/hls/index.m3u8")
+    assert "-force_key_frames" in cmd
+
+
+def test_hls_branch_when_no_rendition_matches():
+    outputs = [({"name": "720p", "height": 720}, "/work/o720.mp4")]
+    cmd = DownscaleProcessor.build_ladder_command("in.mp4", outputs, HLS)
+
+    assert encoders(cmd) == 2
+    assert "tee" not in cmd
+    assert cmd[-1] == "/work/hls/index.m3u8"
+    assert cmd[cmd.index("-hls_time") + 1] == "4"
+
+
+def test_copied_rendition_is_not_shared():
+    renditions = [{"name": "360p", "height": 360, "mode": "copy"}]
+    assert DownscaleProcessor.hls_shared_rendition(renditions, HLS) is None
+    assert DownscaleProcessor.hls_shared_rendition([{"name": "360p", "height": 360}], None) is None
+
+
+def test_tee_escape():
+    assert DownscaleProcessor.tee_escape("C:\\work|a[1]") == "C\\:\\\\work\\|a\\[1\\]"
+
+
+def test_single_decode_for_all_renditions():
+    outputs = [({"name": "240p", "height": 240}, "/work/o240.mp4"),
+               ({"name": "480p", "height": 480, "mode": "audio_copy"}, "/work/o480.mp4"),
+               ({"name": "1080p", "height": 1080, "mode": "copy"}, "/work/o1080.mp4")]
+    cmd = DownscaleProcessor.build_ladder_command("in.mp4", outputs)
+
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert cmd.count("-i") == 1
+    assert encoders(cmd) == 2
+    assert graph.startswith("[0:v]split=2[v0][v1];")
+    assert "[v1]scale=-2:'min(480,ih)'[o1]" in graph
+    # Le rendu copié est remuxé sans branche de filtre
+    copy_at = cmd.index("/work/o1080.mp4")
+    assert cmd[copy_at - 6:copy_at - 2] == ['-map', '0:a?', '-c', 'copy']
+    audio_copy = cmd[cmd.index("[o1]") + 1:cmd.index("/work/o480.mp4")]
+    assert audio_copy[-4 - len(movflags_args()):-len(movflags_args())] == ['-map', '0:a?', '-c:a', 'copy']
+
+
+def test_taps_share_the_decode():
+    outputs = [({"name": "360p", "height": 360}, "/work/o360.mp4")]
+    taps = [{"source": "v", "filter": "fps=2", "args": ["-f", "rawvideo"], "output": "pipe:1"},
+            {"source": "a", "filter": "aresample=16000", "args": ["-f", "s16le"], "output": "/work/a.pcm"}]
+    cmd = DownscaleProcessor.build_ladder_command("in.mp4", outputs, taps=taps, audio=False, threads=2)
+
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "split=2[v0][v1]" in graph
+    assert "[v1]fps=2[tv0]" in graph and "[0:a]aresample=16000[ta0]" in graph
+    assert cmd[-10:-5] == ['-map', '[tv0]', '-f', 'rawvideo', 'pipe:1']
+    assert cmd[-5:] == ['-map', '[ta0]', '-f', 's16le', '/work/a.pcm']
+    assert ['-threads', '2', '-an'] == cmd[cmd.index('-threads'):cmd.index('-threads') + 3]
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from backend.services.cpu_budget import CPUBudget
+from backend.services.model_registry import ModelRegistry
+
+
+class FakeModel:
+    def __init__(self, key, cpu_threads):
+        self.key = key
+        self.cpu_threads = cpu_threads
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    loads = []
+
+    def fake_load(self, family, size, device, compute_type, cpu_threads=0):
+        loads.append((family, size))
+        return FakeModel((family, size), cpu_threads)
+
+    monkeypatch.setattr(ModelRegistry, "_load", fake_load)
+    registry = ModelRegistry(memory_budget_mb=1000, num_workers=2)
+    registry.loads = loads
+    return registry
+
+
+def test_models_are_loaded_once_and_shared(registry):
+    first = registry.get("faster_whisper", "base", compute_type="int8")
+
+    assert registry.get("faster_whisper", "base", compute_type="int8") is first
+    assert registry.loads == [("faster_whisper", "base")]
+    stats = registry.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_lru_eviction_skips_models_in_use(registry):
+    # Estimations : small = 1000 MB, base = 300 MB, tiny = 150 MB (budget 1000 MB)
+    registry.get("whisper", "tiny")
+    registry.get("whisper", "base")
+    registry.get("whisper", "tiny")
+
+    with registry.use("whisper", "base"):
+        # base réservé : seul tiny, le moins récemment utilisé des autres, peut partir
+        registry.get("faster_whisper", "medium", compute_type="int8")
+    loaded = [(m["family"], m["size"]) for m in registry.stats()["models"]]
+
+    assert ("whisper", "base") in loaded
+    assert ("whisper", "tiny") not in loaded
+    assert registry.stats()["evictions"] == 1
+
+
+def test_exclusive_use_serializes_callers(registry):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with registry.use("whisper", "base", exclusive=True):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 1
+    assert registry.stats()["models"][0]["in_use"] == 0
+
+
+def test_whisper_threads_come_from_the_cpu_budget(registry):
+    budget = CPUBudget(cpus=8)
+    registry.budget = budget
+    budget.acquire("a")
+    budget.acquire("b")
+
+    model = registry.get("faster_whisper", "small", compute_type="int8")
+
+    # Part d'un job (8 / 2) répartie entre les 2 workers du modèle partagé
+    assert model.cpu_threads == 2
+    assert registry.threads_of("faster_whisper", "small", compute_type="int8") == 2
+    assert registry.threads_of("faster_whisper", "tiny") is None
+
+
+def test_explicit_thread_count_wins(registry):
+    registry.cpu_threads = 3
+    registry.budget = CPUBudget(cpus=8)
+
+    assert registry.get("faster_whisper", "small").cpu_threads == 3
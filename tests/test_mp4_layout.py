@@ -0,0 +1,41 @@
+import struct
+
+from backend.utils.mp4_layout import movflags_args, mp4_layout, read_top_level_boxes
+
+
+def box(box_type, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), box_type.encode()) + payload
+
+
+def write(tmp_path, *boxes):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"".join(boxes))
+    return str(path)
+
+
+def test_read_top_level_boxes(tmp_path):
+    large_mdat = struct.pack(">I4sQ", 1, b"mdat", 20) + b"\0" * 4
+    path = write(tmp_path, box("ftyp", b"isom"), box("moov", b"\0" * 8), large_mdat)
+
+    assert read_top_level_boxes(path) == [("ftyp", 0, 12), ("moov", 12, 16), ("mdat", 28, 20)]
+
+
+def test_layouts(tmp_path):
+    assert mp4_layout(write(tmp_path, box("ftyp"), box("moov"), box("mdat"))) == "faststart"
+    assert mp4_layout(write(tmp_path, box("ftyp"), box("mdat"), box("moov"))) == "tail"
+    assert mp4_layout(write(tmp_path, box("ftyp"), box("moov"), box("moof"), box("mdat"))) == "fragmented"
+    assert mp4_layout(write(tmp_path, box("moov"), box("free"), box("mdat"))) is None
+    assert mp4_layout(str(tmp_path / "missing.mp4")) is None
+
+
+def test_box_size_zero_runs_to_end_of_file(tmp_path):
+    open_ended = struct.pack(">I4s", 0, b"mdat") + b"\0" * 12
+    path = write(tmp_path, box("ftyp"), box("moov"), open_ended)
+
+    assert read_top_level_boxes(path)[-1] == ("mdat", 16, 20)
+
+
+def test_movflags_args():
+    assert movflags_args() == ['-movflags', '+faststart']
+    assert movflags_args("fragmented")[1].startswith("+frag_keyframe")
+    assert movflags_args("unknown") == movflags_args()
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+
+import backend.services.downscales.downscale as downscale_module
+from backend.services.downscales.downscale import DownscaleProcessor
+from backend.utils.media_probe import choose_split_points
+
+PROBE = {"duration": 90.0, "audio": {"codec": "aac"}, "video": {"height": 1080}}
+
+
+def fake_ffmpeg(commands, fail=lambda cmd: False):
+    def run(cmd, duration=None, on_progress=None, timeout=None):
+        commands.append(cmd)
+        output = Path(cmd[-1])
+        if fail(cmd):
+            return {"returncode": 1, "stderr": "boom", "elapsed": 1.0, "out_time": 0.0, "frames": 0}
+        if "segment" in cmd:
+            for i in range(3):
+                (output.parent / f"src_{i:05d}.mkv").write_bytes(b"")
+        elif output.suffix == ".m3u8":
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text("#EXTM3U\n#EXTINF:4.0,\nseg_00000.ts\n#EXT-X-ENDLIST\n")
+        else:
+            output.write_bytes(b"x")
+        return {"returncode": 0, "stderr": "", "elapsed": 1.0, "out_time": duration or 0.0, "frames": 0}
+    return run
+
+
+@pytest.fixture
+def hls(tmp_path):
+    return {
+        "rendition": {"name": "360p", "height": 360},
+        "playlist": str(tmp_path / "hls" / "index.m3u8"),
+        "segment_pattern": str(tmp_path / "hls" / "seg_%05d.ts"),
+        "segment_seconds": 4
+    }
+
+
+@pytest.fixture
+def ladder_calls(monkeypatch):
+    calls = []
+
+    def fake_ladder(self, input_video, output_dir, file_id, renditions, timeout=900, hls=None,
+                    probe=None, on_progress=None):
+        calls.append(([r["name"] for r in renditions], hls))
+        return {r["name"]: {"path": "sequential", "height": r["height"], "mode": r.get("mode", "transcode"), "size": 1}
+                for r in renditions}
+
+    monkeypatch.setattr(downscale_module, "probe_keyframes", lambda path: [0.0, 30.0, 60.0])
+    monkeypatch.setattr(DownscaleProcessor, "pod_downscale_ladder", fake_ladder)
+    return calls
+
+
+def run_parallel(tmp_path, renditions, hls):
+    return DownscaleProcessor().pod_downscale_ladder_parallel(
+        "in.mp4", str(tmp_path), "video.mp4", renditions, workers=2, chunk_seconds=30, hls=hls, probe=PROBE
+    )
+
+
+def test_parallel_hls_is_segmented_from_the_chunked_rendition(tmp_path, monkeypatch, hls, ladder_calls):
+    commands = []
+    monkeypatch.setattr(downscale_module, "run_ffmpeg", fake_ffmpeg(commands))
+
+    produced = run_parallel(tmp_path, [{"name": "360p", "height": 360}, {"name": "720p", "height": 720}], hls)
+
+    # Aucun encodage séquentiel de toute la source : le HLS vient des morceaux
+    assert ladder_calls == []
+    chunk_commands = [c for c in commands if "libx264" in c]
+    assert len(chunk_commands) == 3
+    assert all(c.count("libx264") == 2 and c.count("-force_key_frames") == 1 for c in chunk_commands)
+    packaging = commands[-1]
+    assert packaging[-1] == hls["playlist"]
+    assert packaging[packaging.index("-c") + 1] == "copy"
+    assert packaging[packaging.index("-i") + 1] == str(tmp_path / "downscaled_360p_video.mp4")
+    assert sorted(produced) == ["360p", "720p"]
+
+
+def test_parallel_hls_uses_a_dedicated_rendition_when_no_height_matches(tmp_path, monkeypatch, hls, ladder_calls):
+    commands = []
+    monkeypatch.setattr(downscale_module, "run_ffmpeg", fake_ffmpeg(commands))
+
+    produced = run_parallel(tmp_path, [{"name": "720p", "height": 720}], hls)
+
+    assert ladder_calls == []
+    assert all(c.count("libx264") == 2 for c in commands if "libx264" in c)
+    assert commands[-1][commands[-1].index("-i") + 1].endswith("hls.mp4")
+    assert list(produced) == ["720p"]
+
+
+def test_failed_chunk_falls_back_without_losing_copies(tmp_path, monkeypatch, hls, ladder_calls):
+    commands = []
+    fail = lambda cmd: "libx264" in cmd and cmd[cmd.index("-i") + 1].endswith("src_00001.mkv")
+    monkeypatch.setattr(downscale_module, "run_ffmpeg", fake_ffmpeg(commands, fail))
+    renditions = [{"name": "240p", "height": 240}, {"name": "1080p", "height": 1080, "mode": "copy"}]
+
+    produced = run_parallel(tmp_path, renditions, hls)
+
+    # Le remux "copy" est gardé ; seul le rendu encodé (et le HLS) repasse en séquentiel
+    assert ladder_calls == [(["1080p"], None), (["240p"], hls)]
+    assert sorted(produced) == ["1080p", "240p"]
+
+
+def test_hls_complete_requires_endlist(tmp_path):
+    playlist = tmp_path / "index.m3u8"
+    playlist.write_text("#EXTM3U\n#EXT-X-PLAYLIST-TYPE:EVENT\n#EXTINF:4.0,\nseg_00000.ts\n")
+
+    assert not DownscaleProcessor.hls_complete(str(playlist))
+    playlist.write_text(playlist.read_text() + "#EXT-X-ENDLIST\n")
+    assert DownscaleProcessor.hls_complete(str(playlist))
+    assert not DownscaleProcessor.hls_complete(str(tmp_path / "missing.m3u8"))
+
+
+def test_split_points_respect_chunk_spacing():
+    keyframes = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0, 12.0]
+
+    assert choose_split_points(keyframes, 16.0, 5.0) == [6.0, 12.0]
+    assert choose_split_points(keyframes, 14.0, 20.0) == []
+
+
+def test_short_last_chunk_is_merged():
+    # 10 → 11 ne ferait qu'une seconde : fusionné avec le morceau précédent
+    assert choose_split_points([0.0, 5.0, 10.0], 11.0, 5.0) == [5.0]
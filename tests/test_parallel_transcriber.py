@@ -0,0 +1,206 @@
+import wave
+
+import numpy as np
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+
+from backend.services.language.parallel_transcriber import (
+    GoogleRecognizerBackend, ParallelTranscriber, TranscriptionBackend
+)
+from backend.services.language.speech_recognition_detector import SpeechRecognitionDetector
+from backend.utils.audio import SAMPLE_RATE, PCMSource
+
+
+class ScriptedBackend(TranscriptionBackend):
+    """Segments fixés à l'avance par morceau (indice = premier échantillon du morceau, voir numbered)"""
+
+    name = "scripted"
+    max_workers = 2
+    detects_language = True
+
+    def __init__(self, script, detected="en"):
+        self.script = script
+        self.detected = detected
+        self.languages = []
+
+    def segments(self, samples, language):
+        self.languages.append(language)
+        return [dict(s, language=language or self.detected) for s in self.script.get(int(samples[0]), [])]
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+def numbered(seconds, chunk_seconds=30):
+    """Silence dont le premier échantillon de chaque morceau porte son indice (workers concurrents)"""
+    audio = silence(seconds)
+    step = int(chunk_seconds * SAMPLE_RATE)
+    audio[::step] = np.arange(len(audio[::step]))
+    return audio
+
+
+def test_unknown_language_is_taken_from_the_asr_segments():
+    backend = ScriptedBackend({0: [{"start": 0.0, "end": 20.0, "text": "hello there", "probability": 0.9}]})
+    result = ParallelTranscriber(backend, chunk_seconds=30, overlap_seconds=1.5).transcribe(silence(25), None)
+
+    assert backend.languages == [None]
+    assert result["language"] == "en"
+    assert result["language_probability"] == 1.0
+    assert result["segments"][0]["language"] == "en"
+
+
+def test_imposed_language_wins():
+    backend = ScriptedBackend({0: [{"start": 0.0, "end": 5.0, "text": "bonjour", "probability": 0.9}]})
+    result = ParallelTranscriber(backend).transcribe(silence(10), "fr")
+
+    assert backend.languages == ["fr"]
+    assert result["language"] == "fr"
+    assert result["language_probability"] is None
+
+
+def test_dominant_language_weights_by_duration():
+    segments = [
+        {"start": 0.0, "end": 2.0, "language": "fr"},
+        {"start": 2.0, "end": 10.0, "language": "en"},
+        {"start": 10.0, "end": 11.0, "language": None},
+    ]
+    assert ParallelTranscriber.dominant_language(segments) == ("en", 0.8)
+    assert ParallelTranscriber.dominant_language([]) == (None, None)
+
+
+def test_pieces_overlap_from_array_and_stream():
+    transcriber = ParallelTranscriber(ScriptedBackend({}), chunk_seconds=1.0, overlap_seconds=0.5)
+    audio = np.arange(int(2.5 * SAMPLE_RATE), dtype=np.int16)
+
+    from_array = [len(p) / SAMPLE_RATE for p in transcriber.pieces(audio)]
+    blocks = (audio[i:i + SAMPLE_RATE] for i in range(0, len(audio), SAMPLE_RATE))
+    from_stream = list(transcriber.pieces(blocks))
+
+    assert from_array == [1.5, 1.5, 0.5]
+    assert [len(p) / SAMPLE_RATE for p in from_stream] == from_array
+    assert from_stream[1][0] == SAMPLE_RATE
+
+
+def test_dedupe_removes_repeated_overlap_words():
+    dedupe = ParallelTranscriber.dedupe
+
+    assert dedupe("nous partons demain matin", "Demain matin, il pleuvra") == "il pleuvra"
+    # Mot coupé mal reconnu à la frontière avant la reprise
+    assert dedupe("nous partons demain matin", "tin demain matin il pleuvra") == "il pleuvra"
+    assert dedupe("bonjour", "au revoir") == "au revoir"
+
+
+def test_merge_keeps_own_part_in_absolute_time():
+    transcriber = ParallelTranscriber(ScriptedBackend({}), chunk_seconds=30, overlap_seconds=1.5)
+    segments = [{"start": 0.2, "end": 2.0, "text": "demain matin il pleut"},
+                {"start": 10.0, "end": 12.0, "text": "suite"},
+                {"start": 30.5, "end": 31.4, "text": "début du suivant"}]
+
+    merged = transcriber.merge(1, segments, previous={"text": "nous partons demain matin"})
+
+    assert [(s["start"], s["end"], s["text"]) for s in merged] == [(30.2, 32.0, "il pleut"), (40.0, 42.0, "suite")]
+
+
+def test_overlapping_chunks_are_stitched_in_order():
+    backend = ScriptedBackend({
+        0: [{"start": 1.0, "end": 29.8, "text": "nous partons demain", "probability": 0.9}],
+        1: [{"start": 0.0, "end": 4.0, "text": "demain à l'aube", "probability": 0.9}],
+    })
+    emitted = []
+    result = ParallelTranscriber(backend, chunk_seconds=30, overlap_seconds=1.5).transcribe(
+        numbered(45), "fr", on_segment=emitted.append)
+
+    assert result["text"] == "nous partons demain à l'aube"
+    assert [(s["start"], s["end"]) for s in result["segments"]] == [(1.0, 29.8), (30.0, 34.0)]
+    assert emitted == result["segments"]
+    assert (result["chunks"], result["recognized"]) == (2, 2)
+
+
+def test_google_backend_sends_pcm_from_memory(tmp_path, monkeypatch):
+    calls = []
+
+    def recognize_google(self, audio_data, language=None, show_all=False):
+        calls.append((audio_data, language))
+        return "bonjour"
+
+    monkeypatch.setattr(sr.Recognizer, "recognize_google", recognize_google)
+    monkeypatch.chdir(tmp_path)
+    samples = np.arange(SAMPLE_RATE, dtype=np.int16)
+
+    segments = GoogleRecognizerBackend().segments(samples, "fr")
+
+    audio_data, language = calls[0]
+    assert language == "fr-FR"
+    assert (audio_data.frame_data, audio_data.sample_rate, audio_data.sample_width) == \
+        (samples.tobytes(), SAMPLE_RATE, 2)
+    assert segments == [{"start": 0.0, "end": 1.0, "text": "bonjour", "probability": None}]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_google_backend_unrecognized_chunk(monkeypatch):
+    def recognize_google(self, audio_data, language=None, show_all=False):
+        raise sr.UnknownValueError()
+
+    monkeypatch.setattr(sr.Recognizer, "recognize_google", recognize_google)
+
+    assert GoogleRecognizerBackend().segments(silence(1), "xx") == []
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+    return PCMSource(str(path))
+
+
+def test_unknown_lid_falls_back_to_asr_language(tmp_path, monkeypatch):
+    backend = ScriptedBackend({0: [{"start": 0.0, "end": 8.0, "text": "hello there", "probability": 0.9}]})
+    monkeypatch.setattr(SpeechRecognitionDetector, "transcription_backend", staticmethod(lambda: backend))
+    audio = write_wav(tmp_path / "a.wav", numbered(10))
+
+    result = SpeechRecognitionDetector.transcribe_full(audio, "unk")
+
+    assert backend.languages == [None]
+    assert (result["text"], result["language"], result["language_probability"]) == ("hello there", "en", 1.0)
+
+
+def test_unknown_lid_without_asr_language_is_skipped(tmp_path, monkeypatch):
+    backend = ScriptedBackend({})
+    backend.detects_language = False
+    monkeypatch.setattr(SpeechRecognitionDetector, "transcription_backend", staticmethod(lambda: backend))
+
+    result = SpeechRecognitionDetector.transcribe_full(write_wav(tmp_path / "a.wav", numbered(10)), "unk")
+
+    assert backend.languages == []
+    assert (result["language"], result["segments"]) == ("unk", [])
+
+
+def test_live_segments_match_the_final_clamped_ends():
+    backend = ScriptedBackend({
+        0: [{"start": 1.0, "end": 10.0, "text": "un", "probability": 0.9},
+            {"start": 20.0, "end": 31.0, "text": "deux", "probability": 0.9}],
+        1: [{"start": 0.5, "end": 5.0, "text": "trois", "probability": 0.9}],
+        2: [{"start": 2.0, "end": 4.0, "text": "quatre", "probability": 0.9}],
+    })
+    emitted = []
+    result = ParallelTranscriber(backend, chunk_seconds=30, overlap_seconds=1.5).transcribe(
+        numbered(70), "fr", on_segment=emitted.append)
+
+    # "deux" déborde dans le chevauchement : émis seulement une fois borné par "trois"
+    assert [(s["text"], s["end"]) for s in emitted] == [("un", 10.0), ("deux", 30.5), ("trois", 35.0), ("quatre", 64.0)]
+    assert emitted == result["segments"]
+
+
+def test_failing_callback_does_not_stop_transcription():
+    backend = ScriptedBackend({0: [{"start": 0.0, "end": 1.0, "text": "un", "probability": None},
+                                   {"start": 2.0, "end": 3.0, "text": "deux", "probability": None}]})
+
+    def on_segment(segment):
+        raise RuntimeError("client parti")
+
+    result = ParallelTranscriber(backend).transcribe(numbered(5), "fr", on_segment=on_segment)
+    assert result["text"] == "un deux"
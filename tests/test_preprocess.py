@@ -0,0 +1,19 @@
+from backend.services.downscales.preprocess import FusedPreprocessor
+
+PROBE = {"duration": 600.0, "video": {"width": 1920, "height": 1080}}
+
+
+def test_sparse_frames_are_capped_on_long_videos():
+    preprocessor = FusedPreprocessor(None, frame_fps=1.0, frame_width=640, max_frames=24)
+    width, height, fps = preprocessor.frame_geometry(PROBE)
+    assert (width, height) == (640, 360)
+    assert fps * PROBE["duration"] == 24
+
+
+def test_dense_sampling_keeps_the_requested_rate_within_the_cap():
+    dense = FusedPreprocessor(None, frame_fps=2.0, frame_width=640, max_frames=3600)
+    assert dense.frame_geometry(PROBE)[2] == 2.0
+
+    # Vidéo trop longue pour la borne : cadence réduite, nombre de frames constant
+    long_probe = dict(PROBE, duration=7200.0)
+    assert dense.frame_geometry(long_probe)[2] * 7200.0 == 3600
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from backend.utils.progress import CueReporter, ProgressManager
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+
+def test_cue_reporter_sends_indexed_cues_in_order():
+    socket = RecordingSocket()
+
+    async def job():
+        reporter = CueReporter(ProgressManager(socket))
+        # Appelé depuis le thread de transcription
+        await asyncio.to_thread(lambda: [reporter({"start": float(i), "end": i + 1.0, "text": f"cue {i}"})
+                                         for i in range(3)])
+        for _ in range(100):
+            if len(socket.sent) == 3:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(job())
+
+    cues = [payload["cue"] for payload in socket.sent]
+    assert [c["index"] for c in cues] == [0, 1, 2]
+    assert cues[2] == {"index": 2, "start": 2.0, "end": 3.0, "text": "cue 2", "language": None}
+    assert {payload["type"] for payload in socket.sent} == {"subtitle"}
+
+
+def test_cue_reporter_without_loop_is_a_no_op():
+    reporter = CueReporter(ProgressManager(RecordingSocket()))
+
+    reporter({"start": 0.0, "end": 1.0, "text": "ignoré"})
+    assert reporter.count == 0
@@ -0,0 +1,92 @@
+from backend.services.downscales.downscale import DownscaleProcessor
+
+LADDER = [{"name": "1080p", "height": 1080}, {"name": "360p", "height": 360}, {"name": "720p", "height": 720}]
+
+
+def probe(height=720, codec="h264", pix_fmt="yuv420p", audio="aac"):
+    return {
+        "duration": 60.0,
+        "video": {"codec": codec, "pix_fmt": pix_fmt, "width": height * 16 // 9, "height": height, "fps": 25.0},
+        "audio": {"codec": audio} if audio else None
+    }
+
+
+def modes(planned):
+    return [(r["name"], r["mode"]) for r in planned]
+
+
+def test_conforming_source_is_copied_and_larger_renditions_skipped():
+    planned = DownscaleProcessor().plan_renditions(probe(), LADDER)
+
+    assert modes(planned) == [("360p", "audio_copy"), ("720p", "copy"), ("1080p", "skip")]
+    assert planned[2]["alias_of"] == "720p"
+
+
+def test_non_copyable_video_is_transcoded():
+    planned = DownscaleProcessor().plan_renditions(probe(codec="hevc", audio="opus"), LADDER)
+
+    assert modes(planned) == [("360p", "transcode"), ("720p", "transcode"), ("1080p", "skip")]
+
+
+def test_silent_source_can_still_be_copied():
+    planned = DownscaleProcessor().plan_renditions(probe(height=1080, audio=None), LADDER)
+
+    assert modes(planned) == [("360p", "transcode"), ("720p", "transcode"), ("1080p", "copy")]
+
+
+def test_missing_probe_transcodes_everything():
+    planned = DownscaleProcessor().plan_renditions(None, LADDER)
+
+    assert {r["mode"] for r in planned} == {"transcode"}
+
+
+def test_saved_seconds_count_copies_and_skips():
+    processor = DownscaleProcessor()
+    source = probe()
+    planned = processor.plan_renditions(source, LADDER)
+
+    expected = (processor.estimate_transcode_seconds(source, planned[1])
+                + processor.estimate_transcode_seconds(source, planned[2])
+                + 60.0 * processor.AUDIO_ENCODE_SECONDS_PER_SECOND)
+    assert processor.estimate_saved_seconds(source, planned) == round(expected, 2)
+
+
+def test_timeout_scales_with_duration_and_measured_speed():
+    processor = DownscaleProcessor()
+    hour = dict(probe(height=1080, codec="hevc"), duration=3600.0)
+    ladder = processor.plan_renditions(hour, LADDER)
+
+    short = processor.estimate_timeout(probe(codec="hevc"), ladder, minimum=900, factor=4)
+    long = processor.estimate_timeout(hour, ladder, minimum=900, factor=4)
+    assert short == 900
+    assert long == int(4 * sum(processor.estimate_transcode_seconds(hour, r) for r in ladder if r["mode"] != "copy"))
+    assert long > 900
+
+    # Encodeur mesuré deux fois plus lent : délai presque doublé (l'audio ne change pas)
+    processor.encode_seconds_per_mpx *= 2
+    assert 1.9 * long < processor.estimate_timeout(hour, ladder, minimum=900, factor=4) < 2 * long
+    assert processor.estimate_timeout(None, ladder, minimum=900) == 900
+
+
+def test_analysis_proxy_has_short_gop_and_even_height():
+    source = probe(height=1080)
+    source["video"].update(width=1918, fps=30.0)
+    proxy = DownscaleProcessor.plan_analysis_proxy(source, width=640, gop_seconds=2.0)
+
+    assert (proxy["name"], proxy["mode"], proxy["height"]) == ("proxy", "transcode", 360)
+    assert proxy["output_args"] == ['-g', '60', '-keyint_min', '60', '-sc_threshold', '0']
+    # Options propres au proxy : il ne sert jamais de rendu partagé pour le HLS
+    hls = {"rendition": {"name": "360p", "height": 360}}
+    assert DownscaleProcessor.hls_shared_rendition([proxy], hls) is None
+
+
+def test_small_or_unknown_source_is_its_own_proxy():
+    assert DownscaleProcessor.plan_analysis_proxy(probe(height=360)) is None
+    assert DownscaleProcessor.plan_analysis_proxy(None) is None
+    assert DownscaleProcessor.plan_analysis_proxy({"duration": 10.0, "video": None}) is None
+
+
+def test_proxy_gop_defaults_to_25_fps():
+    source = probe(height=1080)
+    source["video"]["fps"] = None
+    assert DownscaleProcessor.plan_analysis_proxy(source, gop_seconds=1.0)["output_args"][1] == "25"
@@ -0,0 +1,55 @@
+import numpy as np
+
+from backend.services.language.speech_gate import SpeechGate
+from backend.utils.audio import SAMPLE_RATE
+
+
+def speech(seconds, seed=0):
+    """Parole synthétique : voyelle (200 Hz), fricative (bruit), micro-pause, toutes les 250 ms"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(0.12 * SAMPLE_RATE)) / SAMPLE_RATE
+    syllable = np.concatenate([
+        0.3 * np.sin(2 * np.pi * 200 * t),
+        0.1 * rng.standard_normal(int(0.06 * SAMPLE_RATE)),
+        0.001 * rng.standard_normal(int(0.07 * SAMPLE_RATE)),
+    ])
+    return np.tile(syllable, int(seconds / 0.25)).astype(np.float32)
+
+
+def tone(seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_silence():
+    result = SpeechGate().analyze(np.zeros(10 * SAMPLE_RATE, dtype=np.int16))
+
+    assert (result["speech"], result["reason"]) == (False, "silence")
+
+
+def test_steady_tone_is_music_or_ambient():
+    result = SpeechGate().analyze(tone(10))
+
+    assert (result["speech"], result["reason"]) == (False, "music_or_ambient")
+    assert result["active_ratio"] == 1.0 and result["music_ratio"] == 1.0
+
+
+def test_syllabic_signal_is_speech():
+    result = SpeechGate().analyze(speech(10))
+
+    assert (result["speech"], result["reason"]) == (True, "speech")
+    assert result["speech_seconds"] >= 8
+
+
+def test_too_little_speech_in_music():
+    audio = np.concatenate([tone(30), speech(1), tone(30)])
+
+    assert SpeechGate().analyze(audio)["reason"] == "music_or_ambient"
+
+
+def test_streamed_chunks_and_empty_audio():
+    pcm = (speech(6) * 32767).astype(np.int16)
+    chunks = (pcm[i:i + 7000] for i in range(0, len(pcm), 7000))
+
+    assert SpeechGate().analyze(chunks)["speech"]
+    assert SpeechGate().analyze(iter([]))["reason"] == "no_audio"
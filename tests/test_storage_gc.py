@@ -0,0 +1,155 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services.storage_gc import StorageGC
+
+HOUR = 3600
+
+
+class Videos:
+    """Stockage minimal : liste, lecture et mise à jour des enregistrements"""
+
+    def __init__(self, videos):
+        self.videos = videos
+
+    def get_all_videos(self):
+        return self.videos
+
+    def get_video(self, file_id):
+        return next((v for v in self.videos if v["file_id"] == file_id), None)
+
+    def update_video(self, file_id, **changes):
+        self.get_video(file_id).update(changes)
+
+
+def write(path, size, age=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return tmp_path / "uploads", tmp_path / "data"
+
+
+def make_gc(dirs, videos, quota=10 ** 9, evict_originals=False):
+    uploads, data = dirs
+    uploads.mkdir(exist_ok=True)
+    data.mkdir(exist_ok=True)
+    return StorageGC(Videos(videos), str(uploads), str(data), quota_bytes=quota,
+                     temp_max_age=HOUR, evict_originals=evict_originals, processing_max_age=6 * HOUR)
+
+
+def created(age):
+    return (datetime.now(timezone.utc) - timedelta(seconds=age)).replace(tzinfo=None).isoformat()
+
+
+def kinds(report):
+    return sorted((item["kind"], os.path.basename(item["path"])) for item in report["items"])
+
+
+def test_orphans_older_than_max_age(dirs):
+    uploads, data = dirs
+    write(data / "gone_mp4" / "downscaled_360p_gone.mp4", 10, age=2 * HOUR)
+    write(data / "fresh_mp4" / "downscaled_360p_fresh.mp4", 10)
+    write(uploads / "gone.mp4", 10, age=2 * HOUR)
+    write(data / "kept_mp4" / "kept.vtt", 10, age=2 * HOUR)
+    write(uploads / "kept.mp4", 10, age=2 * HOUR)
+
+    report = make_gc(dirs, [{"file_id": "kept.mp4", "status": "completed"}]).plan()
+
+    assert kinds(report) == [("orphan_upload", "gone.mp4"), ("orphan_work_dir", "gone_mp4")]
+    assert report["bytes_freed"] == 20
+
+
+def test_abandoned_temp_files(dirs):
+    _, data = dirs
+    write(data / "kept_mp4" / "temp_chunks_kept_mp4" / "src_00000.mkv", 5, age=2 * HOUR)
+    write(data / "kept_mp4" / "temp_recent.wav", 5)
+    write(data / "temp" / "temp_upload", 5, age=2 * HOUR)
+
+    report = make_gc(dirs, [{"file_id": "kept.mp4", "status": "completed"}]).plan()
+
+    assert kinds(report) == [("temp", "temp_chunks_kept_mp4"), ("temp", "temp_upload")]
+
+
+def test_quota_evicts_regenerable_artifacts_lru_first(dirs):
+    _, data = dirs
+    videos = [{"file_id": "a.mp4", "status": "completed"},
+              {"file_id": "b.mp4", "status": "completed"},
+              {"file_id": "c.mp4", "status": "processing"}]
+    write(data / "a_mp4" / "downscaled_360p_a.mp4", 100, age=3 * HOUR)
+    write(data / "b_mp4" / "downscaled_360p_b.mp4", 100, age=1 * HOUR)
+    write(data / "c_mp4" / "downscaled_360p_c.mp4", 100, age=5 * HOUR)
+    write(data / "a_mp4" / "a.vtt", 10, age=5 * HOUR)
+
+    report = make_gc(dirs, videos, quota=250).plan()
+
+    # Le plus ancien d'abord ; la vidéo en cours et les sous-titres ne sont jamais évincés
+    assert kinds(report) == [("regenerable", "downscaled_360p_a.mp4")]
+    assert report["usage_after"] == 210
+    assert not report["over_quota"]
+
+
+def test_originals_only_when_allowed(dirs):
+    uploads, _ = dirs
+    write(uploads / "a.mp4", 500, age=HOUR)
+    videos = [{"file_id": "a.mp4", "status": "completed"}]
+
+    assert make_gc(dirs, videos, quota=100).plan()["over_quota"]
+    report = make_gc(dirs, videos, quota=100, evict_originals=True).plan()
+    assert kinds(report) == [("original", "a.mp4")]
+
+
+def test_run_deletes_only_outside_dry_run(dirs):
+    uploads, _ = dirs
+    orphan = write(uploads / "gone.mp4", 10, age=2 * HOUR)
+    gc = make_gc(dirs, [])
+
+    assert gc.run(dry_run=True)["bytes_freed"] == 10
+    assert orphan.exists()
+    assert gc.run(dry_run=False)["bytes_freed"] == 10
+    assert not orphan.exists()
+
+
+def test_stalled_processing_jobs_become_reclaimable(dirs):
+    _, data = dirs
+    videos = [{"file_id": "live.mp4", "status": "processing", "created_at": created(7 * HOUR)},
+              {"file_id": "dead.mp4", "status": "processing", "created_at": created(7 * HOUR)}]
+    write(data / "live_mp4" / "downscaled_360p_live.mp4", 100, age=10 * HOUR)
+    write(data / "live_mp4" / "live.vtt", 1)
+    write(data / "dead_mp4" / "downscaled_360p_dead.mp4", 100, age=10 * HOUR)
+
+    report = make_gc(dirs, videos, quota=150).plan()
+
+    # live.mp4 écrit encore dans son répertoire : protégé ; dead.mp4 est planté depuis 7 h
+    assert kinds(report) == [("regenerable", "downscaled_360p_dead.mp4")]
+
+
+def test_eviction_updates_the_video_records(dirs):
+    _, data = dirs
+    work = data / "a_mp4"
+    rendition = write(work / "downscaled_360p_a.mp4", 100, age=3 * HOUR)
+    write(work / "downscaled_720p_a.mp4", 100, age=1 * HOUR)
+    write(work / "hls" / "seg_00000.ts", 100, age=2 * HOUR)
+    video = {
+        "file_id": "a.mp4", "status": "completed",
+        "renditions": {
+            "360p": {"path": str(rendition), "height": 360},
+            "720p": {"path": str(work / "downscaled_720p_a.mp4"), "height": 720},
+            "1080p": {"path": str(work / "downscaled_720p_a.mp4"), "height": 720, "mode": "skip"},
+        },
+        "hls": {"playlist": str(work / "hls" / "index.m3u8"), "status": "complete"}
+    }
+
+    report = make_gc(dirs, [video], quota=150).run(dry_run=False)
+
+    assert report["updated_videos"] == ["a.mp4"]
+    assert sorted(video["renditions"]) == ["1080p", "720p"]
+    assert video["hls"]["status"] == "evicted"
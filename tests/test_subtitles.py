@@ -0,0 +1,51 @@
+from backend.services.subtitles.subtitles import VTTStream, format_srt_time, format_vtt_time, write_srt, write_vtt
+
+SEGMENTS = [
+    {"start": 0.5, "end": 2.25, "text": " Bonjour "},
+    {"start": 3661.0, "end": 3662.5, "text": "au revoir"},
+]
+
+
+def test_time_formats():
+    assert format_srt_time(3661.5) == "01:01:01,500"
+    assert format_vtt_time(2.25) == "00:00:02.250"
+
+
+def test_write_vtt_with_language(tmp_path):
+    path = tmp_path / "video.vtt"
+    write_vtt(SEGMENTS, str(path), language="fr")
+
+    assert path.read_text(encoding="utf-8") == (
+        "WEBVTT\nLanguage: fr\n\n"
+        "00:00:00.500 --> 00:00:02.250\nBonjour\n\n"
+        "01:01:01.000 --> 01:01:02.500\nau revoir\n\n"
+    )
+    assert not (tmp_path / "video.vtt.tmp").exists()
+
+
+def test_write_vtt_replaces_existing_file(tmp_path):
+    path = tmp_path / "video.vtt"
+    path.write_text("ancien contenu")
+    write_vtt([], str(path))
+
+    assert path.read_text(encoding="utf-8") == "WEBVTT\n\n"
+
+
+def test_write_srt(tmp_path):
+    path = write_srt(SEGMENTS[:1], str(tmp_path / "video.srt"))
+
+    assert open(path, encoding="utf-8").read() == "1\n00:00:00,500 --> 00:00:02,250\nBonjour\n\n"
+
+
+def test_vtt_stream_is_valid_after_each_cue(tmp_path):
+    path = tmp_path / "live.vtt"
+    stream = VTTStream(str(path), language="en")
+
+    assert path.read_text(encoding="utf-8") == "WEBVTT\nLanguage: en\n\n"
+    for segment in SEGMENTS:
+        stream.append(segment)
+
+    with_header = path.read_text(encoding="utf-8")
+    write_vtt(SEGMENTS, str(tmp_path / "final.vtt"), language="en")
+    assert with_header == (tmp_path / "final.vtt").read_text(encoding="utf-8")
+    assert stream.count == 2 and stream.first_cue_at is not None
@@ -0,0 +1,97 @@
+import json
+import sqlite3
+
+import pytest
+
+from backend.services.transcript_index import TranscriptIndex
+
+VTT = """WEBVTT
+
+00:00:01.000 --> 00:00:04.000
+Une girafe traverse la savane
+
+00:00:05.500 --> 00:00:08.000
+Le lion dort à l'ombre
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    subtitles = tmp_path / "a.vtt"
+    subtitles.write_text(VTT, encoding="utf-8")
+    index = TranscriptIndex(str(tmp_path / "index" / "transcripts.db"))
+    index.index_video("a", "Une girafe traverse la savane. Le lion dort à l'ombre", "fr", str(subtitles))
+    index.index_video("b", "The elephant drinks at the river", "en")
+    return index
+
+
+def test_build_query_quotes_terms_and_keeps_prefix():
+    assert TranscriptIndex.build_query('lion "dort') == '"lion" "dort"'
+    assert TranscriptIndex.build_query("gira*") == '"gira"*'
+    assert TranscriptIndex.build_query("  -- ") == ""
+
+
+def test_search_returns_cue_timestamps(index):
+    result = index.search("girafe")
+    assert [r["file_id"] for r in result["results"]] == ["a"]
+    hit = result["results"][0]
+    assert hit["language"] == "fr"
+    assert "<mark>girafe</mark>" in hit["snippet"]
+    assert [(c["start"], c["end"]) for c in hit["cues"]] == [(1.0, 4.0)]
+
+
+def test_search_ignores_diacritics_and_supports_prefix(index):
+    assert [r["file_id"] for r in index.search("a l'ombre")["results"]] == ["a"]
+    assert [r["file_id"] for r in index.search("eleph*")["results"]] == ["b"]
+
+
+def test_terms_are_anded(index):
+    assert index.search("girafe elephant")["results"] == []
+
+
+def test_reindex_replaces_previous_document(index):
+    index.index_video("a", "Un zèbre", "fr")
+    assert index.search("girafe")["results"] == []
+    assert [r["file_id"] for r in index.search("zebre")["results"]] == ["a"]
+    assert index.count() == 2
+
+
+def test_remove_video(index):
+    assert index.remove_video("a")
+    assert index.search("lion")["results"] == []
+    assert index.count() == 1
+    # Retirer une vidéo absente n'est pas une erreur
+    assert index.remove_video("missing")
+
+
+def write_metadata(data_dir, file_id, transcription):
+    work = data_dir / file_id.replace(".", "_")
+    work.mkdir(parents=True)
+    (work / "metadata.json").write_text(json.dumps({
+        "file_id": file_id, "language_code": "fr", "transcription": transcription
+    }), encoding="utf-8")
+
+
+def test_fresh_or_outdated_index_needs_rebuild(tmp_path):
+    data_dir = tmp_path / "data"
+    write_metadata(data_dir, "a.mp4", "Une girafe traverse la savane")
+    index = TranscriptIndex(str(tmp_path / "index" / "transcripts.db"))
+    assert index.needs_rebuild()
+
+    assert index.rebuild_from_metadata(str(data_dir)) == 1
+    assert not index.needs_rebuild()
+    assert [r["file_id"] for r in index.search("girafe")["results"]] == ["a.mp4"]
+
+    # Schéma plus récent dans le code : la base existante est reconstruite
+    with sqlite3.connect(str(index.db_path)) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    assert index.needs_rebuild()
+
+
+def test_rebuild_drops_documents_without_metadata(index, tmp_path):
+    data_dir = tmp_path / "data"
+    write_metadata(data_dir, "c.mp4", "Un zèbre au galop")
+
+    assert index.rebuild_from_metadata(str(data_dir)) == 1
+    assert index.count() == 1
+    assert index.search("girafe")["results"] == []
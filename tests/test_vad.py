@@ -0,0 +1,67 @@
+import numpy as np
+
+from backend.services.language.vad import EnergyVAD
+
+RATE = 16000
+
+
+def syllables(seconds, seed=0):
+    """Parole synthétique : voyelle (200 Hz), fricative (bruit), micro-pause, toutes les 250 ms"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(0.12 * RATE)) / RATE
+    syllable = np.concatenate([
+        0.3 * np.sin(2 * np.pi * 200 * t),
+        0.1 * rng.standard_normal(int(0.06 * RATE)),
+        0.001 * rng.standard_normal(int(0.07 * RATE)),
+    ])
+    return np.tile(syllable, int(seconds / 0.25)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.float32)
+
+
+def test_frame_features_stream_matches_array():
+    vad = EnergyVAD()
+    audio = syllables(2)
+    pcm = (audio * 32767).astype(np.int16)
+    # Morceaux qui ne tombent pas sur des frontières de trame
+    streamed = vad.frame_features(pcm[i:i + 1000] for i in range(0, len(pcm), 1000))
+    whole = vad.frame_features(pcm)
+
+    assert len(whole["energy"]) == len(pcm) // 480
+    np.testing.assert_allclose(streamed["energy"], whole["energy"], atol=1e-4)
+    np.testing.assert_allclose(vad.frame_energy(audio), whole["energy"], atol=0.5)
+    np.testing.assert_allclose(streamed["zcr"], whole["zcr"], atol=1e-6)
+
+
+def test_speech_mask_uses_adaptive_threshold():
+    vad = EnergyVAD()
+    energy = np.array([-80, -80, -80, -30, -20, -75], dtype=np.float32)
+
+    assert vad.speech_mask(energy).tolist() == [False, False, False, True, True, False]
+    assert vad.speech_mask(np.zeros(0)).tolist() == []
+
+
+def test_select_windows_finds_speech_between_silences():
+    audio = np.concatenate([silence(20), syllables(10), silence(20)])
+    windows = EnergyVAD().select_windows(audio, count=3, window_seconds=5)
+
+    best = windows[0]
+    assert 20 <= best["start"] and best["end"] <= 30
+    assert all(w["density"] >= 0.3 for w in windows)
+
+
+def test_select_windows_ignores_steady_tone_and_silence():
+    t = np.arange(30 * RATE) / RATE
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    vad = EnergyVAD()
+
+    assert vad.select_windows(silence(30)) == []
+    assert vad.select_windows(tone) == []
+
+
+def test_short_audio_is_a_single_window():
+    windows = EnergyVAD().select_windows(syllables(2), window_seconds=10)
+
+    assert len(windows) == 1 and windows[0]["start"] == 0.0
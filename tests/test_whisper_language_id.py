@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+
+import numpy as np
+
+from backend.services.language import whisper_language_id as module
+from backend.services.language.whisper_language_id import WhisperLanguageID
+
+
+class Extractor:
+    """Extracteur log-mel minimal : mémorise l'audio reçu"""
+
+    n_samples = 16000
+    nb_max_frames = 4
+
+    def __call__(self, audio):
+        self.audio = audio
+        return np.zeros((80, 6), dtype=np.float32)
+
+
+class Model:
+    def __init__(self, distribution):
+        self.feature_extractor = Extractor()
+        self.model = self
+        self.distribution = distribution
+
+    def encode(self, features):
+        self.features = features
+        return "encoded"
+
+    def detect_language(self, encoder_output):
+        assert encoder_output == "encoded"
+        return [[(f"<|{code}|>", prob) for code, prob in self.distribution.items()]]
+
+
+def test_out_of_list_mass_is_folded_into_unk():
+    model = Model({"fr": 0.6, "en": 0.1, "de": 0.25, "es": 0.05})
+    probs = WhisperLanguageID._probabilities(model, np.zeros(8000, dtype=np.int16), ["fr", "en", "it", "unk"])
+
+    assert set(probs) == {"fr", "en", "it", "unk"}
+    assert probs["it"] == 0.0
+    assert abs(probs["unk"] - 0.3) < 1e-9
+    assert abs(sum(probs.values()) - 1.0) < 1e-9
+
+
+def test_without_unk_only_listed_codes_are_returned():
+    model = Model({"fr": 0.6, "en": 0.4})
+    assert WhisperLanguageID._probabilities(model, np.zeros(10, dtype=np.float32), ["en"]) == {"en": 0.4}
+
+
+def test_unk_never_goes_negative():
+    # Probabilités arrondies du modèle dont la somme dépasse 1
+    model = Model({"fr": 0.7, "en": 0.31})
+    assert WhisperLanguageID._probabilities(model, np.zeros(10, dtype=np.float32), ["fr", "en", "unk"])["unk"] == 0.0
+
+
+def test_audio_is_scaled_padded_and_truncated_to_the_window():
+    model = Model({"fr": 1.0})
+    samples = np.full(20000, 16384, dtype=np.int16)
+    WhisperLanguageID._probabilities(model, samples, ["fr"])
+    assert model.feature_extractor.audio.shape == (16000,)
+    assert model.feature_extractor.audio[0] == 0.5
+    assert model.features.shape == (80, 4)
+
+    WhisperLanguageID._probabilities(model, np.ones(100, dtype=np.float32), ["fr"])
+    audio = model.feature_extractor.audio
+    assert audio.shape == (16000,) and audio[99] == 1.0 and audio[100] == 0.0
+
+
+def test_model_comes_from_the_shared_registry(monkeypatch):
+    requested = []
+    model = Model({"fr": 0.9, "en": 0.1})
+
+    @contextmanager
+    def use(*spec, **kwargs):
+        requested.append(spec)
+        yield model
+
+    monkeypatch.setattr(module.model_registry, "use", use)
+    assert WhisperLanguageID.probabilities(np.zeros(10, dtype=np.float32), ["fr"]) == {"fr": 0.9}
+    assert requested == [WhisperLanguageID.model_spec()]
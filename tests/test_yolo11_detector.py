@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from backend.services.animal.detection_timeline import DetectionTimeline
+from backend.services.animal.yolo11_detector import YOLO11Detector
+
+
+class Column:
+    """Colonne de boîtes au format ultralytics (tensor.cpu().numpy())"""
+
+    def __init__(self, values):
+        self.values = np.asarray(values)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class Boxes:
+    def __init__(self, cls, conf, xyxyn):
+        self.cls, self.conf, self.xyxyn = Column(cls), Column(conf), Column(xyxyn)
+
+    def __len__(self):
+        return len(self.cls.values)
+
+
+class Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def detector_with(model):
+    detector = YOLO11Detector.__new__(YOLO11Detector)
+    detector.model = model
+    detector.available = True
+    return detector
+
+
+def test_preprocessed_frames_keep_the_probed_duration(tmp_path):
+    # Une girafe (23) et une personne (0, ignorée) par frame
+    boxes = Boxes([23, 0], [0.9, 0.8], [[0.1, 0.1, 0.5, 0.5], [0.2, 0.2, 0.4, 0.4]])
+    detector = detector_with(lambda frame, conf, verbose: [Result(boxes)])
+    frames = [(i, i * 0.5, np.zeros((8, 8, 3), dtype=np.uint8)) for i in range(4)]
+    timeline_path = str(tmp_path / "detections.npz")
+
+    animals = detector.detect_animals("unused.mp4", timeline_path=timeline_path, frames=frames, duration=42.5)
+
+    assert animals == ["girafe"]
+    timeline = DetectionTimeline.load(timeline_path)
+    assert timeline.duration == pytest.approx(42.5)
+    assert timeline.sampled_frames == 4
+    assert len(timeline) == 4
+    assert set(timeline.class_ids.tolist()) == {23}